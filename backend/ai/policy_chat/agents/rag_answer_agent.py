@@ -10,6 +10,8 @@ from pathlib import Path
 import os
 from dotenv import load_dotenv
 
+from database.connection import db_connection
+
 from ..vector_store import policy_vector_store
 
 load_dotenv()
@@ -51,7 +53,7 @@ class RAGAnswerAgent:
     def _get_user_context(self, user_id: int) -> Dict[str, Any]:
         """사용자 정보 조회"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with db_connection(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
 
@@ -10,6 +10,8 @@ from pathlib import Path
 import os
 from dotenv import load_dotenv
 
+from database.connection import db_connection
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
@@ -48,7 +50,7 @@ class SimpleAnswerAgent:
     def _get_user_context(self, user_id: int) -> Dict[str, Any]:
         """사용자 정보 조회"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with db_connection(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
 
@@ -0,0 +1,139 @@
+"""
+임베딩 캐시 - 메모리 LRU + SQLite 파일 (float32 벡터)
+같은 (모델, 정규화된 텍스트)는 임베딩 API를 다시 호출하지 않음
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from database.connection import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# 메모리에 보관하는 임베딩 수와 디스크 캐시 파일 경로
+EMBEDDING_CACHE_MEMORY_SIZE = int(os.getenv("POLICY_EMBEDDING_CACHE_SIZE", "2048"))
+EMBEDDING_CACHE_PATH = os.getenv("POLICY_EMBEDDING_CACHE_PATH", "policy_vectors/embedding_cache.db")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 텍스트 정규화 (유니코드 NFC, 앞뒤 공백 제거, 연속 공백 하나로)"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def cache_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """2단계 임베딩 캐시
+
+    조회는 메모리 LRU -> SQLite 파일 순서로 하고, 디스크에서 찾은 벡터는
+    메모리에도 올립니다. 캐시 오류는 로그만 남기고 미스로 처리하므로
+    캐시 때문에 임베딩이 실패하지는 않습니다.
+    """
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH, memory_size: int = EMBEDDING_CACHE_MEMORY_SIZE):
+        self.path = Path(path)
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = get_db_connection(str(self.path))
+        if not self._initialized:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    dimension INTEGER NOT NULL,
+                    vector BLOB NOT NULL
+                ) WITHOUT ROWID
+            """)
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _remember(self, key: str, vector: np.ndarray):
+        # self._lock 안에서 호출
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """텍스트별 캐시된 벡터 (없으면 None)"""
+        keys = [cache_key(model, text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+
+        missing = list({key for key in keys if key not in found})
+        if missing:
+            try:
+                conn = self._connect()
+                try:
+                    for start in range(0, len(missing), 500):
+                        chunk = missing[start:start + 500]
+                        placeholders = ",".join("?" * len(chunk))
+                        rows = conn.execute(
+                            f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({placeholders})",
+                            [model] + chunk,
+                        ).fetchall()
+                        for key, blob in rows:
+                            found[key] = np.frombuffer(blob, dtype=np.float32)
+                finally:
+                    conn.close()
+            except Exception as e:
+                logger.warning(f"Embedding cache lookup failed: {e}")
+
+            with self._lock:
+                for key in missing:
+                    if key in found:
+                        self._remember(key, found[key])
+
+        return [found.get(key) for key in keys]
+
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]):
+        """새로 만든 임베딩을 메모리와 디스크에 저장"""
+        entries = {}
+        for text, vector in zip(texts, vectors):
+            entries[cache_key(model, text)] = np.asarray(vector, dtype=np.float32)
+
+        with self._lock:
+            for key, vector in entries.items():
+                self._remember(key, vector)
+
+        try:
+            conn = self._connect()
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, model, dimension, vector) VALUES (?, ?, ?, ?)",
+                    [(key, model, len(vector), vector.tobytes()) for key, vector in entries.items()],
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+
+# 전역 인스턴스
+embedding_cache = EmbeddingCache()
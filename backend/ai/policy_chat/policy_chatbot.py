@@ -7,6 +7,8 @@ import sqlite3
 from typing import List, Dict, Any, Optional, AsyncGenerator
 from pathlib import Path
 
+from database.connection import db_connection
+
 from .agents.simple_answer_agent import simple_answer_agent
 from .agents.rag_answer_agent import rag_answer_agent
 from .agents.intent_classifier import intent_classifier
@@ -29,42 +31,33 @@ class PolicyChatbot:
         self._initialize_vector_store()
     
     def _initialize_vector_store(self):
-        """벡터 스토어 초기화 - DB에서 정책 로드"""
+        """벡터 스토어 초기화 - DB 정책과 동기화 (새로 생기거나 바뀐 정책만 임베딩)"""
         try:
             current_count = self.vector_store.get_policy_count()
             logger.info(f"Current vector store has {current_count} policies")
             
-            # DB 정책 수 확인 (테이블 존재 여부 먼저 확인)
-            with sqlite3.connect(self.db_path) as conn:
+            # policies 테이블이 존재하는지 확인
+            with db_connection(self.db_path) as conn:
                 cursor = conn.cursor()
-                
-                # policies 테이블이 존재하는지 확인
                 cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='policies'")
                 table_exists = cursor.fetchone() is not None
-                
-                if not table_exists:
-                    logger.warning("policies table does not exist yet, skipping vector store initialization")
-                    return
-                    
-                cursor.execute("SELECT COUNT(*) FROM policies")
-                db_count = cursor.fetchone()[0]
             
-            logger.info(f"Database has {db_count} policies")
+            if not table_exists:
+                logger.warning("policies table does not exist yet, skipping vector store initialization")
+                return
             
-            # 벡터 스토어가 비어있거나 DB와 차이가 나면 다시 로드
-            if current_count == 0 or current_count != db_count:
-                self._rebuild_vector_store()
+            self._rebuild_vector_store()
                 
         except Exception as e:
             logger.error(f"Failed to initialize vector store: {e}")
     
     def _rebuild_vector_store(self):
-        """벡터 스토어 재구축"""
+        """벡터 스토어를 DB 활성 정책과 동기화 (바뀐 정책만 임베딩, 비활성/삭제된 정책은 제거)"""
         try:
-            logger.info("Rebuilding vector store from database...")
+            logger.info("Syncing vector store with database...")
             
             # DB에서 모든 정책 로드
-            with sqlite3.connect(self.db_path) as conn:
+            with db_connection(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
@@ -112,16 +105,14 @@ class PolicyChatbot:
                     }
                     policies.append(policy)
             
-            if policies:
-                # 기존 벡터 스토어 클리어 후 재구축
-                self.vector_store.clear()
-                self.vector_store.add_policies(policies)
-                logger.info(f"Successfully rebuilt vector store with {len(policies)} policies")
-            else:
+            if not policies:
                 logger.warning("No policies found in database")
+            
+            upserted, deleted = self.vector_store.sync_policies(policies)
+            logger.info(f"Successfully synced vector store with {len(policies)} policies ({upserted} embedded, {deleted} removed)")
                 
         except Exception as e:
-            logger.error(f"Failed to rebuild vector store: {e}")
+            logger.error(f"Failed to sync vector store: {e}")
             raise
     
     async def chat(self, user_message: str, user_id: int, user_context: Optional[Dict[str, Any]] = None, use_multi_agent: bool = True) -> Dict[str, Any]:
@@ -328,7 +319,7 @@ class PolicyChatbot:
         """사용자의 상담 요약 정보 조회"""
         try:
             # 사용자 기본 정보 조회
-            with sqlite3.connect(self.db_path) as conn:
+            with db_connection(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
@@ -3,12 +3,14 @@
 OpenAI text-embedding-3-small 사용
 """
 
+import hashlib
 import logging
 from typing import List, Dict, Any
 from openai import OpenAI
 import numpy as np
 import time
 
+from .embedding_cache import embedding_cache
 from .utils.api_key_manager import api_key_manager
 
 logger = logging.getLogger(__name__)
@@ -29,24 +31,35 @@ class PolicyEmbedder:
         return self._client
     
     def embed_text(self, text: str) -> List[float]:
-        """단일 텍스트 임베딩"""
+        """단일 텍스트 임베딩 (캐시에 있으면 API 호출 없음)"""
+        cached = embedding_cache.get_many(self.model, [text])[0]
+        if cached is not None:
+            return cached.tolist()
+        
         try:
             client = self._get_client()
             response = client.embeddings.create(
                 model=self.model,
                 input=text
             )
-            return response.data[0].embedding
+            embedding = response.data[0].embedding
         except Exception as e:
             logger.error(f"Failed to embed text: {e}")
             raise
+        
+        embedding_cache.put_many(self.model, [text], [embedding])
+        return embedding
     
     def embed_batch(self, texts: List[str], batch_size: int = 100) -> List[List[float]]:
-        """배치 임베딩 처리"""
+        """배치 임베딩 처리 (캐시에 없는 텍스트만 API로 임베딩)"""
+        cached = embedding_cache.get_many(self.model, texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        logger.info(f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} to embed")
+        
         all_embeddings = []
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
+        for i in range(0, len(missing), batch_size):
+            batch = missing[i:i + batch_size]
             
             try:
                 client = self._get_client()
@@ -57,8 +70,9 @@ class PolicyEmbedder:
                 
                 batch_embeddings = [data.embedding for data in response.data]
                 all_embeddings.extend(batch_embeddings)
+                embedding_cache.put_many(self.model, batch, batch_embeddings)
                 
-                logger.info(f"Embedded batch {i//batch_size + 1}/{(len(texts)-1)//batch_size + 1}")
+                logger.info(f"Embedded batch {i//batch_size + 1}/{(len(missing)-1)//batch_size + 1}")
                 
                 # API 레이트 리밋 방지
                 time.sleep(0.1)
@@ -67,46 +81,53 @@ class PolicyEmbedder:
                 logger.error(f"Failed to embed batch {i}-{i+batch_size}: {e}")
                 raise
         
-        return all_embeddings
+        embedded = dict(zip(missing, all_embeddings))
+        return [
+            vector.tolist() if vector is not None else embedded[text]
+            for text, vector in zip(texts, cached)
+        ]
+    
+    def policy_to_text(self, policy: Dict[str, Any]) -> str:
+        """정책 정보를 임베딩용 구조화된 텍스트로 변환"""
+        text_parts = []
+
+        if policy.get('title'):
+            text_parts.append(f"제목: {policy['title']}")
+
+        if policy.get('organization'):
+            text_parts.append(f"기관: {policy['organization']}")
+
+        if policy.get('category'):
+            text_parts.append(f"분야: {policy['category']}")
+
+        if policy.get('target'):
+            text_parts.append(f"대상: {policy['target']}")
+
+        if policy.get('content'):
+            text_parts.append(f"내용: {policy['content']}")
+
+        if policy.get('region'):
+            text_parts.append(f"지역: {policy['region']}")
+
+        # 상세 정보도 포함
+        if policy.get('details') and isinstance(policy['details'], dict):
+            details = policy['details']
+            if details.get('explanation'):
+                text_parts.append(f"설명: {details['explanation']}")
+            if details.get('application_method'):
+                text_parts.append(f"신청방법: {details['application_method']}")
+            if details.get('income_condition'):
+                text_parts.append(f"소득조건: {details['income_condition']}")
+
+        return "\\n".join(text_parts)
+    
+    def content_hash(self, policy: Dict[str, Any]) -> str:
+        """임베딩 텍스트 해시 (모델 포함) - 바뀐 정책만 다시 임베딩하는 데 사용"""
+        return hashlib.sha256(f"{self.model}\0{self.policy_to_text(policy)}".encode("utf-8")).hexdigest()
     
     def embed_policies(self, policies: List[Dict[str, Any]]) -> List[List[float]]:
         """정책 데이터를 임베딩용 텍스트로 변환 후 임베딩"""
-        texts = []
-        
-        for policy in policies:
-            # 정책 정보를 구조화된 텍스트로 변환
-            text_parts = []
-            
-            if policy.get('title'):
-                text_parts.append(f"제목: {policy['title']}")
-            
-            if policy.get('organization'):
-                text_parts.append(f"기관: {policy['organization']}")
-                
-            if policy.get('category'):
-                text_parts.append(f"분야: {policy['category']}")
-                
-            if policy.get('target'):
-                text_parts.append(f"대상: {policy['target']}")
-                
-            if policy.get('content'):
-                text_parts.append(f"내용: {policy['content']}")
-                
-            if policy.get('region'):
-                text_parts.append(f"지역: {policy['region']}")
-            
-            # 상세 정보도 포함
-            if policy.get('details') and isinstance(policy['details'], dict):
-                details = policy['details']
-                if details.get('explanation'):
-                    text_parts.append(f"설명: {details['explanation']}")
-                if details.get('application_method'):
-                    text_parts.append(f"신청방법: {details['application_method']}")
-                if details.get('income_condition'):
-                    text_parts.append(f"소득조건: {details['income_condition']}")
-            
-            combined_text = "\\n".join(text_parts)
-            texts.append(combined_text)
+        texts = [self.policy_to_text(policy) for policy in policies]
         
         logger.info(f"Converting {len(policies)} policies to embeddings...")
         return self.embed_batch(texts)
\ No newline at end of file
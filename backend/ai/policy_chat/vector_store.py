@@ -2,20 +2,38 @@
 FAISS 벡터 스토어를 사용한 정책 임베딩 저장/검색
 """
 
+import hashlib
+import json
 import logging
 import os
 import pickle
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import faiss
 import numpy as np
 from pathlib import Path
 
+from database.connection import db_connection, get_db_connection
+
 from .policy_embedder import PolicyEmbedder
 
 logger = logging.getLogger(__name__)
 
+# 메타데이터 컬럼 (policy_vectors 테이블 순서, 검색 결과 dict 키)
+METADATA_COLUMNS = ('id', 'title', 'organization', 'category', 'target', 'region', 'content', 'details')
+
+# 가능하면 인덱스를 메모리 맵으로 읽음 (faiss 버전에 따라 지원하는 플래그가 다름)
+INDEX_MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", 0) | getattr(faiss, "IO_FLAG_MMAP", 0)
+
 class PolicyVectorStore:
-    """FAISS 기반 정책 벡터 스토어"""
+    """FAISS 기반 정책 벡터 스토어
+    
+    벡터는 정책 id를 FAISS id로 쓰는 IndexIDMap2에 저장하고, 메타데이터는
+    같은 id를 키로 하는 SQLite 테이블(metadata.db)에 임베딩 텍스트 해시
+    (content_hash), 메타데이터 해시(metadata_hash)와 함께 보관합니다. 인덱스는 메모리 맵으로 읽고 검색
+    시에는 상위 k개 행만 읽으므로, 정책이 늘어도 시작 시간과 메모리가
+    거의 늘지 않습니다. upsert_policies / sync_policies는 새로 생기거나
+    내용이 바뀐 정책만 임베딩합니다.
+    """
     
     def __init__(self, store_path: str = "policy_vectors"):
         self.store_path = Path(store_path)
@@ -24,99 +42,318 @@ class PolicyVectorStore:
         self.embedder = PolicyEmbedder()
         self.dimension = self.embedder.dimension
         
-        # FAISS 인덱스와 메타데이터
+        # FAISS 인덱스 (메모리 맵으로 읽은 경우 수정 전에 메모리로 다시 읽음)
         self.index = None
-        self.policy_metadata = []
+        self._index_writable = True
         
         # 저장 파일 경로
         self.index_file = self.store_path / "faiss.index"
-        self.metadata_file = self.store_path / "metadata.pkl"
+        self.metadata_db = self.store_path / "metadata.db"
+        self.legacy_metadata_file = self.store_path / "metadata.pkl"
         
         # 기존 인덱스 로드
+        self._init_metadata_db()
         self._load_index()
     
+    def _new_index(self):
+        """정책 id로 추가/삭제할 수 있는 빈 인덱스 (내적 유사도)"""
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(self.dimension))
+    
+    def _connect(self):
+        return get_db_connection(str(self.metadata_db))
+    
+    def _init_metadata_db(self):
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS policy_vectors (
+                    policy_id INTEGER PRIMARY KEY,
+                    title TEXT,
+                    organization TEXT,
+                    category TEXT,
+                    target TEXT,
+                    region TEXT,
+                    content TEXT,
+                    details TEXT, -- JSON
+                    content_hash TEXT,
+                    metadata_hash TEXT
+                )
+            """)
+            # metadata_hash 이전 형식 (비어 있는 행은 다음 동기화 때 메타데이터만 다시 기록)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(policy_vectors)")}
+            if 'metadata_hash' not in columns:
+                conn.execute("ALTER TABLE policy_vectors ADD COLUMN metadata_hash TEXT")
+            conn.commit()
+        finally:
+            conn.close()
+    
     def _load_index(self):
-        """기존 FAISS 인덱스와 메타데이터 로드"""
+        """기존 FAISS 인덱스 로드 (메타데이터는 SQLite에서 필요할 때만 읽음)"""
         try:
-            if self.index_file.exists() and self.metadata_file.exists():
-                # FAISS 인덱스 로드
-                self.index = faiss.read_index(str(self.index_file))
-                
-                # 메타데이터 로드
-                with open(self.metadata_file, 'rb') as f:
-                    self.policy_metadata = pickle.load(f)
+            if self.legacy_metadata_file.exists():
+                self._convert_legacy()
+            
+            if self.index_file.exists():
+                # FAISS 인덱스 로드 (메모리 맵으로 읽지 못하면 메모리로 읽음)
+                try:
+                    self.index = faiss.read_index(str(self.index_file), INDEX_MMAP_FLAGS)
+                    self._index_writable = not INDEX_MMAP_FLAGS
+                except Exception as e:
+                    if not INDEX_MMAP_FLAGS:
+                        raise
+                    logger.warning(f"Failed to memory-map index, reading into memory: {e}")
+                    self.index = faiss.read_index(str(self.index_file))
+                    self._index_writable = True
                 
-                logger.info(f"Loaded existing index with {len(self.policy_metadata)} policies")
+                count = self.get_policy_count()
+                if self.index.ntotal != count:
+                    logger.warning(
+                        f"Index has {self.index.ntotal} vectors but metadata has {count} policies, starting empty"
+                    )
+                    self.clear()
+                else:
+                    logger.info(f"Loaded existing index with {count} policies")
             else:
                 # 새 인덱스 생성
-                self.index = faiss.IndexFlatIP(self.dimension)  # 내적 유사도
-                self.policy_metadata = []
+                self.clear()
                 logger.info("Created new FAISS index")
-                
+        
         except Exception as e:
             logger.error(f"Failed to load index: {e}")
-            # 새 인덱스로 폴백
-            self.index = faiss.IndexFlatIP(self.dimension)
-            self.policy_metadata = []
+            # 새 인덱스로 폴백 - 메타데이터도 비워야 다음 동기화 때 임베딩 캐시로 다시 채움
+            self.index = self._new_index()
+            self._index_writable = True
+            try:
+                self.clear()
+            except Exception:
+                pass  # clear에서 로그를 남김
+    
+    def _ensure_writable(self):
+        """메모리 맵으로 읽은 인덱스를 수정할 수 있도록 메모리로 다시 읽음"""
+        if not self._index_writable:
+            self.index = faiss.read_index(str(self.index_file))
+            self._index_writable = True
+    
+    def _convert_legacy(self):
+        """이전 pickle 메타데이터(위치 기반 목록 또는 정책 id별 dict)를 SQLite로 옮김"""
+        with open(self.legacy_metadata_file, 'rb') as f:
+            metadata = pickle.load(f)
+        
+        index = faiss.read_index(str(self.index_file)) if self.index_file.exists() else self._new_index()
+        if isinstance(metadata, list):
+            # 위치 기반 IndexFlatIP -> 정책 id 기반 IndexIDMap2
+            vectors = index.reconstruct_n(0, index.ntotal) if index.ntotal else np.zeros((0, self.dimension), dtype=np.float32)
+            positions = {}
+            for position, item in enumerate(metadata[:index.ntotal]):
+                if item.get('id') is not None:
+                    positions[int(item['id'])] = position  # 같은 id는 마지막 항목 사용
+            
+            index = self._new_index()
+            if positions:
+                index.add_with_ids(vectors[list(positions.values())], np.array(list(positions.keys()), dtype=np.int64))
+            metadata = {policy_id: metadata[position] for policy_id, position in positions.items()}
+        
+        self.index = index
+        self._index_writable = True
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM policy_vectors")
+            # content_hash가 없던 이전 형식은 다음 동기화 때 다시 임베딩 (임베딩 캐시 사용)
+            self._write_metadata(conn, [
+                (policy_id, item, item.get('content_hash')) for policy_id, item in metadata.items()
+            ])
+            self._save(conn)
+        finally:
+            conn.close()
+        
+        self.legacy_metadata_file.unlink()
+        logger.info(f"Converted legacy metadata with {len(metadata)} policies to SQLite")
+    
+    def _write_metadata(self, conn, rows: List[Tuple[int, Dict[str, Any], Optional[str]]]):
+        """(정책 id, 정책, content_hash) 목록을 메타데이터 테이블에 기록 (커밋은 _save에서)"""
+        conn.executemany("""
+            INSERT OR REPLACE INTO policy_vectors
+                (policy_id, title, organization, category, target, region, content, details,
+                 content_hash, metadata_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (
+                policy_id,
+                policy.get('title'),
+                policy.get('organization'),
+                policy.get('category'),
+                policy.get('target'),
+                policy.get('region'),
+                (policy.get('content') or '')[:500],  # 내용은 500자만
+                json.dumps(policy.get('details', {}), ensure_ascii=False),
+                content_hash,
+                self._metadata_hash(policy_id, policy)
+            )
+            for policy_id, policy, content_hash in rows
+        ])
     
-    def _save_index(self):
-        """FAISS 인덱스와 메타데이터 저장"""
+    def _save(self, conn):
+        """FAISS 인덱스와 메타데이터 저장
+        
+        인덱스를 임시 파일에 쓴 뒤 메타데이터를 커밋하고 파일을 교체하므로
+        중간에 실패해도 기존 파일이 남습니다 (둘이 어긋나면 다음 로드 때 비우고
+        임베딩 캐시로 다시 채움). 메타데이터는 바뀐 행만 기록합니다.
+        """
+        index_tmp = self.index_file.with_name(self.index_file.name + ".tmp")
         try:
             # FAISS 인덱스 저장
-            faiss.write_index(self.index, str(self.index_file))
+            faiss.write_index(self.index, str(index_tmp))
             
             # 메타데이터 저장
-            with open(self.metadata_file, 'wb') as f:
-                pickle.dump(self.policy_metadata, f)
+            conn.commit()
+            os.replace(index_tmp, self.index_file)
             
             logger.info("Saved FAISS index and metadata")
-            
+        
         except Exception as e:
+            conn.rollback()
             logger.error(f"Failed to save index: {e}")
+            if index_tmp.exists():
+                index_tmp.unlink()
             raise
     
-    def add_policies(self, policies: List[Dict[str, Any]]):
-        """정책 데이터 추가"""
-        if not policies:
-            return
+    def _stored_hashes(self, conn) -> Dict[int, Tuple[Optional[str], Optional[str]]]:
+        """정책 id별 (content_hash, metadata_hash)"""
+        return {
+            policy_id: (content_hash, metadata_hash)
+            for policy_id, content_hash, metadata_hash in conn.execute(
+                "SELECT policy_id, content_hash, metadata_hash FROM policy_vectors"
+            )
+        }
+    
+    def _hydrate(self, conn, policy_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """정책 id 목록의 메타데이터 행만 읽어 dict로 반환"""
+        result = {}
+        for start in range(0, len(policy_ids), 500):
+            chunk = policy_ids[start:start + 500]
+            cursor = conn.execute(f"""
+                SELECT policy_id, title, organization, category, target, region, content, details
+                FROM policy_vectors WHERE policy_id IN ({','.join('?' * len(chunk))})
+            """, chunk)
+            for row in cursor.fetchall():
+                metadata = dict(zip(METADATA_COLUMNS, row))
+                metadata['details'] = json.loads(metadata['details']) if metadata['details'] else {}
+                result[row[0]] = metadata
+        return result
+    
+    def _metadata_hash(self, policy_id: int, policy: Dict[str, Any]) -> str:
+        """메타데이터 행에 저장되는 값의 해시 (바뀌었는지 행을 읽지 않고 비교)"""
+        metadata = {
+            'id': policy_id,
+            'title': policy.get('title'),
+            'organization': policy.get('organization'),
+            'category': policy.get('category'),
+            'target': policy.get('target'),
+            'region': policy.get('region'),
+            'content': (policy.get('content') or '')[:500],
+            'details': policy.get('details', {})
+        }
+        return hashlib.sha256(json.dumps(metadata, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def _apply(self, conn, policies: List[Dict[str, Any]], delete_ids: List[int]) -> Tuple[int, int]:
+        """정책 추가/갱신과 삭제를 한 번에 반영 - (임베딩한 수, 삭제한 수)를 반환
         
-        logger.info(f"Adding {len(policies)} policies to vector store...")
+        새 정책이나 임베딩 텍스트가 바뀐 정책만 임베딩하고, 텍스트는 같고
+        메타데이터만 바뀐 정책은 메타데이터 행만 다시 기록합니다.
+        """
+        stored = self._stored_hashes(conn)
         
-        try:
+        changed = {}
+        rewritten = []  # 메타데이터만 바뀐 행
+        for policy in policies:
+            if policy.get('id') is None:
+                logger.warning(f"Skipping policy without id: {policy.get('title')}")
+                continue
+            
+            policy_id = int(policy['id'])
+            content_hash = self.embedder.content_hash(policy)
+            stored_hashes = stored.get(policy_id)
+            if stored_hashes is None or stored_hashes[0] != content_hash:
+                changed[policy_id] = (policy, content_hash)
+            elif stored_hashes[1] != self._metadata_hash(policy_id, policy):
+                rewritten.append((policy_id, policy, content_hash))
+        
+        delete_ids = [policy_id for policy_id in set(delete_ids) if policy_id in stored and policy_id not in changed]
+        
+        if not changed and not delete_ids and not rewritten:
+            return 0, 0
+        
+        if changed:
+            logger.info(f"Embedding {len(changed)} of {len(policies)} policies...")
+            
             # 임베딩 생성
-            embeddings = self.embedder.embed_policies(policies)
+            embeddings = self.embedder.embed_policies([policy for policy, _ in changed.values()])
             
             # numpy 배열로 변환 (FAISS 요구사항)
             embeddings_np = np.array(embeddings, dtype=np.float32)
             
             # 정규화 (내적 유사도를 코사인 유사도로 변환)
             faiss.normalize_L2(embeddings_np)
-            
-            # FAISS 인덱스에 추가
-            self.index.add(embeddings_np)
-            
-            # 메타데이터 추가
-            for policy in policies:
-                metadata = {
-                    'id': policy.get('id'),
-                    'title': policy.get('title'),
-                    'organization': policy.get('organization'),
-                    'category': policy.get('category'),
-                    'target': policy.get('target'),
-                    'region': policy.get('region'),
-                    'content': policy.get('content', '')[:500],  # 내용은 500자만
-                    'details': policy.get('details', {})
-                }
-                self.policy_metadata.append(metadata)
-            
-            # 저장
-            self._save_index()
-            
-            logger.info(f"Successfully added {len(policies)} policies")
-            
+        
+        self._ensure_writable()
+        
+        # 기존 벡터를 지우고 같은 id로 다시 추가
+        removed = list(changed.keys()) + delete_ids
+        if removed:
+            self.index.remove_ids(np.array(removed, dtype=np.int64))
+        if changed:
+            self.index.add_with_ids(embeddings_np, np.array(list(changed.keys()), dtype=np.int64))
+        
+        for start in range(0, len(delete_ids), 500):
+            chunk = delete_ids[start:start + 500]
+            conn.execute(f"DELETE FROM policy_vectors WHERE policy_id IN ({','.join('?' * len(chunk))})", chunk)
+        self._write_metadata(conn, rewritten + [
+            (policy_id, policy, content_hash) for policy_id, (policy, content_hash) in changed.items()
+        ])
+        
+        # 저장
+        self._save(conn)
+        return len(changed), len(delete_ids)
+    
+    def upsert_policies(self, policies: List[Dict[str, Any]]) -> int:
+        """정책 추가/갱신 - 새 정책이나 임베딩 텍스트가 바뀐 정책만 임베딩하고, 임베딩한 수를 반환"""
+        conn = self._connect()
+        try:
+            upserted, _ = self._apply(conn, policies, [])
+            logger.info(f"Successfully upserted {upserted} policies")
+            return upserted
         except Exception as e:
-            logger.error(f"Failed to add policies: {e}")
+            logger.error(f"Failed to upsert policies: {e}")
             raise
+        finally:
+            conn.close()
+    
+    def add_policies(self, policies: List[Dict[str, Any]]):
+        """정책 데이터 추가 (upsert_policies와 같음)"""
+        self.upsert_policies(policies)
+    
+    def delete_policies(self, policy_ids: List[int]) -> int:
+        """정책 삭제 - 삭제한 수를 반환"""
+        conn = self._connect()
+        try:
+            _, deleted = self._apply(conn, [], [int(policy_id) for policy_id in policy_ids])
+            logger.info(f"Deleted {deleted} policies from vector store")
+            return deleted
+        finally:
+            conn.close()
+    
+    def sync_policies(self, policies: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """벡터 스토어를 주어진 정책 목록과 같게 맞춤 - (임베딩한 수, 삭제한 수)를 반환"""
+        conn = self._connect()
+        try:
+            active_ids = {int(policy['id']) for policy in policies if policy.get('id') is not None}
+            delete_ids = [policy_id for policy_id in self._stored_hashes(conn) if policy_id not in active_ids]
+            upserted, deleted = self._apply(conn, policies, delete_ids)
+        finally:
+            conn.close()
+        
+        logger.info(f"Synced vector store: {upserted} embedded, {deleted} deleted, {self.get_policy_count()} total")
+        return upserted, deleted
     
     def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
         """쿼리로 유사한 정책 검색"""
@@ -131,45 +368,50 @@ class PolicyVectorStore:
             # 정규화
             faiss.normalize_L2(query_np)
             
-            # 검색
-            scores, indices = self.index.search(query_np, k)
+            # 검색 (결과는 정책 id, 부족하면 -1)
+            scores, ids = self.index.search(query_np, k)
+            
+            # 결과 구성 - 상위 k개 메타데이터 행만 읽음
+            hits = [(float(score), int(policy_id)) for score, policy_id in zip(scores[0], ids[0]) if policy_id >= 0]
+            conn = self._connect()
+            try:
+                metadata_by_id = self._hydrate(conn, [policy_id for _, policy_id in hits])
+            finally:
+                conn.close()
             
-            # 결과 구성
             results = []
-            for score, idx in zip(scores[0], indices[0]):
-                if idx < len(self.policy_metadata):
-                    metadata = self.policy_metadata[idx].copy()
-                    metadata['similarity_score'] = float(score)
+            for score, policy_id in hits:
+                metadata = metadata_by_id.get(policy_id)
+                if metadata is not None:
+                    metadata['similarity_score'] = score
                     results.append(metadata)
             
             logger.info(f"Found {len(results)} similar policies for query: {query[:50]}...")
             return results
-            
+        
         except Exception as e:
             logger.error(f"Search failed: {e}")
             return []
     
     def get_policy_count(self) -> int:
         """저장된 정책 수 반환"""
-        return len(self.policy_metadata)
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM policy_vectors").fetchone()[0]
+        finally:
+            conn.close()
     
     def rebuild_from_database(self, db_path: str = "users.db"):
-        """데이터베이스에서 정책을 다시 로드하여 벡터 스토어 재구축"""
-        import sqlite3
-        
+        """데이터베이스의 활성 정책과 벡터 스토어 동기화 (바뀐 정책만 다시 임베딩)"""
         try:
-            # 기존 데이터 초기화
-            self._initialize_index()
-            self.policy_metadata = []
-            
             # 데이터베이스에서 정책 로드
-            with sqlite3.connect(db_path) as conn:
+            with db_connection(db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
-                    SELECT id, title, organization, category, target, region, 
-                           content, details, application_url, reference_url, 
+                    SELECT id, title, organization, category, target, region,
+                           content, details, application_url, reference_url,
                            start_date, end_date
-                    FROM policies 
+                    FROM policies
                     WHERE is_active = TRUE
                     ORDER BY id
                 """)
@@ -191,16 +433,15 @@ class PolicyVectorStore:
                         'end_date': row[11] or ''
                     }
                     policies.append(policy)
-                
-                logger.info(f"Loaded {len(policies)} policies from database")
-                
-                # 정책들을 벡터스토어에 추가
-                if policies:
-                    self.add_policies(policies)
-                    logger.info(f"Successfully rebuilt vector store with {len(policies)} policies")
-                else:
-                    logger.warning("No active policies found in database")
-                    
+            
+            logger.info(f"Loaded {len(policies)} policies from database")
+            
+            # 정책들을 벡터스토어에 반영
+            if not policies:
+                logger.warning("No active policies found in database")
+            self.sync_policies(policies)
+            logger.info(f"Successfully synced vector store with {len(policies)} policies")
+        
         except Exception as e:
             logger.error(f"Failed to rebuild vector store from database: {e}")
             raise
@@ -208,17 +449,22 @@ class PolicyVectorStore:
     def clear(self):
         """모든 데이터 삭제"""
         try:
-            self.index = faiss.IndexFlatIP(self.dimension)
-            self.policy_metadata = []
+            self.index = self._new_index()
+            self._index_writable = True
+            
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM policy_vectors")
+                conn.commit()
+            finally:
+                conn.close()
             
             # 파일 삭제
             if self.index_file.exists():
                 self.index_file.unlink()
-            if self.metadata_file.exists():
-                self.metadata_file.unlink()
             
             logger.info("Cleared vector store")
-            
+        
         except Exception as e:
             logger.error(f"Failed to clear vector store: {e}")
             raise
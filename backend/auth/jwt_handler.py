@@ -52,6 +52,20 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     return User(id=user["id"], email=user["email"], name=user["name"])
 
 
+def get_user_from_token(token: str) -> Optional[User]:
+    """토큰에서 사용자를 찾습니다 (헤더를 쓸 수 없는 WebSocket 연결용). 실패 시 None"""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    
+    email = payload.get("sub")
+    user = get_user_by_email(email) if email else None
+    if user is None:
+        return None
+    return User(id=user["id"], email=user["email"], name=user["name"])
+
+
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """토큰 검증 함수"""
     try:
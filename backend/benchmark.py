@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+매칭/채팅 성능 벤치마크
+
+가상의 사용자 집단(프로필, 찜, 채팅방/메시지)을 별도 SQLite 파일에 생성하고
+find_matches, get_matched_roommates, get_user_chat_rooms 등 주요 경로를 처음부터
+끝까지(DB 조회 포함) 실행해 p50/p99 지연 시간과 메모리 사용량을 보고합니다.
+
+사용 예:
+    python benchmark.py --users 10000
+    python benchmark.py --users 100000 --output bench.json
+    python benchmark.py --users 100000 --baseline bench.json   # 회귀 시 종료 코드 1
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+import database.connection as db
+from utils.matching_engine import _FIELD_VALUES
+
+# 필드별 값 분포 (_FIELD_VALUES 순서) - 대학생 설문에서 흔한 비율을 따름
+FIELD_WEIGHTS = {
+    "sleep_type": [0.35, 0.65],
+    "home_time": [0.3, 0.45, 0.25],
+    "cleaning_frequency": [0.2, 0.55, 0.25],
+    "cleaning_sensitivity": [0.25, 0.55, 0.2],
+    "smoking_status": [0.55, 0.3, 0.1, 0.05],
+    "noise_sensitivity": [0.3, 0.5, 0.2],
+}
+
+# 완성된 프로필 비율, 나이 분포(평균, 표준편차, 최소, 최대)
+COMPLETE_RATIO = 0.85
+AGE_DISTRIBUTION = (23.0, 2.5, 19, 35)
+
+GENERATE_BATCH_SIZE = 10000
+SCHOOL_DOMAINS = ["korea.ac.kr", "sungshin.ac.kr", "khu.ac.kr", "yonsei.ac.kr", "snu.ac.kr", "hanyang.ac.kr"]
+
+
+def _batches(total, size=GENERATE_BATCH_SIZE):
+    for start in range(0, total, size):
+        yield start, min(start + size, total)
+
+
+def _weighted(rng, values, weights, n):
+    return [values[i] for i in rng.choice(len(values), size=n, p=weights)]
+
+
+def generate_population(
+    db_path: str,
+    users: int,
+    favorites_per_user: float = 3.0,
+    chats_per_user: float = 2.0,
+    messages_per_chat: float = 20.0,
+    seed: int = 0,
+):
+    """db_path에 스키마를 만들고 가상 사용자 집단을 채웁니다.
+
+    찜은 인기 매물에 몰리도록(지프 분포), 채팅방은 1:1 방으로 만들며, 개수는
+    모두 평균이 주어진 값인 포아송 분포를 따릅니다.
+    """
+    rng = np.random.default_rng(seed)
+    db.DATABASE_PATH = db_path
+    db.init_db()
+
+    conn = db.get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM users")
+        first_id = cursor.fetchone()[0] + 1
+        user_ids = list(range(first_id, first_id + users))
+        # 앱과 같은 한국 시간 기준 (send_message는 datetime('now', '+9 hours')로 저장)
+        now = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=9)
+
+        # 1. 사용자 + 프로필
+        for start, end in _batches(users):
+            n = end - start
+            ids = user_ids[start:end]
+            genders = _weighted(rng, ["male", "female"], [0.5, 0.5], n)
+            schools = _weighted(rng, SCHOOL_DOMAINS, [1 / len(SCHOOL_DOMAINS)] * len(SCHOOL_DOMAINS), n)
+            cursor.executemany(
+                """
+                INSERT INTO users (id, email, name, hashed_password, gender, school_email)
+                VALUES (?, ?, ?, 'benchmark', ?, ?)
+            """,
+                [
+                    (uid, f"bench{uid}@example.com", f"사용자{uid}", gender, f"bench{uid}@{school}")
+                    for uid, gender, school in zip(ids, genders, schools)
+                ],
+            )
+
+            fields = {
+                field: _weighted(rng, values, FIELD_WEIGHTS[field], n)
+                for field, values in _FIELD_VALUES.items()
+            }
+            mean, std, low, high = AGE_DISTRIBUTION
+            ages = np.clip(np.rint(rng.normal(mean, std, n)), low, high).astype(int).tolist()
+            complete = (rng.random(n) < COMPLETE_RATIO).tolist()
+            cursor.executemany(
+                f"""
+                INSERT INTO user_profiles (user_id, {", ".join(fields)}, age, is_complete)
+                VALUES (?, {", ".join("?" * len(fields))}, ?, ?)
+            """,
+                [
+                    (uid, *values, age, is_complete)
+                    for uid, *values, age, is_complete in zip(ids, *fields.values(), ages, complete)
+                ],
+            )
+            conn.commit()
+
+        # 2. 찜 - 인기 매물에 몰리는 분포
+        cursor.execute("SELECT room_id FROM rooms WHERE is_active = 1 ORDER BY id")
+        room_ids = [row[0] for row in cursor.fetchall()]
+        if room_ids:
+            popularity = 1.0 / np.arange(1, len(room_ids) + 1)
+            popularity /= popularity.sum()
+            order = rng.permutation(len(room_ids))
+            for start, end in _batches(users):
+                counts = rng.poisson(favorites_per_user, end - start)
+                owners = np.repeat(user_ids[start:end], counts)
+                picks = order[rng.choice(len(room_ids), size=len(owners), p=popularity)]
+                # 같은 매물을 두 번 뽑은 경우는 UNIQUE 제약으로 무시
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO favorites (user_id, room_id) VALUES (?, ?)",
+                    [(int(uid), room_ids[i]) for uid, i in zip(owners, picks)],
+                )
+                conn.commit()
+            cursor.execute("""
+                UPDATE rooms SET favorite_count = (
+                    SELECT COUNT(*) FROM favorites f WHERE f.room_id = rooms.room_id
+                )
+            """)
+            conn.commit()
+
+        # 3. 1:1 채팅방 + 메시지
+        chat_count = int(users * chats_per_user / 2)
+        for start, end in _batches(chat_count):
+            n = end - start
+            pairs = rng.choice(users, size=(n, 2))
+            message_counts = rng.poisson(messages_per_chat, n)
+            for (a, b), message_count in zip(pairs, message_counts):
+                if a == b:
+                    continue
+                creator, other = user_ids[a], user_ids[b]
+                # 메시지가 방 생성 후 3일 안에 오가므로, 모두 현재보다 과거가 되도록 생성 시각을 잡음
+                created = now - timedelta(minutes=int(rng.integers(60 * 24 * 3, 60 * 24 * 30)))
+                created_at = created.strftime("%Y-%m-%d %H:%M:%S")
+                cursor.execute(
+                    "INSERT INTO chat_rooms (room_type, created_by, created_at, updated_at) VALUES ('individual', ?, ?, ?)",
+                    (creator, created_at, created_at),
+                )
+                chat_id = cursor.lastrowid
+                cursor.executemany(
+                    "INSERT INTO chat_participants (room_id, user_id, joined_at, last_read_at) VALUES (?, ?, ?, ?)",
+                    [(chat_id, creator, created_at, created_at), (chat_id, other, created_at, created_at)],
+                )
+                offsets = np.sort(rng.integers(0, 60 * 24 * 3, int(message_count)))
+                cursor.executemany(
+                    """
+                    INSERT INTO chat_messages (room_id, sender_id, content, created_at, sent, delivered, read_status)
+                    VALUES (?, ?, ?, ?, 1, 1, 0)
+                """,
+                    [
+                        (chat_id, creator if i % 2 == 0 else other, f"메시지 {i}",
+                         (created + timedelta(minutes=int(offset))).strftime("%Y-%m-%d %H:%M:%S"))
+                        for i, offset in enumerate(offsets)
+                    ],
+                )
+            conn.commit()
+
+        # 채팅방 목록용 마지막 메시지/안 읽은 수 채우기 (send_message가 갱신하는 값)
+        cursor.execute("""
+            UPDATE chat_rooms SET last_message_id = (
+                SELECT MAX(id) FROM chat_messages WHERE room_id = chat_rooms.id
+            )
+        """)
+        cursor.execute("""
+            UPDATE chat_rooms SET last_message_at = (
+                SELECT created_at FROM chat_messages WHERE id = chat_rooms.last_message_id
+            )
+        """)
+        cursor.execute("""
+            UPDATE chat_participants SET unread_count = (
+                SELECT COUNT(*) FROM chat_messages m
+                WHERE m.room_id = chat_participants.room_id
+                  AND m.sender_id != chat_participants.user_id
+                  AND m.created_at > chat_participants.last_read_at
+            )
+        """)
+        conn.commit()
+
+        # 4. 생성한 사용자가 많으면 매칭 캐시를 한 번에 비움 (대기열 처리)
+        from utils.match_cache import refresh_match_cache
+        refresh_match_cache()
+        return user_ids
+    finally:
+        conn.close()
+
+
+def measure(func, args_list, trace_memory=True):
+    """args_list의 각 인자로 func를 실행해 지연 시간(ms) 분포와 메모리를 측정합니다.
+
+    지연 시간은 tracemalloc 없이 재고, 메모리 최대치는 첫 인자로 한 번 더 실행해
+    tracemalloc으로 잽니다 (numpy 배열 할당 포함).
+    """
+    latencies = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    peak = None
+    if trace_memory and args_list:
+        tracemalloc.start()
+        try:
+            func(*args_list[0])
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "calls": len(latencies),
+        "p50_ms": float(np.percentile(latencies, 50)) if latencies else None,
+        "p99_ms": float(np.percentile(latencies, 99)) if latencies else None,
+        "max_ms": max(latencies) if latencies else None,
+        "peak_mb": peak / 2 ** 20 if peak is not None else None,
+    }
+
+
+def run_benchmarks(samples: int = 50, seed: int = 0):
+    """현재 DATABASE_PATH의 데이터로 주요 경로를 측정하고 {이름: 결과}를 반환합니다."""
+    from routers.favorites import _get_matched_roommates
+    from utils.match_cache import get_cached_matches
+    from utils.matching import find_matches
+
+    rng = random.Random(seed)
+    conn = db.get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT user_id FROM user_profiles WHERE is_complete = 1")
+        complete_users = [row[0] for row in cursor.fetchall()]
+        cursor.execute("""
+            SELECT room_id FROM favorites GROUP BY room_id ORDER BY COUNT(*) DESC LIMIT 20
+        """)
+        popular_rooms = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT DISTINCT user_id FROM chat_participants")
+        chat_users = [row[0] for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+    match_users = rng.sample(complete_users, min(samples, len(complete_users)))
+    results = {}
+
+    # 매칭은 대상 사용자 수만큼 전체 후보를 불러오므로 호출 수를 줄임
+    heavy = [(uid,) for uid in match_users[: max(1, samples // 5)]]
+    results["find_matches"] = measure(find_matches, heavy)
+    results["find_matches (top 50)"] = measure(
+        lambda uid: find_matches(uid, limit=50), heavy
+    )
+
+    # 이전 실행에서 저장된 캐시 목록을 지워 첫 조회(계산 + 저장) 비용을 잼
+    conn = db.get_db_connection()
+    try:
+        conn.execute("DELETE FROM match_cache")
+        conn.execute("DELETE FROM match_cache_users")
+        conn.commit()
+    finally:
+        conn.close()
+    results["get_cached_matches (cold)"] = measure(get_cached_matches, heavy, trace_memory=False)
+    results["get_cached_matches (warm)"] = measure(get_cached_matches, heavy)
+
+    if popular_rooms:
+        results["get_matched_roommates"] = measure(
+            _get_matched_roommates,
+            [(uid, rng.choice(popular_rooms)) for uid in match_users],
+        )
+    if chat_users:
+        results["get_user_chat_rooms"] = measure(
+            db.get_user_chat_rooms,
+            [(uid,) for uid in rng.sample(chat_users, min(samples, len(chat_users)))],
+        )
+    return results
+
+
+def print_results(results, baseline=None):
+    print(f"\n{'benchmark':<28}{'calls':>6}{'p50(ms)':>11}{'p99(ms)':>11}{'peak(MB)':>10}{'vs base':>9}")
+    for name, result in results.items():
+        ratio = ""
+        if baseline and name in baseline and baseline[name]["p50_ms"]:
+            ratio = f"{result['p50_ms'] / baseline[name]['p50_ms']:.2f}x"
+        peak = f"{result['peak_mb']:.1f}" if result["peak_mb"] is not None else "-"
+        print(
+            f"{name:<28}{result['calls']:>6}{result['p50_ms']:>11.2f}{result['p99_ms']:>11.2f}"
+            f"{peak:>10}{ratio:>9}"
+        )
+    # ru_maxrss 단위: 리눅스 KB, macOS 바이트
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    max_rss_mb = max_rss / 2 ** 20 if sys.platform == "darwin" else max_rss / 2 ** 10
+    print(f"\nprocess max RSS: {max_rss_mb:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="매칭/채팅 성능 벤치마크")
+    parser.add_argument("--db", default="benchmark.db", help="벤치마크용 SQLite 파일 (기본: benchmark.db)")
+    parser.add_argument("--users", type=int, default=10000, help="생성할 사용자 수")
+    parser.add_argument("--favorites", type=float, default=3.0, help="사용자당 평균 찜 수")
+    parser.add_argument("--chats", type=float, default=2.0, help="사용자당 평균 채팅방 수")
+    parser.add_argument("--messages", type=float, default=20.0, help="채팅방당 평균 메시지 수")
+    parser.add_argument("--samples", type=int, default=50, help="경로별 측정 호출 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--regenerate", action="store_true", help="기존 벤치마크 DB를 지우고 다시 생성")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--max-regression", type=float, default=1.5,
+                        help="기준 대비 p50이 이 배수를 넘으면 실패 (기본 1.5)")
+    args = parser.parse_args()
+
+    if os.path.abspath(args.db) == os.path.abspath(db.DATABASE_PATH):
+        parser.error("벤치마크는 서비스 DB(users.db)가 아닌 별도 파일에서 실행해야 합니다")
+
+    if args.regenerate:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+
+    if os.path.exists(args.db):
+        print(f"기존 벤치마크 DB 사용: {args.db}")
+        db.DATABASE_PATH = args.db
+    else:
+        print(f"가상 사용자 {args.users:,}명 생성 중: {args.db}")
+        start = time.perf_counter()
+        generate_population(args.db, args.users, args.favorites, args.chats, args.messages, args.seed)
+        print(f"생성 완료 ({time.perf_counter() - start:.1f}s)")
+
+    results = run_benchmarks(args.samples, args.seed)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"결과 저장: {args.output}")
+
+    if baseline:
+        regressions = [
+            name for name, result in results.items()
+            if name in baseline and baseline[name]["p50_ms"]
+            and result["p50_ms"] > baseline[name]["p50_ms"] * args.max_regression
+        ]
+        if regressions:
+            print(f"❌ 성능 회귀: {', '.join(regressions)}")
+            sys.exit(1)
+        print("✅ 성능 회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from pydantic import BaseModel
-import sqlite3
+from database.connection import get_db_connection
 from policy_url_crawler import PolicyURLCrawler
 import asyncio
 from typing import Optional
@@ -34,7 +34,7 @@ async def crawl_policy_url(request: PolicyURLRequest):
         
         if url:
             # DB에 업데이트
-            conn = sqlite3.connect('users.db')
+            conn = get_db_connection()
             cursor = conn.cursor()
             cursor.execute(
                 "UPDATE policies SET application_url = ?, updated_at = datetime('now') WHERE id = ?",
@@ -76,7 +76,7 @@ async def crawl_all_policy_urls(background_tasks: BackgroundTasks):
 async def get_crawl_status():
     """크롤링 상태 확인"""
     try:
-        conn = sqlite3.connect('users.db')
+        conn = get_db_connection()
         cursor = conn.cursor()
         
         # 전체 정책 수
@@ -1,5 +1,4 @@
 import asyncio
-import sqlite3
 import json
 import re
 from datetime import datetime, timedelta
@@ -7,7 +6,7 @@ from typing import List, Dict, Optional, Set
 from dataclasses import dataclass
 from crawlers.housing_policy_crawler import HousingPolicyCrawler
 from crawlers.public_data_api import PublicDataAPIClient
-from database.connection import DATABASE_PATH
+from database.connection import DATABASE_PATH, get_db_connection
 
 
 @dataclass
@@ -63,7 +62,7 @@ class AdvancedPolicyCrawler:
         )
     
     def get_db_connection(self):
-        return sqlite3.connect(self.db_path)
+        return get_db_connection(self.db_path)
     
     def is_housing_policy_relevant(self, title: str, description: str, content: str = "") -> bool:
         """주택정책 관련성 정밀 검사"""
@@ -7,8 +7,7 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List
 from crawlers.advanced_policy_crawler import AdvancedPolicyCrawler
 from crawlers.youth_center_crawler import YouthCenterCrawler
-from database.connection import DATABASE_PATH
-import sqlite3
+from database.connection import DATABASE_PATH, get_db_connection
 
 
 # 로깅 설정
@@ -35,7 +34,7 @@ class PolicyCrawlerScheduler:
         self.last_run_status = None
         
     def get_db_connection(self):
-        return sqlite3.connect(self.db_path)
+        return get_db_connection(self.db_path)
     
     async def run_daily_crawling(self):
         """일일 크롤링 실행"""
@@ -1,5 +1,4 @@
 import asyncio
-import sqlite3
 import json
 import re
 from datetime import datetime
@@ -7,7 +6,7 @@ from typing import List, Dict, Optional
 from playwright.async_api import async_playwright
 from bs4 import BeautifulSoup
 import requests
-from database.connection import DATABASE_PATH
+from database.connection import DATABASE_PATH, get_db_connection
 
 
 class HousingPolicyCrawler:
@@ -21,7 +20,7 @@ class HousingPolicyCrawler:
         ]
         
     def get_db_connection(self):
-        return sqlite3.connect(self.db_path)
+        return get_db_connection(self.db_path)
     
     async def crawl_lh_housing_policies(self) -> List[Dict]:
         """LH 한국토지주택공사 정책 크롤링"""
@@ -1,12 +1,11 @@
 import asyncio
-import sqlite3
 import json
 from datetime import datetime
 from typing import List, Dict, Optional
 from playwright.async_api import async_playwright
 from bs4 import BeautifulSoup
 import requests
-from database.connection import DATABASE_PATH
+from database.connection import DATABASE_PATH, get_db_connection
 
 
 class PolicyCrawler:
@@ -14,7 +13,7 @@ class PolicyCrawler:
         self.db_path = DATABASE_PATH
         
     def get_db_connection(self):
-        return sqlite3.connect(self.db_path)
+        return get_db_connection(self.db_path)
     
     async def crawl_youth_policy(self) -> List[Dict]:
         """청년정책포털에서 정책 정보 크롤링"""
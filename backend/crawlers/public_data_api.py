@@ -1,9 +1,8 @@
 import requests
 import json
-import sqlite3
 from datetime import datetime
 from typing import List, Dict, Optional
-from database.connection import DATABASE_PATH
+from database.connection import DATABASE_PATH, get_db_connection
 
 
 class PublicDataAPIClient:
@@ -21,7 +20,7 @@ class PublicDataAPIClient:
         self.db_path = DATABASE_PATH
     
     def get_db_connection(self):
-        return sqlite3.connect(self.db_path)
+        return get_db_connection(self.db_path)
     
     def get_apartment_complex_info(self, region_code: str = "11", page_no: int = 1, num_of_rows: int = 100) -> List[Dict]:
         """공동주택 단지 정보 조회"""
@@ -6,6 +6,7 @@ from datetime import datetime
 from typing import List, Dict, Optional
 import xml.etree.ElementTree as ET
 import random
+from database.connection import get_db_connection
 
 DATABASE_PATH = "users.db"
 
@@ -359,7 +360,7 @@ class PublicRealEstateAPI:
 
     def save_rooms_to_db(self, rooms_data):
         """방 데이터를 데이터베이스에 저장"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_db_connection(self.db_path)
         cursor = conn.cursor()
         
         saved_count = 0
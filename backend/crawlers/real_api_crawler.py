@@ -1,7 +1,6 @@
 import requests
 import json
 import time
-import sqlite3
 import os
 from datetime import datetime
 from typing import List, Dict
@@ -10,6 +9,7 @@ import urllib.parse
 import urllib3
 from dotenv import load_dotenv
 import random
+from database.connection import get_db_connection
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -61,7 +61,7 @@ MOLIT_API_KEY_DECODED가 .env 파일에 설정되지 않았습니다.
     def clear_fake_data(self):
         """기존 가짜 데이터 삭제"""
         print("🗑️  기존 가짜 데이터 삭제 중...")
-        conn = sqlite3.connect(self.db_path)
+        conn = get_db_connection(self.db_path)
         cursor = conn.cursor()
         
         # 이전에 생성한 가짜 데이터들 삭제
@@ -408,7 +408,7 @@ MOLIT_API_KEY_DECODED가 .env 파일에 설정되지 않았습니다.
     
     def save_real_transactions(self, transactions):
         """실제 거래 데이터를 DB에 저장"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_db_connection(self.db_path)
         cursor = conn.cursor()
         
         saved_count = 0
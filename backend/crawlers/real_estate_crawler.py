@@ -9,6 +9,7 @@ from playwright.async_api import async_playwright
 from bs4 import BeautifulSoup
 import time
 import random
+from database.connection import get_db_connection
 
 DATABASE_PATH = "users.db"
 
@@ -317,7 +318,7 @@ class RealEstateCrawler:
 
     def save_rooms_to_db(self, rooms_data):
         """방 데이터를 데이터베이스에 저장"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_db_connection(self.db_path)
         cursor = conn.cursor()
         
         saved_count = 0
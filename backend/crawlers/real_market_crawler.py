@@ -1,10 +1,10 @@
 import requests
 import json
 import time
-import sqlite3
 from datetime import datetime
 from typing import List, Dict
 import xml.etree.ElementTree as ET
+from database.connection import get_db_connection
 
 DATABASE_PATH = "users.db"
 
@@ -91,7 +91,7 @@ class RealMarketCrawler:
     
     def save_real_transactions(self, transactions):
         """실제 거래 데이터를 DB에 저장"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_db_connection(self.db_path)
         cursor = conn.cursor()
         
         saved_count = 0
@@ -3,12 +3,12 @@
 서울시 부동산 실거래가 정보 API 크롤러
 """
 import requests
-import sqlite3
 import time
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
+from database.connection import get_db_connection
 
 load_dotenv()
 
@@ -237,7 +237,7 @@ class SeoulRealEstateAPICrawler:
 
     def save_to_database(self, properties):
         """매물 데이터를 데이터베이스에 저장"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_db_connection(self.db_path)
         cursor = conn.cursor()
         
         saved_count = 0
@@ -1,11 +1,11 @@
 import requests
 import json
 import time
-import sqlite3
 import os
 from datetime import datetime
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
+from database.connection import get_db_connection
 
 # 환경 변수 로드
 load_dotenv()
@@ -118,7 +118,7 @@ YOUTH_CENTER_API_KEY가 .env 파일에 설정되지 않았습니다.
     
     def save_policies_to_db(self, policies: List[Dict]) -> int:
         """정책 데이터를 데이터베이스에 저장"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_db_connection(self.db_path)
         cursor = conn.cursor()
         
         saved_count = 0
@@ -205,7 +205,7 @@ YOUTH_CENTER_API_KEY가 .env 파일에 설정되지 않았습니다.
     
     def get_personalized_policies(self, user_id: int, limit: int = 10) -> List[Dict]:
         """사용자 맞춤 정책 추천"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_db_connection(self.db_path)
         cursor = conn.cursor()
         
         # 사용자 정보 조회
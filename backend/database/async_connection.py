@@ -0,0 +1,62 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from database import connection
+from database.connection import DB_POOL_SIZE
+
+# DB 전용 스레드 풀 - 동기 sqlite3 작업을 이벤트 루프 밖에서 실행
+# (스레드 수를 커넥션 풀 크기와 맞춰 연결이 계속 재사용되도록 함)
+_db_executor = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix="db")
+
+
+async def run_db(func, *args, **kwargs):
+    """동기 DB 함수를 DB 스레드 풀에서 실행하고 결과를 기다립니다."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, functools.partial(func, *args, **kwargs))
+
+
+def _awaitable(func):
+    """database.connection 함수의 awaitable 버전을 만듭니다."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_db(func, *args, **kwargs)
+    return wrapper
+
+
+def shutdown_db_executor():
+    """진행 중인 DB 작업을 마치고 스레드 풀을 종료합니다 (서버 종료 시)."""
+    _db_executor.shutdown(wait=True)
+
+
+# 사용자
+get_user_by_email = _awaitable(connection.get_user_by_email)
+get_user_by_id = _awaitable(connection.get_user_by_id)
+create_user = _awaitable(connection.create_user)
+create_user_with_email_password = _awaitable(connection.create_user_with_email_password)
+update_user_name = _awaitable(connection.update_user_name)
+update_user_phone = _awaitable(connection.update_user_phone)
+update_user_phone_and_gender = _awaitable(connection.update_user_phone_and_gender)
+update_user_school_verification = _awaitable(connection.update_user_school_verification)
+get_user_info = _awaitable(connection.get_user_info)
+update_user_info = _awaitable(connection.update_user_info)
+
+# 프로필
+get_user_profile = _awaitable(connection.get_user_profile)
+update_user_profile = _awaitable(connection.update_user_profile)
+get_completed_profiles = _awaitable(connection.get_completed_profiles)
+
+# 채팅
+create_chat_room = _awaitable(connection.create_chat_room)
+get_or_create_individual_chat_room = _awaitable(connection.get_or_create_individual_chat_room)
+get_user_chat_rooms = _awaitable(connection.get_user_chat_rooms)
+send_message = _awaitable(connection.send_message)
+get_chat_messages = _awaitable(connection.get_chat_messages)
+get_chat_messages_and_mark_read = _awaitable(connection.get_chat_messages_and_mark_read)
+get_chat_message = _awaitable(connection.get_chat_message)
+is_chat_participant = _awaitable(connection.is_chat_participant)
+get_chat_messages_without_marking_read = _awaitable(connection.get_chat_messages_without_marking_read)
+update_message_status = _awaitable(connection.update_message_status)
+update_last_read_time = _awaitable(connection.update_last_read_time)
+mark_messages_read = _awaitable(connection.mark_messages_read)
+delete_chat_room = _awaitable(connection.delete_chat_room)
@@ -0,0 +1,258 @@
+import json
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import List, Optional
+
+from database import connection
+from database.connection import get_db_connection
+from database.periodic import PeriodicWorker
+
+# 이 기간(일)보다 오래되고 모든 참가자가 읽은 메시지를 아카이브로 옮김
+CHAT_ARCHIVE_AGE_DAYS = int(os.getenv("CHAT_ARCHIVE_AGE_DAYS", "90"))
+
+# 아카이브 세그먼트 하나에 담는 메시지 수 (채워지지 않은 나머지는 다음 실행까지 hot 테이블에 둠)
+CHAT_ARCHIVE_SEGMENT_SIZE = int(os.getenv("CHAT_ARCHIVE_SEGMENT_SIZE", "100"))
+
+# 백그라운드 아카이브/삭제 주기(초)와, 삭제된 채팅방 메시지를 한 트랜잭션에서 지우는 수
+CHAT_ARCHIVE_INTERVAL = float(os.getenv("CHAT_ARCHIVE_INTERVAL", "3600"))
+CHAT_PURGE_BATCH_SIZE = int(os.getenv("CHAT_PURGE_BATCH_SIZE", "500"))
+
+_initialized_archives = set()
+_init_lock = threading.Lock()
+
+
+def get_archive_path(db_path=None) -> str:
+    """아카이브 db 파일 경로 (CHAT_ARCHIVE_PATH가 없으면 서비스 db 옆의 <이름>_archive.db)"""
+    if db_path is None and os.getenv("CHAT_ARCHIVE_PATH"):
+        return os.getenv("CHAT_ARCHIVE_PATH")
+    path = Path(db_path or connection.DATABASE_PATH)
+    return str(path.with_name(f"{path.stem}_archive.db"))
+
+
+def _archive_connection(db_path=None):
+    """아카이브 db 연결 (처음 연결할 때 테이블 생성)"""
+    archive_path = get_archive_path(db_path)
+    conn = get_db_connection(archive_path)
+    key = os.path.abspath(archive_path)
+    if key not in _initialized_archives:
+        with _init_lock:
+            # 세그먼트 = 한 채팅방의 연속된 메시지 묶음 (first_id~last_id, zlib 압축 JSON 줄)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS chat_archive_segments (
+                    room_id INTEGER NOT NULL,
+                    first_id INTEGER NOT NULL,
+                    last_id INTEGER NOT NULL,
+                    message_count INTEGER NOT NULL,
+                    data BLOB NOT NULL,
+                    PRIMARY KEY (room_id, first_id)
+                ) WITHOUT ROWID
+            """)
+            conn.commit()
+            _initialized_archives.add(key)
+    return conn
+
+
+def _pack(rows) -> bytes:
+    return zlib.compress("\n".join(json.dumps(list(row), ensure_ascii=False) for row in rows).encode("utf-8"))
+
+
+def _unpack(data: bytes) -> List[list]:
+    return [json.loads(line) for line in zlib.decompress(data).decode("utf-8").split("\n")]
+
+
+def _archive_room(conn, archive_conn, room_id: int, archived_until: int, cut_id: int) -> int:
+    """room_id의 (archived_until, cut_id] 메시지를 세그먼트 단위로 옮기고, 옮긴 수를 반환합니다.
+
+    세그먼트마다 아카이브에 먼저 커밋한 뒤 hot 테이블에서 지우고 archived_until_id를
+    올리므로, 중간에 멈춰도 메시지가 사라지지 않습니다 (남은 세그먼트는 다음 실행에서 덮어씀).
+    """
+    cursor = conn.cursor()
+    archive_conn.execute(
+        "DELETE FROM chat_archive_segments WHERE room_id = ? AND first_id > ?", (room_id, archived_until)
+    )
+    archive_conn.commit()
+
+    moved = 0
+    while True:
+        # 발신자가 탈퇴한 메시지도 옮기도록 LEFT JOIN (삭제된 메시지는 옮기지 않고 지움)
+        cursor.execute(f"""
+            SELECT {connection._CHAT_MESSAGE_COLUMNS}
+            FROM chat_messages cm
+            LEFT JOIN users u ON cm.sender_id = u.id
+            WHERE cm.room_id = ? AND cm.id > ? AND cm.id <= ?
+            ORDER BY cm.id
+            LIMIT ?
+        """, (room_id, archived_until, cut_id, CHAT_ARCHIVE_SEGMENT_SIZE))
+        rows = cursor.fetchall()
+        if len(rows) < CHAT_ARCHIVE_SEGMENT_SIZE:
+            return moved
+
+        last_id = rows[-1][0]
+        kept = [row for row in rows if not row[9]]
+        if kept:
+            archive_conn.execute("""
+                INSERT OR REPLACE INTO chat_archive_segments (room_id, first_id, last_id, message_count, data)
+                VALUES (?, ?, ?, ?, ?)
+            """, (room_id, kept[0][0], kept[-1][0], len(kept), _pack(kept)))
+            archive_conn.commit()
+
+        cursor.execute(
+            "DELETE FROM chat_messages WHERE room_id = ? AND id > ? AND id <= ?",
+            (room_id, archived_until, last_id),
+        )
+        cursor.execute("UPDATE chat_rooms SET archived_until_id = ? WHERE id = ?", (last_id, room_id))
+        conn.commit()
+        moved += len(rows)
+        archived_until = last_id
+
+
+def archive_old_messages(max_age_days: Optional[int] = None, db_path=None) -> int:
+    """오래된 채팅 메시지를 채팅방별 압축 세그먼트로 아카이브 db에 옮깁니다.
+
+    max_age_days보다 오래되고, 모든 참가자의 읽음 watermark 이하이며, 채팅방의
+    마지막 메시지가 아닌 메시지만 옮기므로 안 읽은 수와 채팅방 목록은 hot
+    테이블만으로 계산됩니다. 옮긴 메시지 수를 반환합니다.
+    """
+    days = CHAT_ARCHIVE_AGE_DAYS if max_age_days is None else max_age_days
+    conn = get_db_connection(db_path)
+    archive_conn = _archive_connection(db_path)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("""
+            SELECT id, archived_until_id, MIN(age_cut, read_cut) FROM (
+                SELECT cr.id, COALESCE(cr.archived_until_id, 0) AS archived_until_id,
+                    (SELECT MAX(m.id) FROM chat_messages m
+                     WHERE m.room_id = cr.id
+                       AND m.id > COALESCE(cr.archived_until_id, 0)
+                       AND m.id < COALESCE(cr.last_message_id, 0)
+                       AND m.created_at < datetime('now', '+9 hours', ?)) AS age_cut,
+                    (SELECT MIN(COALESCE(cp.last_read_message_id, 0)) FROM chat_participants cp
+                     WHERE cp.room_id = cr.id) AS read_cut
+                FROM chat_rooms cr
+            )
+            WHERE MIN(age_cut, read_cut) - archived_until_id >= ?
+        """, (f"-{days} days", CHAT_ARCHIVE_SEGMENT_SIZE))
+        rooms = cursor.fetchall()
+
+        moved = 0
+        for room_id, archived_until, cut_id in rooms:
+            moved += _archive_room(conn, archive_conn, room_id, archived_until, cut_id)
+        if moved:
+            print(f"Archived {moved} chat messages from {len(rooms)} rooms")
+        return moved
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+        archive_conn.close()
+
+
+def load_archived_messages(
+    room_id: int, archived_until: int, limit: int, before_id: Optional[int] = None,
+    after_id: Optional[int] = None, skip: int = 0, db_path=None
+) -> List[list]:
+    """아카이브된 메시지를 필요한 세그먼트만 풀어서 읽습니다.
+
+    _CHAT_MESSAGE_COLUMNS 순서의 행을 반환하며, after_id가 있으면 그 이후를
+    오래된 순으로, 아니면 before_id(없으면 가장 최근) 이전을 최신 순으로
+    skip개 건너뛰고 limit개까지 돌려줍니다.
+    """
+    if limit <= 0:
+        return []
+
+    archive_conn = _archive_connection(db_path)
+    try:
+        if after_id is not None:
+            segments = archive_conn.execute("""
+                SELECT data FROM chat_archive_segments
+                WHERE room_id = ? AND last_id > ? AND first_id <= ?
+                ORDER BY first_id
+            """, (room_id, after_id, archived_until))
+        else:
+            upper = archived_until + 1 if before_id is None else min(before_id, archived_until + 1)
+            segments = archive_conn.execute("""
+                SELECT data FROM chat_archive_segments
+                WHERE room_id = ? AND first_id < ?
+                ORDER BY first_id DESC
+            """, (room_id, upper))
+
+        result = []
+        for (data,) in segments:
+            rows = _unpack(data)
+            if after_id is not None:
+                rows = [row for row in rows if after_id < row[0] <= archived_until]
+            else:
+                rows = [row for row in reversed(rows) if row[0] < upper]
+            if skip >= len(rows):
+                skip -= len(rows)
+                continue
+            result.extend(rows[skip:])
+            skip = 0
+            if len(result) >= limit:
+                break
+        return result[:limit]
+    finally:
+        archive_conn.close()
+
+
+def purge_deleted_rooms(db_path=None) -> int:
+    """삭제된 채팅방의 메시지와 아카이브 세그먼트를 조금씩 나눠 지웁니다.
+
+    CHAT_PURGE_BATCH_SIZE개씩 트랜잭션을 나누므로 큰 채팅방을 지워도 쓰기 잠금을
+    오래 잡지 않습니다. 지운 메시지 수를 반환합니다.
+    """
+    conn = get_db_connection(db_path)
+    archive_conn = _archive_connection(db_path)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT room_id FROM chat_purge_queue ORDER BY queued_at")
+        room_ids = [row[0] for row in cursor.fetchall()]
+
+        deleted = 0
+        for room_id in room_ids:
+            while True:
+                cursor.execute("""
+                    DELETE FROM chat_messages WHERE id IN (
+                        SELECT id FROM chat_messages WHERE room_id = ? LIMIT ?
+                    )
+                """, (room_id, CHAT_PURGE_BATCH_SIZE))
+                conn.commit()
+                deleted += cursor.rowcount
+                if cursor.rowcount < CHAT_PURGE_BATCH_SIZE:
+                    break
+
+            archive_conn.execute("DELETE FROM chat_archive_segments WHERE room_id = ?", (room_id,))
+            archive_conn.commit()
+            cursor.execute("DELETE FROM chat_purge_queue WHERE room_id = ?", (room_id,))
+            conn.commit()
+        return deleted
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+        archive_conn.close()
+
+
+class ChatArchiver(PeriodicWorker):
+    """채팅 메시지 아카이브와 삭제된 채팅방 정리를 주기적으로 실행하는 백그라운드 작업
+
+    서버 시작 시 start(), 종료 시 stop()을 호출하며, 채팅방 삭제 시 wake()로
+    다음 주기를 기다리지 않고 바로 정리합니다.
+    """
+
+    name = "chat-archiver"
+
+    def _work(self, woken: bool):
+        purge_deleted_rooms()
+        # wake()로 깨어난 경우에는 삭제된 채팅방 정리만 수행
+        if not woken:
+            archive_old_messages()
+
+
+chat_archiver = ChatArchiver(CHAT_ARCHIVE_INTERVAL)
@@ -1,24 +1,195 @@
 import sqlite3
 import json
 import os
-from typing import Optional, List
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Tuple
 from pathlib import Path
 from models.user import UserCreate
 from models.profile import UserProfile, ProfileUpdateRequest
 
 DATABASE_PATH = "users.db"
 
+# 커넥션 풀 설정 (워커 프로세스마다 db 파일별로 하나의 풀을 가짐)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
 
-def get_db_connection():
-    """데이터베이스 연결을 반환합니다."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.execute("PRAGMA encoding='UTF-8'")
-    return conn
+# 연결을 새로 만들 때 한 번만 적용하는 PRAGMA
+CONNECTION_PRAGMAS = (
+    "PRAGMA encoding='UTF-8'",
+    "PRAGMA journal_mode=WAL",  # 쓰기 중에도 읽기가 막히지 않도록
+    "PRAGMA synchronous=NORMAL",  # WAL 모드에서는 NORMAL로도 DB 손상 없음
+    "PRAGMA cache_size=-16000",  # 약 16MB 페이지 캐시
+    "PRAGMA mmap_size=134217728",  # 128MB 메모리 맵 I/O
+    "PRAGMA temp_store=MEMORY",
+    # INSERT OR REPLACE로 지워지는 행에도 DELETE 트리거가 실행되도록
+    # (rooms_rtree, room_clusters 같은 파생 테이블 동기화)
+    "PRAGMA recursive_triggers=ON",
+    f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}",
+)
+
+
+class PooledConnection:
+    """풀에서 빌린 sqlite3 연결 래퍼
+
+    sqlite3.Connection과 같은 방식으로 사용하며, close()를 호출하면
+    연결을 닫지 않고 풀에 반납합니다.
+    """
+
+    __slots__ = ("_conn", "_pool")
+
+    def __init__(self, conn: sqlite3.Connection, pool: "ConnectionPool"):
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "_pool", pool)
+
+    def __getattr__(self, name):
+        conn = object.__getattribute__(self, "_conn")
+        if conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(conn, name)
+
+    def __setattr__(self, name, value):
+        # row_factory 등 연결 속성은 실제 연결에 설정
+        setattr(self._conn, name, value)
+
+    def close(self):
+        conn = self._conn
+        if conn is not None:
+            object.__setattr__(self, "_conn", None)
+            self._pool.release(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # sqlite3.Connection과 동일하게 커밋/롤백만 수행 (반납은 close()에서)
+        if exc_type is None:
+            self._conn.commit()
+        else:
+            self._conn.rollback()
+        return False
+
+    def __del__(self):
+        # close()를 빠뜨린 경우에도 연결이 새지 않도록 반납
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """db 파일 하나에 대한 sqlite3 연결 풀
+
+    유휴 연결은 최대 max_idle개까지 보관하고, 동시에 더 많은 연결이
+    필요하면 임시 연결을 만들었다가 반납 시 닫습니다.
+    """
+
+    def __init__(self, db_path: str, max_idle: int = DB_POOL_SIZE):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=DB_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,  # 한 번에 한 스레드만 빌려 쓰므로 안전
+        )
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        conn = None
+        with self._lock:
+            if self._pid != os.getpid():
+                # fork된 워커는 부모 프로세스의 연결을 재사용하지 않음
+                self._idle = []
+                self._pid = os.getpid()
+            if self._idle:
+                conn = self._idle.pop()
+        if conn is None:
+            conn = self._connect()
+        return PooledConnection(conn, self)
+
+    def release(self, conn: sqlite3.Connection):
+        try:
+            # 커밋되지 않은 작업은 버리고 연결 상태 초기화
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+        except sqlite3.Error:
+            conn.close()
+            return
+
+        with self._lock:
+            if self._pid == os.getpid() and len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path=None) -> ConnectionPool:
+    """db 파일 경로에 해당하는 커넥션 풀을 반환합니다."""
+    key = os.path.abspath(str(db_path or DATABASE_PATH))
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(key)
+                _pools[key] = pool
+    return pool
+
+
+def get_db_connection(db_path=None) -> PooledConnection:
+    """풀에서 데이터베이스 연결을 가져옵니다. close() 시 풀로 반납됩니다."""
+    return get_pool(db_path).acquire()
+
+
+@contextmanager
+def db_connection(db_path=None):
+    """풀 연결 컨텍스트 매니저
+
+    정상 종료 시 커밋, 예외 발생 시 롤백한 뒤 연결을 풀에 반납합니다.
+
+        with db_connection() as conn:
+            conn.execute(...)
+    """
+    conn = get_db_connection(db_path)
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def close_all_pools():
+    """모든 풀의 유휴 연결을 닫습니다 (서버 종료 시)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
 
 
 def init_db():
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.execute("PRAGMA encoding='UTF-8'")
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     # 기존 users 테이블 (school_verified, school_verified_at 제거)
@@ -36,74 +207,6 @@ def init_db():
         )
     ''')
     
-    # 기존 테이블에 새 컬럼들 추가
-    try:
-        cursor.execute('ALTER TABLE users ADD COLUMN phone_number TEXT')
-    except sqlite3.OperationalError:
-        pass
-    
-    try:
-        cursor.execute('ALTER TABLE users ADD COLUMN gender TEXT')
-    except sqlite3.OperationalError:
-        pass
-    
-    try:
-        cursor.execute('ALTER TABLE users ADD COLUMN school_email TEXT')
-    except sqlite3.OperationalError:
-        pass
-    
-    try:
-        cursor.execute('ALTER TABLE users ADD COLUMN last_seen_at TIMESTAMP DEFAULT NULL')
-    except sqlite3.OperationalError:
-        pass
-    
-    # user_profiles 테이블에서 gender_preference 컬럼 제거 (SQLite는 DROP COLUMN을 지원하지 않으므로 테이블 재생성)
-    try:
-        # 기존 데이터 백업
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='user_profiles'")
-        if cursor.fetchone():
-            cursor.execute("""
-                CREATE TABLE user_profiles_new (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER UNIQUE NOT NULL,
-                    sleep_type TEXT,
-                    home_time TEXT,
-                    cleaning_frequency TEXT,
-                    cleaning_sensitivity TEXT,
-                    smoking_status TEXT,
-                    noise_sensitivity TEXT,
-                    age INTEGER,
-                    personality_type TEXT,
-                    lifestyle_type TEXT,
-                    budget_range TEXT,
-                    is_complete BOOLEAN DEFAULT FALSE,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (id)
-                )
-            """)
-            
-            # 기존 데이터 복사 (gender 제거)
-            cursor.execute("""
-                INSERT INTO user_profiles_new (
-                    id, user_id, sleep_type, home_time, cleaning_frequency,
-                    cleaning_sensitivity, smoking_status, noise_sensitivity,
-                    age, personality_type, lifestyle_type, budget_range,
-                    is_complete, updated_at
-                )
-                SELECT id, user_id, sleep_type, home_time, cleaning_frequency,
-                       cleaning_sensitivity, smoking_status, noise_sensitivity,
-                       age, personality_type, lifestyle_type, budget_range,
-                       is_complete, updated_at
-                FROM user_profiles
-            """)
-            
-            # 기존 테이블 삭제 후 새 테이블로 이름 변경
-            cursor.execute("DROP TABLE user_profiles")
-            cursor.execute("ALTER TABLE user_profiles_new RENAME TO user_profiles")
-    except sqlite3.OperationalError as e:
-        # 테이블이 존재하지 않거나 이미 마이그레이션된 경우
-        pass
-    
     # 새로운 user_profiles 테이블 (gender 제거)
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS user_profiles (
@@ -271,28 +374,23 @@ def init_db():
         )
     ''')
     
-    # 기존 테이블에 새 컬럼들 추가 (이미 존재하는 경우 에러 무시)
-    try:
-        cursor.execute('ALTER TABLE chat_messages ADD COLUMN sent BOOLEAN DEFAULT 0')
-    except sqlite3.OperationalError:
-        pass
-    
-    try:
-        cursor.execute('ALTER TABLE chat_messages ADD COLUMN delivered BOOLEAN DEFAULT 0')
-    except sqlite3.OperationalError:
-        pass
-    
-    try:
-        cursor.execute('ALTER TABLE chat_messages ADD COLUMN read_status BOOLEAN DEFAULT 0')
-    except sqlite3.OperationalError:
-        pass
-    
     conn.commit()
     
-    conn.close()
+    # 아직 적용되지 않은 스키마 마이그레이션 실행 (컬럼 추가, 인덱스 등)
+    from database.migrations import run_migrations
+    try:
+        run_migrations(conn)
+    finally:
+        conn.close()
     
     # 초기 데이터 백업 파일이 있으면 복원
     restore_initial_data_if_exists()
+    
+    # 시세 통계에 아직 반영되지 않은 매물 반영 (첫 적용 시 전체 계산)
+    from utils.market_price import refresh_market_price_stats
+    refreshed = refresh_market_price_stats()
+    if refreshed:
+        print(f"Market price statistics refreshed for {refreshed} rooms")
 
 
 def create_dummy_data(cursor, conn):
@@ -515,7 +613,7 @@ def get_user_profile(user_id: int) -> Optional[UserProfile]:
 
 
 def update_user_profile(user_id: int, profile_data: ProfileUpdateRequest) -> bool:
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     # 업데이트할 필드들 준비
@@ -560,13 +658,19 @@ def update_user_profile(user_id: int, profile_data: ProfileUpdateRequest) -> boo
     query = f"UPDATE user_profiles SET {', '.join(updates)}, updated_at = CURRENT_TIMESTAMP WHERE user_id = ?"
     cursor.execute(query, values)
     conn.commit()
+    updated = cursor.rowcount > 0
     conn.close()
     
-    return cursor.rowcount > 0
+    if updated:
+        # 이 사용자와 관련된 매칭 캐시 행만 다시 계산 (트리거가 변경을 기록)
+        from utils.match_cache import refresh_match_cache
+        refresh_match_cache()
+    
+    return updated
 
 
 def get_completed_profiles() -> List[UserProfile]:
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("""
         SELECT p.user_id, p.sleep_type, p.home_time, p.cleaning_frequency, 
@@ -797,7 +901,7 @@ def create_test_users_and_profiles(cursor, conn):
 
 def get_user_info(user_id: int):
     """사용자 정보 조회"""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("""
         SELECT bio, current_location, desired_location, budget, 
@@ -823,7 +927,7 @@ def get_user_info(user_id: int):
 
 def update_user_info(user_id: int, info_data: dict) -> bool:
     """사용자 정보 업데이트"""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
@@ -863,7 +967,7 @@ def update_user_info(user_id: int, info_data: dict) -> bool:
 
 def update_user_phone(user_id: int, phone_number: str) -> bool:
     """사용자 전화번호 업데이트"""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
@@ -934,7 +1038,7 @@ def calculate_age_from_resident_number(resident_number: str) -> int:
 
 def update_user_phone_and_gender(user_id: int, phone_number: str, resident_number: str) -> bool:
     """사용자 전화번호와 성별을 함께 업데이트"""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
@@ -956,7 +1060,7 @@ def update_user_phone_and_gender(user_id: int, phone_number: str, resident_numbe
 
 def update_user_school_verification(user_id: int, school_email: str, is_verified: bool = False) -> bool:
     """학교 인증 정보를 users 테이블에 업데이트 (school_email만)"""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
@@ -977,7 +1081,7 @@ def update_user_school_verification(user_id: int, school_email: str, is_verified
 
 def get_user_by_id(user_id: int):
     """사용자 ID로 사용자 정보 조회"""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("""
         SELECT id, email, name, phone_number, gender, school_email
@@ -999,7 +1103,7 @@ def get_user_by_id(user_id: int):
 
 def create_user_with_email_password(email: str, password: str, hashed_password: str):
     """이메일과 비밀번호로만 초기 사용자 생성"""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_db_connection()
     cursor = conn.cursor()
     try:
         cursor.execute(
@@ -1030,7 +1134,7 @@ def create_user_with_email_password(email: str, password: str, hashed_password:
 
 def update_user_name(user_id: int, name: str) -> bool:
     """사용자 이름 업데이트"""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
@@ -1050,7 +1154,7 @@ def update_user_name(user_id: int, name: str) -> bool:
 # 채팅 관련 함수들
 def create_chat_room(created_by: int, room_type: str = 'individual', name: str = None, participant_ids: List[int] = None):
     """새 채팅방 생성"""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
@@ -1082,103 +1186,139 @@ def create_chat_room(created_by: int, room_type: str = 'individual', name: str =
         conn.close()
 
 
+def chat_pair_key(user_id: int, other_id: int) -> str:
+    """1:1 채팅방의 참가자 쌍 키 (순서와 관계없이 같은 값)"""
+    return f"{min(user_id, other_id)}-{max(user_id, other_id)}"
+
+
+def get_or_create_individual_chat_room(user_id: int, other_id: int, name: str = None):
+    """두 사용자의 1:1 채팅방을 찾고, 없으면 만듭니다 (한 트랜잭션).
+
+    pair_key 유니크 인덱스로 바로 찾으므로 채팅방 수와 관계없이 한 번의 조회이며,
+    동시에 여러 번 요청해도 방은 하나만 생깁니다. (room_id, 새로 만들었는지)를
+    반환하고, 실패하면 (None, False)를 반환합니다.
+    """
+    pair_key = chat_pair_key(user_id, other_id)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute("SELECT id FROM chat_rooms WHERE pair_key = ?", (pair_key,))
+        row = cursor.fetchone()
+        if row:
+            return row[0], False
+        
+        # 없으면 쓰기 잠금을 잡고 다시 확인한 뒤 생성 (동시 요청 중복 방지)
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("SELECT id FROM chat_rooms WHERE pair_key = ?", (pair_key,))
+        row = cursor.fetchone()
+        if row:
+            conn.rollback()
+            return row[0], False
+        
+        cursor.execute("""
+            INSERT INTO chat_rooms (room_type, name, created_by, pair_key)
+            VALUES ('individual', ?, ?, ?)
+        """, (name, user_id, pair_key))
+        room_id = cursor.lastrowid
+        cursor.executemany("""
+            INSERT INTO chat_participants (room_id, user_id, last_read_at)
+            VALUES (?, ?, NULL)
+        """, [(room_id, user_id), (room_id, other_id)])
+        
+        conn.commit()
+        return room_id, True
+    except Exception as e:
+        conn.rollback()
+        print(f"Error getting or creating chat room: {e}")
+        return None, False
+    finally:
+        conn.close()
+
+
 def get_user_chat_rooms(user_id: int):
-    """사용자의 채팅방 목록 조회"""
-    conn = sqlite3.connect(DATABASE_PATH)
+    """사용자의 채팅방 목록 조회
+
+    마지막 메시지와 안 읽은 수는 chat_rooms/chat_participants에 저장된 값을
+    사용하므로, 방 개수와 관계없이 쿼리 두 번(방 목록, 전체 참가자)으로 끝납니다.
+    아직 DB에 반영되지 않은 읽음 처리가 있는 방만 안 읽은 수를 다시 셉니다.
+    """
+    from database.read_receipts import read_receipts
+
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
         cursor.execute("""
-            SELECT DISTINCT 
+            SELECT 
                 cr.id, cr.room_type, cr.name, cr.created_at,
                 cm.content as last_message, cm.created_at as last_message_time,
-                u.name as sender_name
-            FROM chat_rooms cr
-            JOIN chat_participants cp ON cr.id = cp.room_id
-            LEFT JOIN chat_messages cm ON cr.id = cm.room_id AND cm.id = (
-                SELECT MAX(id) FROM chat_messages WHERE room_id = cr.id AND is_deleted = FALSE
-            )
+                u.name as sender_name, cp.unread_count, cp.last_read_message_id
+            FROM chat_participants cp
+            JOIN chat_rooms cr ON cr.id = cp.room_id
+            LEFT JOIN chat_messages cm ON cm.id = cr.last_message_id
             LEFT JOIN users u ON cm.sender_id = u.id
             WHERE cp.user_id = ?
-            ORDER BY COALESCE(cm.created_at, cr.created_at) DESC
+            ORDER BY COALESCE(cr.last_message_at, cr.created_at) DESC
         """, (user_id,))
         
         rooms = cursor.fetchall()
         
-        # 각 채팅방의 참가자 정보도 가져오기
-        result = []
-        for room in rooms:
-            room_id = room[0]
-            
-            # 참가자 정보 조회 (프로필 정보 포함)
+        unread_counts = {}
+        for room_id, watermark in read_receipts.pending_for_user(user_id).items():
             cursor.execute("""
-                SELECT u.id, u.name, u.gender, u.school_email,
-                       p.age, p.sleep_type, p.smoking_status, p.personality_type,
-                       p.lifestyle_type, p.budget_range
-                FROM users u
-                JOIN chat_participants cp ON u.id = cp.user_id
-                LEFT JOIN user_profiles p ON u.id = p.user_id
-                WHERE cp.room_id = ?
-            """, (room_id,))
-            participants_data = cursor.fetchall()
+                SELECT COUNT(*) FROM chat_messages
+                WHERE room_id = ? AND id > ? AND sender_id != ? AND is_deleted = FALSE
+            """, (room_id, watermark, user_id))
+            unread_counts[room_id] = cursor.fetchone()[0]
+        
+        # 모든 채팅방의 참가자 정보를 한 번에 조회 (프로필 정보 포함)
+        cursor.execute("""
+            SELECT cp.room_id, u.id, u.name, u.gender, u.school_email,
+                   p.age, p.sleep_type, p.smoking_status, p.personality_type,
+                   p.lifestyle_type, p.budget_range
+            FROM chat_participants mine
+            JOIN chat_participants cp ON cp.room_id = mine.room_id
+            JOIN users u ON u.id = cp.user_id
+            LEFT JOIN user_profiles p ON u.id = p.user_id
+            WHERE mine.user_id = ?
+            ORDER BY cp.room_id, cp.user_id
+        """, (user_id,))
+        
+        participants_by_room = {}
+        for row in cursor.fetchall():
+            p = row[1:]
+            # 학교명 추출 (이메일에서)
+            school = None
+            if p[3]:  # school_email이 있는 경우
+                if 'korea' in p[3].lower():
+                    school = '고려대학교'
+                elif 'sungshin' in p[3].lower():
+                    school = '성신여자대학교'
+                elif 'kyunghee' in p[3].lower():
+                    school = '경희대학교'
+                else:
+                    school = p[3].split('@')[1].replace('.ac.kr', '').capitalize() + '대학교'
             
-            # 참가자 정보를 딕셔너리로 변환
-            participants = []
-            for p in participants_data:
-                # 학교명 추출 (이메일에서)
-                school = None
-                if p[3]:  # school_email이 있는 경우
-                    if 'korea' in p[3].lower():
-                        school = '고려대학교'
-                    elif 'sungshin' in p[3].lower():
-                        school = '성신여자대학교'
-                    elif 'kyunghee' in p[3].lower():
-                        school = '경희대학교'
-                    else:
-                        school = p[3].split('@')[1].replace('.ac.kr', '').capitalize() + '대학교'
-                
-                participant_info = {
-                    'id': p[0],
-                    'name': p[1],
-                    'gender': p[2],
-                    'school': school,
-                    'university': school,  # 호환성을 위해 둘 다 제공
-                    'age': p[4],
-                    'birth_year': 2024 - p[4] if p[4] else None,
-                    'profile': {
-                        'sleep_type': p[5],
-                        'smoking_status': p[6],
-                        'personality_type': p[7],
-                        'lifestyle_type': p[8],
-                        'budget_range': p[9]
-                    }
+            participants_by_room.setdefault(row[0], []).append({
+                'id': p[0],
+                'name': p[1],
+                'gender': p[2],
+                'school': school,
+                'university': school,  # 호환성을 위해 둘 다 제공
+                'age': p[4],
+                'birth_year': 2024 - p[4] if p[4] else None,
+                'profile': {
+                    'sleep_type': p[5],
+                    'smoking_status': p[6],
+                    'personality_type': p[7],
+                    'lifestyle_type': p[8],
+                    'budget_range': p[9]
                 }
-                participants.append(participant_info)
-            
-            # 읽지 않은 메시지 수 계산 (해당 사용자의 last_read_at만 사용)
-            cursor.execute("""
-                SELECT last_read_at FROM chat_participants 
-                WHERE room_id = ? AND user_id = ?
-            """, (room_id, user_id))
-            
-            last_read_result = cursor.fetchone()
-            last_read_at = last_read_result[0] if last_read_result else None
-            
-            if last_read_at:
-                cursor.execute("""
-                    SELECT COUNT(*) FROM chat_messages 
-                    WHERE room_id = ? AND created_at > ? 
-                    AND sender_id != ? AND is_deleted = FALSE
-                """, (room_id, last_read_at, user_id))
-            else:
-                # last_read_at이 NULL이면 모든 메시지가 읽지 않은 것으로 간주
-                cursor.execute("""
-                    SELECT COUNT(*) FROM chat_messages 
-                    WHERE room_id = ? AND sender_id != ? AND is_deleted = FALSE
-                """, (room_id, user_id))
-            
-            unread_count = cursor.fetchone()[0]
-            
+            })
+        
+        result = []
+        for room in rooms:
             result.append({
                 'id': room[0],
                 'room_type': room[1],
@@ -1187,8 +1327,8 @@ def get_user_chat_rooms(user_id: int):
                 'last_message': room[4],
                 'last_message_time': room[5],
                 'last_sender_name': room[6],
-                'participants': participants,
-                'unread_count': unread_count
+                'participants': participants_by_room.get(room[0], []),
+                'unread_count': unread_counts.get(room[0], room[7])
             })
         
         return result
@@ -1197,24 +1337,38 @@ def get_user_chat_rooms(user_id: int):
 
 
 def send_message(room_id: int, sender_id: int, content: str, message_type: str = 'text', file_url: str = None, reply_to_id: int = None):
-    """메시지 전송"""
-    conn = sqlite3.connect(DATABASE_PATH)
+    """메시지 전송 (채팅방이 없거나 참가자가 아니면 None)"""
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
         # 메시지 생성 (기본 상태: sent=true, delivered=false, read=false)
-        # 한국 시간으로 저장
+        # 한국 시간으로 저장 - 참가자 확인도 같은 문장에서 해야 채팅방 삭제와 엇갈리지 않음
         cursor.execute("""
             INSERT INTO chat_messages (room_id, sender_id, message_type, content, file_url, reply_to_id, sent, delivered, read_status, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, 1, 0, 0, datetime('now', '+9 hours'))
-        """, (room_id, sender_id, message_type, content, file_url, reply_to_id))
+            SELECT ?, ?, ?, ?, ?, ?, 1, 0, 0, datetime('now', '+9 hours')
+            WHERE EXISTS (SELECT 1 FROM chat_participants WHERE room_id = ? AND user_id = ?)
+        """, (room_id, sender_id, message_type, content, file_url, reply_to_id, room_id, sender_id))
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return None
         
         message_id = cursor.lastrowid
         
-        # 채팅방 업데이트 시간 갱신
+        # 채팅방 업데이트 시간과 마지막 메시지 갱신
         cursor.execute("""
-            UPDATE chat_rooms SET updated_at = datetime('now', '+9 hours') WHERE id = ?
-        """, (room_id,))
+            UPDATE chat_rooms
+            SET updated_at = datetime('now', '+9 hours'),
+                last_message_id = ?,
+                last_message_at = (SELECT created_at FROM chat_messages WHERE id = ?)
+            WHERE id = ?
+        """, (message_id, message_id, room_id))
+        
+        # 다른 참가자들의 안 읽은 메시지 수 증가
+        cursor.execute("""
+            UPDATE chat_participants SET unread_count = unread_count + 1
+            WHERE room_id = ? AND user_id != ?
+        """, (room_id, sender_id))
         
         # 메시지 전송 직후 delivered 상태로 업데이트 (실시간 시뮬레이션)
         cursor.execute("""
@@ -1231,103 +1385,276 @@ def send_message(room_id: int, sender_id: int, content: str, message_type: str =
         conn.close()
 
 
-def get_chat_messages(room_id: int, user_id: int, limit: int = 50, offset: int = 0, mark_as_read: bool = True):
-    """채팅 메시지 목록 조회"""
-    conn = sqlite3.connect(DATABASE_PATH)
+# 채팅 메시지 조회 컬럼 (_chat_message_dict 순서)
+_CHAT_MESSAGE_COLUMNS = """
+    cm.id, cm.room_id, cm.sender_id, cm.message_type, cm.content,
+    cm.file_url, cm.reply_to_id, cm.created_at, cm.updated_at, cm.is_deleted,
+    u.name as sender_name, cm.sent, cm.delivered, cm.read_status
+"""
+
+
+def _chat_message_dict(msg, read_state) -> dict:
+    """_CHAT_MESSAGE_COLUMNS 행을 API 응답 형식으로 변환 (read_state는 _read_state의 반환 함수)"""
+    unread_count, read_by_other = read_state(msg[0], msg[2])
+    read = bool(msg[13]) or read_by_other
+    return {
+        'id': msg[0],
+        'room_id': msg[1],
+        'sender_id': msg[2],
+        'message_type': msg[3],
+        'content': msg[4],
+        'file_url': msg[5],
+        'reply_to_id': msg[6],
+        'created_at': msg[7],
+        'updated_at': msg[8],
+        'is_deleted': msg[9],
+        'sender_name': msg[10],
+        'sent': bool(msg[11]),
+        'delivered': bool(msg[12]),
+        'read': read,
+        'unread_count': unread_count,  # 읽지 않은 사용자 수
+        'status': 'read' if read else ('delivered' if msg[12] else ('sent' if msg[11] else 'pending'))
+    }
+
+
+def _read_state(cursor, room_id: int):
+    """채팅방 참가자의 읽음 watermark를 한 번 읽어, 메시지별 읽음 상태를
+    계산하는 함수를 반환합니다 (정렬된 watermark에서 이분 탐색).
+
+    반환 함수(message_id, sender_id)는 (발신자를 제외하고 watermark가 message_id보다
+    작은 참가자 수, 발신자 외에 한 명이라도 읽었는지)를 돌려줍니다. 아직 DB에
+    반영되지 않은 읽음 처리도 포함합니다.
+    """
+    from database.read_receipts import read_receipts
+
+    cursor.execute("""
+        SELECT user_id, last_read_message_id FROM chat_participants WHERE room_id = ?
+    """, (room_id,))
+    watermarks = {
+        participant_id: read_receipts.watermark(room_id, participant_id, stored)
+        for participant_id, stored in cursor.fetchall()
+    }
+    sorted_watermarks = sorted(watermarks.values())
+
+    def state(message_id: int, sender_id: int):
+        unread = bisect_left(sorted_watermarks, message_id)
+        read = len(sorted_watermarks) - unread
+        if sender_id in watermarks:
+            if watermarks[sender_id] < message_id:
+                unread -= 1
+            else:
+                read -= 1
+        return unread, read > 0
+
+    return state
+
+
+def _mark_read(cursor, room_id: int, user_id: int, up_to_id: Optional[int] = None) -> Optional[Tuple[int, int]]:
+    """읽음 watermark를 버퍼에 기록하고 (이전 watermark, 기록한 값)을 반환합니다 (참가자가 아니면 None).
+
+    up_to_id가 없거나 마지막 메시지보다 크면 마지막 메시지까지 읽은 것으로 봅니다.
+    기록한 값이 이전 watermark보다 클 때만 읽음 위치가 실제로 앞으로 간 것입니다.
+    """
+    from database.read_receipts import read_receipts
+
+    cursor.execute("""
+        SELECT cr.last_message_id, cp.last_read_message_id
+        FROM chat_participants cp
+        JOIN chat_rooms cr ON cr.id = cp.room_id
+        WHERE cp.room_id = ? AND cp.user_id = ?
+    """, (room_id, user_id))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+
+    previous = read_receipts.watermark(room_id, user_id, row[1])
+    last_message_id = row[0] or 0
+    watermark = last_message_id if up_to_id is None else min(up_to_id, last_message_id)
+    read_receipts.mark(room_id, user_id, watermark)
+    return previous, watermark
+
+
+def get_chat_message(message_id: int):
+    """메시지 한 건 조회 (실시간 전송용, get_chat_messages와 같은 형식)"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute(f"""
+            SELECT {_CHAT_MESSAGE_COLUMNS}
+            FROM chat_messages cm
+            JOIN users u ON cm.sender_id = u.id
+            WHERE cm.id = ?
+        """, (message_id,))
+        msg = cursor.fetchone()
+        if msg is None:
+            return None
+        
+        return _chat_message_dict(msg, _read_state(cursor, msg[1]))
+    finally:
+        conn.close()
+
+
+def is_chat_participant(room_id: int, user_id: int) -> bool:
+    """사용자가 채팅방 참가자인지 확인"""
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
-        # 해당 사용자가 채팅방 참가자인지 확인
         cursor.execute("""
             SELECT 1 FROM chat_participants 
             WHERE room_id = ? AND user_id = ?
         """, (room_id, user_id))
-        
-        if not cursor.fetchone():
-            return []
-        
-        # 메시지 조회 (새로운 상태 필드들 포함)
+        return cursor.fetchone() is not None
+    finally:
+        conn.close()
+
+
+def get_chat_messages(
+    room_id: int, user_id: int, limit: int = 50, offset: int = 0, mark_as_read: bool = True,
+    before_id: Optional[int] = None, after_id: Optional[int] = None
+):
+    """채팅 메시지 목록 조회 (시간 순, 자세한 내용은 _load_chat_messages 참고)"""
+    return _load_chat_messages(room_id, user_id, limit, offset, mark_as_read, before_id, after_id)[0]
+
+
+def get_chat_messages_and_mark_read(
+    room_id: int, user_id: int, limit: int = 50, offset: int = 0,
+    before_id: Optional[int] = None, after_id: Optional[int] = None
+) -> Tuple[list, Optional[int]]:
+    """채팅 메시지 목록을 조회하고 읽음 처리합니다.
+
+    (메시지 목록, 새 읽음 watermark)를 반환합니다. watermark는 조회한 페이지와
+    관계없이 채팅방의 마지막 메시지 id이며, 이미 거기까지 읽었거나 참가자가
+    아니면 None입니다 (읽음 위치가 바뀌었을 때만 알리면 됨).
+    """
+    return _load_chat_messages(room_id, user_id, limit, offset, True, before_id, after_id)
+
+
+def _load_chat_messages(
+    room_id: int, user_id: int, limit: int, offset: int, mark_as_read: bool,
+    before_id: Optional[int], after_id: Optional[int]
+) -> Tuple[list, Optional[int]]:
+    """채팅 메시지 목록 조회 (시간 순)
+
+    before_id/after_id를 주면 (room_id, id) 인덱스로 바로 찾아가는 커서 방식으로
+    조회합니다. before_id는 그 메시지 이전의 최근 limit개(이전 기록 불러오기),
+    after_id는 그 메시지 이후의 limit개(새 메시지만 받기)이며, 둘 다 없으면
+    기존처럼 최근 메시지부터 offset만큼 건너뜁니다.
+    hot 테이블에 남은 메시지보다 더 이전을 요청하면 아카이브에서 필요한
+    세그먼트만 읽어 이어 붙입니다. (메시지 목록, 새 읽음 watermark)를 반환하며,
+    읽음 위치가 앞으로 가지 않았으면 watermark는 None입니다.
+    """
+    from database.chat_archive import load_archived_messages
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    try:
+        # 해당 사용자가 채팅방 참가자인지 확인 (아카이브된 범위도 함께 조회)
         cursor.execute("""
-            SELECT 
-                cm.id, cm.room_id, cm.sender_id, cm.message_type, cm.content,
-                cm.file_url, cm.reply_to_id, cm.created_at, cm.updated_at, cm.is_deleted,
-                u.name as sender_name, cm.sent, cm.delivered, cm.read_status
-            FROM chat_messages cm
-            JOIN users u ON cm.sender_id = u.id
-            WHERE cm.room_id = ? AND cm.is_deleted = FALSE
-            ORDER BY cm.created_at DESC
-            LIMIT ? OFFSET ?
-        """, (room_id, limit, offset))
+            SELECT cr.archived_until_id FROM chat_participants cp
+            JOIN chat_rooms cr ON cr.id = cp.room_id
+            WHERE cp.room_id = ? AND cp.user_id = ?
+        """, (room_id, user_id))
         
-        messages = cursor.fetchall()
+        participant = cursor.fetchone()
+        if not participant:
+            return [], None
+        archived_until = participant[0]
+        
+        # 메시지 조회 (새로운 상태 필드들 포함) - 최신 메시지가 앞에 오도록 가져옴
+        if after_id is not None:
+            cursor.execute(f"""
+                SELECT {_CHAT_MESSAGE_COLUMNS}
+                FROM chat_messages cm
+                JOIN users u ON cm.sender_id = u.id
+                WHERE cm.room_id = ? AND cm.id > ? AND cm.is_deleted = FALSE
+                ORDER BY cm.id ASC
+                LIMIT ?
+            """, (room_id, after_id, limit))
+            messages = cursor.fetchall()
+            if archived_until and after_id < archived_until:
+                archived = load_archived_messages(room_id, archived_until, limit, after_id=after_id)
+                messages = (archived + messages)[:limit]
+            messages = messages[::-1]
+        elif before_id is not None:
+            cursor.execute(f"""
+                SELECT {_CHAT_MESSAGE_COLUMNS}
+                FROM chat_messages cm
+                JOIN users u ON cm.sender_id = u.id
+                WHERE cm.room_id = ? AND cm.id < ? AND cm.is_deleted = FALSE
+                ORDER BY cm.id DESC
+                LIMIT ?
+            """, (room_id, before_id, limit))
+            messages = cursor.fetchall()
+            if archived_until and len(messages) < limit:
+                messages += load_archived_messages(
+                    room_id, archived_until, limit - len(messages), before_id=before_id
+                )
+        else:
+            cursor.execute(f"""
+                SELECT {_CHAT_MESSAGE_COLUMNS}
+                FROM chat_messages cm
+                JOIN users u ON cm.sender_id = u.id
+                WHERE cm.room_id = ? AND cm.is_deleted = FALSE
+                ORDER BY cm.created_at DESC
+                LIMIT ? OFFSET ?
+            """, (room_id, limit, offset))
+            messages = cursor.fetchall()
+            if archived_until and len(messages) < limit:
+                cursor.execute("""
+                    SELECT COUNT(*) FROM chat_messages WHERE room_id = ? AND is_deleted = FALSE
+                """, (room_id,))
+                hot_count = cursor.fetchone()[0]
+                messages += load_archived_messages(
+                    room_id, archived_until, limit - len(messages), skip=max(0, offset - hot_count)
+                )
         
-        # 읽음 상태로 마크 (기본값 True)
+        # 읽음 상태로 마크 (기본값 True) - 마지막 메시지까지 읽음 watermark만 기록
+        watermark = None
         if mark_as_read:
-            cursor.execute("""
-                UPDATE chat_participants 
-                SET last_read_at = datetime('now', '+9 hours')
-                WHERE room_id = ? AND user_id = ?
-            """, (room_id, user_id))
-            
-            # 내가 받은 메시지들을 read 상태로 업데이트
-            cursor.execute("""
-                UPDATE chat_messages 
-                SET read_status = 1
-                WHERE room_id = ? AND sender_id != ? AND read_status = 0
-            """, (room_id, user_id))
-            
-            conn.commit()
+            previous, recorded = _mark_read(cursor, room_id, user_id)
+            if recorded > previous:
+                watermark = recorded
         
-        # 각 메시지에 대해 읽지 않은 사용자 수 계산
+        # 각 메시지의 읽음 상태 계산 (참가자 watermark는 한 번만 조회)
+        read_state = _read_state(cursor, room_id)
         result_messages = []
         for msg in reversed(messages):  # 시간 순 정렬
-            # 해당 메시지를 읽지 않은 참가자 수 계산 (발신자 제외)
-            cursor.execute("""
-                SELECT COUNT(*) FROM chat_participants cp
-                WHERE cp.room_id = ? 
-                AND cp.user_id != ? 
-                AND (cp.last_read_at IS NULL OR cp.last_read_at < ?)
-            """, (room_id, msg[2], msg[7]))  # msg[2]는 sender_id, msg[7]은 created_at
-            
-            unread_count = cursor.fetchone()[0]
-            
-            message_data = {
-                'id': msg[0],
-                'room_id': msg[1],
-                'sender_id': msg[2],
-                'message_type': msg[3],
-                'content': msg[4],
-                'file_url': msg[5],
-                'reply_to_id': msg[6],
-                'created_at': msg[7],
-                'updated_at': msg[8],
-                'is_deleted': msg[9],
-                'sender_name': msg[10],
-                'sent': bool(msg[11]),
-                'delivered': bool(msg[12]),
-                'read': bool(msg[13]),
-                'unread_count': unread_count,  # 읽지 않은 사용자 수
-                'status': 'read' if msg[13] else ('delivered' if msg[12] else ('sent' if msg[11] else 'pending'))
-            }
-            result_messages.append(message_data)
+            result_messages.append(_chat_message_dict(msg, read_state))
         
-        return result_messages
+        return result_messages, watermark
         
     finally:
         conn.close()
 
 
-def get_chat_messages_without_marking_read(room_id: int, user_id: int, limit: int = 50, offset: int = 0):
+def get_chat_messages_without_marking_read(
+    room_id: int, user_id: int, limit: int = 50, offset: int = 0,
+    before_id: Optional[int] = None, after_id: Optional[int] = None
+):
     """읽음 상태를 업데이트하지 않고 채팅 메시지 목록 조회 (실시간 업데이트용)"""
-    return get_chat_messages(room_id, user_id, limit, offset, mark_as_read=False)
+    return get_chat_messages(
+        room_id, user_id, limit, offset, mark_as_read=False, before_id=before_id, after_id=after_id
+    )
+
 
+def update_message_status(message_id: int, status_type: str, user_id: Optional[int] = None):
+    """메시지 상태 업데이트 (sent, delivered, read)
 
-def update_message_status(message_id: int, status_type: str):
-    """메시지 상태 업데이트 (sent, delivered, read)"""
-    conn = sqlite3.connect(DATABASE_PATH)
+    user_id와 함께 'read'를 주면 메시지 행 대신 그 사용자의 읽음 watermark를
+    이 메시지까지 올립니다 (참가자가 아니면 False).
+    """
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
+        if status_type == 'read' and user_id is not None:
+            cursor.execute("SELECT room_id FROM chat_messages WHERE id = ?", (message_id,))
+            row = cursor.fetchone()
+            return row is not None and _mark_read(cursor, row[0], user_id, message_id) is not None
+        
         if status_type == 'sent':
             cursor.execute("UPDATE chat_messages SET sent = 1 WHERE id = ?", (message_id,))
         elif status_type == 'delivered':
@@ -1345,32 +1672,38 @@ def update_message_status(message_id: int, status_type: str):
         conn.close()
 
 
-def update_last_read_time(room_id: int, user_id: int):
-    """사용자의 마지막 읽은 시간 업데이트"""
-    conn = sqlite3.connect(DATABASE_PATH)
+def mark_messages_read(room_id: int, user_id: int, up_to_id: Optional[int] = None) -> Optional[Tuple[int, int]]:
+    """room_id의 up_to_id(없으면 마지막 메시지)까지 읽음 처리
+
+    watermark를 버퍼에 기록하고 바로 반환하며, DB에는 read_receipts가 모아서
+    반영합니다. (이전 watermark, 기록한 watermark)를 반환하고, 참가자가 아니면
+    None을 반환합니다.
+    """
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
-        cursor.execute("""
-            UPDATE chat_participants 
-            SET last_read_at = datetime('now', '+9 hours')
-            WHERE room_id = ? AND user_id = ?
-        """, (room_id, user_id))
-        conn.commit()
-        return cursor.rowcount > 0
-    except Exception as e:
-        conn.rollback()
-        print(f"Error updating last read time: {e}")
-        return False
+        return _mark_read(cursor, room_id, user_id, up_to_id)
     finally:
         conn.close()
 
 
+def update_last_read_time(room_id: int, user_id: int):
+    """사용자의 마지막 읽은 시간 업데이트 (마지막 메시지까지 읽음 처리)"""
+    return mark_messages_read(room_id, user_id) is not None
+
+
 def delete_chat_room(room_id: int, user_id: int):
-    """채팅방 완전 삭제 - DB에서 모든 관련 데이터 삭제"""
+    """채팅방 완전 삭제 - DB에서 모든 관련 데이터 삭제
+
+    채팅방과 참가자는 바로 지우고, 메시지(아카이브 포함)는 정리 대기열에 넣어
+    백그라운드에서 나눠 지웁니다 (채팅방이 없으므로 더 이상 조회되지 않음).
+    """
+    from database.chat_archive import chat_archiver
+
     print(f"🗑️ [DB DELETE] 시작: room_id={room_id}, user_id={user_id}")
     
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
@@ -1388,11 +1721,10 @@ def delete_chat_room(room_id: int, user_id: int):
             print(f"❌ [DB DELETE] 사용자가 해당 채팅방의 참가자가 아님")
             return False
         
-        # 1. 채팅 메시지 삭제
-        print(f"🔄 [DB DELETE] 채팅 메시지 삭제 중...")
-        cursor.execute("DELETE FROM chat_messages WHERE room_id = ?", (room_id,))
-        messages_deleted = cursor.rowcount
-        print(f"🔄 [DB DELETE] 채팅 메시지 삭제 완료: {messages_deleted}개")
+        # 1. 채팅 메시지는 백그라운드 삭제 대기열에 등록
+        print(f"🔄 [DB DELETE] 채팅 메시지 삭제 예약 중...")
+        cursor.execute("INSERT OR IGNORE INTO chat_purge_queue (room_id) VALUES (?)", (room_id,))
+        print(f"🔄 [DB DELETE] 채팅 메시지 삭제 예약 완료")
         
         # 2. 채팅 참가자 삭제
         print(f"🔄 [DB DELETE] 채팅 참가자 삭제 중...")
@@ -1407,7 +1739,8 @@ def delete_chat_room(room_id: int, user_id: int):
         print(f"🔄 [DB DELETE] 채팅방 삭제 완료: {rooms_deleted}개")
         
         conn.commit()
-        print(f"✅ [DB DELETE] 완전 삭제 처리 완료 (메시지: {messages_deleted}, 참가자: {participants_deleted}, 방: {rooms_deleted})")
+        chat_archiver.wake()
+        print(f"✅ [DB DELETE] 완전 삭제 처리 완료 (참가자: {participants_deleted}, 방: {rooms_deleted}, 메시지는 백그라운드 삭제)")
         return True
         
     except Exception as e:
@@ -1425,7 +1758,7 @@ def restore_initial_data_if_exists():
     if not backup_path.exists():
         print("No initial data backup found, using default dummy data creation")
         # 백업이 없으면 기존 더미 데이터 생성 방식 사용
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = get_db_connection()
         cursor = conn.cursor()
         create_dummy_data(cursor, conn)
         create_test_users_and_profiles(cursor, conn)
@@ -1553,6 +1886,8 @@ def restore_initial_data_if_exists():
                     is_active BOOLEAN DEFAULT TRUE
                 )
             ''')
+            # 테이블을 다시 만들었으므로 인덱스도 다시 생성
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_policies_active_views ON policies(is_active, view_count)')
             
             for policy in backup_data['policies']:
                 cursor.execute('''
@@ -1593,7 +1928,7 @@ def restore_initial_data_if_exists():
         print(f"Error restoring initial data: {e}")
         print("Falling back to default dummy data creation...")
         # 복원 실패 시 기존 방식으로 폴백
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = get_db_connection()
         cursor = conn.cursor()
         create_dummy_data(cursor, conn)
         create_test_users_and_profiles(cursor, conn)
@@ -0,0 +1,73 @@
+import os
+
+from database.write_behind import WriteBehindBuffer
+
+# 누적된 증가분을 DB에 반영하는 주기(초)와, 주기 전이라도 바로 반영할 누적 건수
+COUNTER_FLUSH_INTERVAL = float(os.getenv("COUNTER_FLUSH_INTERVAL", "5"))
+COUNTER_FLUSH_MAX_PENDING = int(os.getenv("COUNTER_FLUSH_MAX_PENDING", "1000"))
+
+# 버퍼링하는 카운터 (테이블, 컬럼) -> 행을 찾는 키 컬럼
+COUNTER_COLUMNS = {
+    ("rooms", "view_count"): "room_id",
+    ("rooms", "favorite_count"): "room_id",
+    ("policies", "view_count"): "id",
+}
+
+
+class CounterBuffer(WriteBehindBuffer):
+    """조회수/찜 수 증가분을 메모리에 모았다가 한 트랜잭션으로 반영하는 서비스
+
+    요청마다 UPDATE + 커밋으로 쓰기 잠금을 잡는 대신, 키별 증가분을 합산해
+    두고 COUNTER_FLUSH_INTERVAL초마다, 또는 COUNTER_FLUSH_MAX_PENDING건이
+    쌓이면, 그리고 서버 종료 시 한 번에 반영합니다. 조회하는 쪽은
+    pending()/merged()로 아직 반영되지 않은 증가분을 더해 정확한 값을 보여줍니다.
+    버퍼 항목은 {(테이블, 컬럼): {키: 증가분}}입니다.
+    """
+
+    name = "counters"
+
+    def increment(self, table: str, column: str, key, delta: int = 1):
+        """카운터 증가분을 버퍼에 더합니다 (DB에는 나중에 반영)."""
+        if (table, column) not in COUNTER_COLUMNS:
+            raise ValueError(f"Unknown counter: {table}.{column}")
+
+        with self._lock:
+            counter = self._pending.setdefault((table, column), {})
+            counter[key] = counter.get(key, 0) + delta
+            self._added()
+
+    def pending(self, table: str, column: str, key) -> int:
+        """아직 DB에 반영되지 않은 증가분을 반환합니다."""
+        with self._lock:
+            return (
+                self._pending.get((table, column), {}).get(key, 0)
+                + self._flushing.get((table, column), {}).get(key, 0)
+            )
+
+    def merged(self, table: str, column: str, key, stored) -> int:
+        """DB에서 읽은 값에 대기 중인 증가분을 더한 값을 반환합니다."""
+        return (stored or 0) + self.pending(table, column, key)
+
+    def _merge(self, target, batch) -> int:
+        merged = 0
+        for counter_key, deltas in batch.items():
+            counter = target.setdefault(counter_key, {})
+            for key, delta in deltas.items():
+                counter[key] = counter.get(key, 0) + delta
+                merged += 1
+        return merged
+
+    def _write(self, cursor, batch) -> int:
+        flushed = 0
+        for (table, column), deltas in batch.items():
+            key_column = COUNTER_COLUMNS[(table, column)]
+            rows = [(delta, key) for key, delta in deltas.items() if delta]
+            cursor.executemany(
+                f"UPDATE {table} SET {column} = {column} + ? WHERE {key_column} = ?",
+                rows,
+            )
+            flushed += len(rows)
+        return flushed
+
+
+counters = CounterBuffer(COUNTER_FLUSH_INTERVAL, COUNTER_FLUSH_MAX_PENDING)
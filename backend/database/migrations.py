@@ -0,0 +1,867 @@
+"""
+버전 기반 스키마 마이그레이션
+
+schema_version 테이블에 적용된 버전을 기록하고, 아직 적용되지 않은
+단계만 순서대로 한 번씩 실행합니다. 새 스키마 변경은 MIGRATIONS 목록
+끝에 (버전, 설명, 함수)를 추가하면 됩니다.
+
+    python -m database.migrations          # 적용 상태 출력
+    python -m database.migrations --plans  # 주요 쿼리 실행 계획 출력
+"""
+
+import sqlite3
+import sys
+from typing import Callable, List, Tuple
+
+
+def _columns(cursor, table: str) -> List[str]:
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def _add_missing_columns(cursor, table: str, columns: List[Tuple[str, str]]):
+    existing = _columns(cursor, table)
+    for name, definition in columns:
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+
+def _m001_users_contact_columns(cursor):
+    """users 테이블에 연락처/인증 컬럼 추가"""
+    _add_missing_columns(cursor, "users", [
+        ("phone_number", "TEXT"),
+        ("gender", "TEXT"),
+        ("school_email", "TEXT"),
+        ("last_seen_at", "TIMESTAMP DEFAULT NULL"),
+    ])
+
+
+def _m002_user_profiles_drop_gender(cursor):
+    """user_profiles에서 gender/gender_preference 컬럼 제거 (테이블 재생성)"""
+    existing = _columns(cursor, "user_profiles")
+    if "gender" not in existing and "gender_preference" not in existing:
+        return
+
+    cursor.execute("""
+        CREATE TABLE user_profiles_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER UNIQUE NOT NULL,
+            sleep_type TEXT,
+            home_time TEXT,
+            cleaning_frequency TEXT,
+            cleaning_sensitivity TEXT,
+            smoking_status TEXT,
+            noise_sensitivity TEXT,
+            age INTEGER,
+            personality_type TEXT,
+            lifestyle_type TEXT,
+            budget_range TEXT,
+            is_complete BOOLEAN DEFAULT FALSE,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    """)
+    cursor.execute("""
+        INSERT INTO user_profiles_new (
+            id, user_id, sleep_type, home_time, cleaning_frequency,
+            cleaning_sensitivity, smoking_status, noise_sensitivity,
+            age, personality_type, lifestyle_type, budget_range,
+            is_complete, updated_at
+        )
+        SELECT id, user_id, sleep_type, home_time, cleaning_frequency,
+               cleaning_sensitivity, smoking_status, noise_sensitivity,
+               age, personality_type, lifestyle_type, budget_range,
+               is_complete, updated_at
+        FROM user_profiles
+    """)
+    cursor.execute("DROP TABLE user_profiles")
+    cursor.execute("ALTER TABLE user_profiles_new RENAME TO user_profiles")
+
+
+def _m003_chat_message_status_columns(cursor):
+    """chat_messages에 전송/수신/읽음 상태 컬럼 추가"""
+    _add_missing_columns(cursor, "chat_messages", [
+        ("sent", "BOOLEAN DEFAULT 0"),
+        ("delivered", "BOOLEAN DEFAULT 0"),
+        ("read_status", "BOOLEAN DEFAULT 0"),
+    ])
+
+
+def _m004_hot_query_indexes(cursor):
+    """자주 조회되는 컬럼에 보조 인덱스 생성"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_chat_messages_room_created ON chat_messages(room_id, created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_chat_participants_user ON chat_participants(user_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_favorites_room ON favorites(room_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_rooms_active_lat_lng ON rooms(is_active, latitude, longitude)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_policies_active_views ON policies(is_active, view_count)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_policy_views_user ON policy_views(user_id)")
+
+
+def _m005_rooms_rtree(cursor):
+    """지도 범위 검색용 R*Tree 공간 인덱스 (활성 매물만 포함)
+
+    rooms 테이블의 트리거로 동기화되므로 API, 크롤러 일괄 저장, 비활성화
+    모두 별도 처리 없이 반영됩니다.
+    """
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS rooms_rtree USING rtree(
+                id, min_lat, max_lat, min_lng, max_lng
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        # RTREE 모듈 없이 빌드된 SQLite - 지도 검색은 일반 인덱스로 동작
+        print(f"R*Tree not available, map search will use B-tree index: {e}")
+        return
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS rooms_rtree_insert AFTER INSERT ON rooms
+        WHEN NEW.is_active
+        BEGIN
+            INSERT OR REPLACE INTO rooms_rtree (id, min_lat, max_lat, min_lng, max_lng)
+            VALUES (NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS rooms_rtree_update
+        AFTER UPDATE OF latitude, longitude, is_active ON rooms
+        BEGIN
+            DELETE FROM rooms_rtree WHERE id = OLD.id;
+            INSERT INTO rooms_rtree (id, min_lat, max_lat, min_lng, max_lng)
+            SELECT NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude
+            WHERE NEW.is_active;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS rooms_rtree_delete AFTER DELETE ON rooms
+        BEGIN
+            DELETE FROM rooms_rtree WHERE id = OLD.id;
+        END
+    """)
+    cursor.execute("""
+        INSERT OR REPLACE INTO rooms_rtree (id, min_lat, max_lat, min_lng, max_lng)
+        SELECT id, latitude, latitude, longitude, longitude FROM rooms WHERE is_active
+    """)
+
+
+# 지도 클러스터 격자 레벨 - 레벨 L의 셀 크기는 360 / 2^L 도 (6: 약 620km ~ 16: 약 600m)
+ROOM_CLUSTER_LEVELS = range(6, 17)
+
+# 좌표 -> 격자 셀 번호 ({row}은 NEW/OLD/r, 셀 크기는 room_cluster_levels.cell_size)
+_CELL_X = "CAST(({row}.longitude + 180.0) / cell_size AS INTEGER)"
+_CELL_Y = "CAST(({row}.latitude + 90.0) / cell_size AS INTEGER)"
+
+
+def _room_cluster_add_sql(row: str) -> str:
+    """매물 한 건을 모든 레벨의 클러스터 셀에 더하는 SQL"""
+    return f"""
+        INSERT INTO room_clusters (
+            level, cell_x, cell_y, transaction_type,
+            room_count, sum_lat, sum_lng, sum_deposit, min_deposit
+        )
+        SELECT level, {_CELL_X.format(row=row)}, {_CELL_Y.format(row=row)}, {row}.transaction_type,
+               1, {row}.latitude, {row}.longitude, {row}.price_deposit, {row}.price_deposit
+        FROM room_cluster_levels
+        WHERE {row}.is_active
+        ON CONFLICT (level, cell_x, cell_y, transaction_type) DO UPDATE SET
+            room_count = room_count + 1,
+            sum_lat = sum_lat + excluded.sum_lat,
+            sum_lng = sum_lng + excluded.sum_lng,
+            sum_deposit = sum_deposit + excluded.sum_deposit,
+            min_deposit = MIN(min_deposit, excluded.min_deposit);
+    """
+
+
+def _room_cluster_remove_sql(row: str) -> str:
+    """매물 한 건을 모든 레벨의 클러스터 셀에서 빼는 SQL
+
+    빠지는 매물이 셀의 최저 보증금이었을 때만 해당 셀 범위의 매물로
+    최저값을 다시 계산하고, 비게 된 셀은 삭제합니다.
+    """
+    cells = f"""
+        SELECT level, {_CELL_X.format(row=row)}, {_CELL_Y.format(row=row)}
+        FROM room_cluster_levels
+    """
+    return f"""
+        UPDATE room_clusters SET
+            room_count = room_count - 1,
+            sum_lat = sum_lat - {row}.latitude,
+            sum_lng = sum_lng - {row}.longitude,
+            sum_deposit = sum_deposit - {row}.price_deposit,
+            min_deposit = CASE
+                WHEN {row}.price_deposit > min_deposit THEN min_deposit
+                ELSE (
+                    SELECT MIN(r.price_deposit)
+                    FROM rooms r, room_cluster_levels l
+                    WHERE l.level = room_clusters.level
+                    AND r.is_active = 1
+                    AND r.latitude >= room_clusters.cell_y * l.cell_size - 90.0
+                    AND r.latitude < (room_clusters.cell_y + 1) * l.cell_size - 90.0
+                    AND r.longitude >= room_clusters.cell_x * l.cell_size - 180.0
+                    AND r.longitude < (room_clusters.cell_x + 1) * l.cell_size - 180.0
+                    AND r.transaction_type = room_clusters.transaction_type
+                )
+            END
+        WHERE {row}.is_active
+        AND transaction_type = {row}.transaction_type
+        AND (level, cell_x, cell_y) IN ({cells});
+
+        DELETE FROM room_clusters
+        WHERE room_count <= 0
+        AND transaction_type = {row}.transaction_type
+        AND (level, cell_x, cell_y) IN ({cells});
+    """
+
+
+def _m006_room_clusters(cursor):
+    """지도 클러스터용 격자 집계 테이블 (레벨/셀/거래유형별 개수, 좌표 합, 보증금 합/최저)
+
+    rooms 트리거로 매물 추가/수정/비활성화/삭제 시 해당 셀만 증분 갱신합니다.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS room_cluster_levels (
+            level INTEGER PRIMARY KEY,
+            cell_size REAL NOT NULL
+        )
+    """)
+    cursor.executemany(
+        "INSERT OR IGNORE INTO room_cluster_levels (level, cell_size) VALUES (?, ?)",
+        [(level, 360.0 / (2 ** level)) for level in ROOM_CLUSTER_LEVELS]
+    )
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS room_clusters (
+            level INTEGER NOT NULL,
+            cell_x INTEGER NOT NULL,
+            cell_y INTEGER NOT NULL,
+            transaction_type TEXT NOT NULL,
+            room_count INTEGER NOT NULL,
+            sum_lat REAL NOT NULL,
+            sum_lng REAL NOT NULL,
+            sum_deposit INTEGER NOT NULL,
+            min_deposit INTEGER,
+            PRIMARY KEY (level, cell_x, cell_y, transaction_type)
+        ) WITHOUT ROWID
+    """)
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS room_clusters_insert AFTER INSERT ON rooms
+        BEGIN
+            {_room_cluster_add_sql("NEW")}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS room_clusters_update
+        AFTER UPDATE OF latitude, longitude, is_active, price_deposit, transaction_type ON rooms
+        BEGIN
+            {_room_cluster_remove_sql("OLD")}
+            {_room_cluster_add_sql("NEW")}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS room_clusters_delete AFTER DELETE ON rooms
+        BEGIN
+            {_room_cluster_remove_sql("OLD")}
+        END
+    """)
+
+    cursor.execute("DELETE FROM room_clusters")
+    cursor.execute(f"""
+        INSERT INTO room_clusters (
+            level, cell_x, cell_y, transaction_type,
+            room_count, sum_lat, sum_lng, sum_deposit, min_deposit
+        )
+        SELECT level, {_CELL_X.format(row="r")}, {_CELL_Y.format(row="r")}, r.transaction_type,
+               COUNT(*), SUM(r.latitude), SUM(r.longitude), SUM(r.price_deposit), MIN(r.price_deposit)
+        FROM rooms r CROSS JOIN room_cluster_levels
+        WHERE r.is_active
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+# 지도 검색 캐시 타일 크기 (360 / 2^12 도, 약 10km) - 트리거에 고정되므로 바꾸려면 새 마이그레이션 필요
+ROOM_TILE_SIZE = 360.0 / 2 ** 12
+
+# 핀 정보(RoomPin)에 보이는 컬럼 - 이 컬럼이 바뀔 때만 타일 버전을 올림
+_ROOM_PIN_COLUMNS = (
+    "room_id, address, latitude, longitude, transaction_type, price_deposit, price_monthly, "
+    "area, rooms, floor, risk_score, favorite_count, is_active"
+)
+
+
+def _room_tile_bump_sql(row: str) -> str:
+    """매물이 속한 타일의 버전을 1 올리는 SQL"""
+    return f"""
+        INSERT INTO room_tile_versions (tile_x, tile_y, version)
+        VALUES (
+            CAST(({row}.longitude + 180.0) / {ROOM_TILE_SIZE!r} AS INTEGER),
+            CAST(({row}.latitude + 90.0) / {ROOM_TILE_SIZE!r} AS INTEGER),
+            1
+        )
+        ON CONFLICT (tile_x, tile_y) DO UPDATE SET version = version + 1;
+    """
+
+
+def _m007_room_tile_versions(cursor):
+    """지도 검색 타일 캐시 무효화용 타일별 버전 테이블
+
+    API 등록, 크롤러 저장, 비활성화 등 어느 프로세스에서 rooms를 바꿔도
+    트리거가 바뀐 타일의 버전만 올리므로 캐시는 해당 타일만 다시 읽습니다.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS room_tile_versions (
+            tile_x INTEGER NOT NULL,
+            tile_y INTEGER NOT NULL,
+            version INTEGER NOT NULL,
+            PRIMARY KEY (tile_x, tile_y)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS room_tiles_insert AFTER INSERT ON rooms
+        BEGIN
+            {_room_tile_bump_sql("NEW")}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS room_tiles_update
+        AFTER UPDATE OF {_ROOM_PIN_COLUMNS} ON rooms
+        BEGIN
+            {_room_tile_bump_sql("OLD")}
+            {_room_tile_bump_sql("NEW")}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS room_tiles_delete AFTER DELETE ON rooms
+        BEGIN
+            {_room_tile_bump_sql("OLD")}
+        END
+    """)
+
+
+def _m008_rooms_fts(cursor):
+    """매물 주소/설명 전문 검색용 FTS5 인덱스 (trigram 토크나이저)
+
+    trigram은 띄어쓰기와 무관하게 3글자 이상 부분 문자열을 찾으므로
+    '강남구', '역삼동', '래미안아파트' 안의 '아파트' 같은 한국어 주소 조각도
+    LIKE와 같은 결과로 매칭됩니다. rooms 트리거로 동기화됩니다.
+    """
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS rooms_fts USING fts5(
+                address, description, tokenize = 'trigram'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        # FTS5/trigram 없이 빌드된 SQLite - 텍스트 검색은 LIKE로 동작
+        print(f"FTS5 trigram not available, text search will use LIKE: {e}")
+        return
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS rooms_fts_insert AFTER INSERT ON rooms
+        BEGIN
+            INSERT INTO rooms_fts (rowid, address, description)
+            VALUES (NEW.id, NEW.address, COALESCE(NEW.description, ''));
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS rooms_fts_update AFTER UPDATE OF address, description ON rooms
+        BEGIN
+            DELETE FROM rooms_fts WHERE rowid = OLD.id;
+            INSERT INTO rooms_fts (rowid, address, description)
+            VALUES (NEW.id, NEW.address, COALESCE(NEW.description, ''));
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS rooms_fts_delete AFTER DELETE ON rooms
+        BEGIN
+            DELETE FROM rooms_fts WHERE rowid = OLD.id;
+        END
+    """)
+    cursor.execute("DELETE FROM rooms_fts")
+    cursor.execute("""
+        INSERT INTO rooms_fts (rowid, address, description)
+        SELECT id, address, COALESCE(description, '') FROM rooms
+    """)
+
+
+def _m009_market_price_stats(cursor):
+    """지역(구/동)·면적 구간별 ㎡당 보증금 통계 테이블
+
+    rooms 트리거는 바뀐 매물 id만 market_price_queue에 넣고, 주소 파싱과
+    통계 재계산은 utils.market_price.refresh_market_price_stats가 바뀐
+    그룹에 대해서만 수행합니다. (dong = '' 는 구 전체, area_bucket = -1 은 전체 면적)
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS market_price_queue (
+            room_rowid INTEGER PRIMARY KEY
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS market_price_samples (
+            room_rowid INTEGER PRIMARY KEY,
+            district TEXT NOT NULL,
+            dong TEXT NOT NULL,
+            area_bucket INTEGER NOT NULL,
+            transaction_type TEXT NOT NULL,
+            deposit_per_sqm REAL NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_market_price_samples_group
+        ON market_price_samples(district, dong, area_bucket, transaction_type, deposit_per_sqm)
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS market_price_stats (
+            district TEXT NOT NULL,
+            dong TEXT NOT NULL,
+            area_bucket INTEGER NOT NULL,
+            transaction_type TEXT NOT NULL,
+            sample_count INTEGER NOT NULL,
+            mean_per_sqm REAL NOT NULL,
+            median_per_sqm REAL NOT NULL,
+            p10_per_sqm REAL NOT NULL,
+            p90_per_sqm REAL NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (district, dong, area_bucket, transaction_type)
+        ) WITHOUT ROWID
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS market_price_queue_insert AFTER INSERT ON rooms
+        BEGIN
+            INSERT OR IGNORE INTO market_price_queue (room_rowid) VALUES (NEW.id);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS market_price_queue_update
+        AFTER UPDATE OF address, area, price_deposit, transaction_type, is_active ON rooms
+        BEGIN
+            INSERT OR IGNORE INTO market_price_queue (room_rowid) VALUES (NEW.id);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS market_price_queue_delete AFTER DELETE ON rooms
+        BEGIN
+            INSERT OR IGNORE INTO market_price_queue (room_rowid) VALUES (OLD.id);
+        END
+    """)
+    cursor.execute("INSERT OR IGNORE INTO market_price_queue (room_rowid) SELECT id FROM rooms")
+
+
+# 매칭 점수에 쓰이는 프로필 컬럼 - 이 값이 바뀔 때만 매칭 캐시를 갱신
+_MATCH_PROFILE_COLUMNS = (
+    "sleep_type", "home_time", "cleaning_frequency", "cleaning_sensitivity",
+    "smoking_status", "noise_sensitivity", "is_complete",
+)
+
+
+def _m010_match_cache(cursor):
+    """사용자별 상위 K명 매칭 점수 캐시
+
+    user_profiles 트리거가 매칭 관련 값이 바뀐 사용자를 match_cache_dirty에
+    넣고, utils.match_cache가 그 사용자와 관련된 행만 다시 계산합니다.
+    match_cache_users에는 목록 크기와 가장 낮은 순위 항목(floor)을 둡니다.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS match_cache (
+            user_id INTEGER NOT NULL,
+            candidate_id INTEGER NOT NULL,
+            score REAL NOT NULL,
+            PRIMARY KEY (user_id, candidate_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_match_cache_candidate ON match_cache(candidate_id)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS match_cache_users (
+            user_id INTEGER PRIMARY KEY,
+            list_size INTEGER NOT NULL,
+            floor_score REAL,
+            floor_candidate INTEGER
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS match_cache_dirty (
+            user_id INTEGER PRIMARY KEY
+        )
+    """)
+
+    changed = " OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in _MATCH_PROFILE_COLUMNS)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS match_cache_profile_insert AFTER INSERT ON user_profiles
+        BEGIN
+            INSERT OR IGNORE INTO match_cache_dirty (user_id) VALUES (NEW.user_id);
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS match_cache_profile_update
+        AFTER UPDATE OF {", ".join(_MATCH_PROFILE_COLUMNS)}, user_id ON user_profiles
+        WHEN {changed} OR OLD.user_id IS NOT NEW.user_id
+        BEGIN
+            INSERT OR IGNORE INTO match_cache_dirty (user_id) VALUES (OLD.user_id);
+            INSERT OR IGNORE INTO match_cache_dirty (user_id) VALUES (NEW.user_id);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS match_cache_profile_delete AFTER DELETE ON user_profiles
+        BEGIN
+            INSERT OR IGNORE INTO match_cache_dirty (user_id) VALUES (OLD.user_id);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS match_cache_user_delete AFTER DELETE ON users
+        BEGIN
+            INSERT OR IGNORE INTO match_cache_dirty (user_id) VALUES (OLD.id);
+        END
+    """)
+
+
+def _m011_chat_room_summary(cursor):
+    """채팅방 목록용 비정규화 컬럼
+
+    chat_rooms.last_message_id/last_message_at과 참가자별 unread_count를
+    send_message와 읽음 처리 경로가 직접 갱신하므로, 채팅방 목록을 방 수와
+    관계없이 한두 번의 쿼리로 만들 수 있습니다.
+    """
+    _add_missing_columns(cursor, "chat_rooms", [
+        ("last_message_id", "INTEGER"),
+        ("last_message_at", "TIMESTAMP"),
+    ])
+    _add_missing_columns(cursor, "chat_participants", [
+        ("unread_count", "INTEGER NOT NULL DEFAULT 0"),
+    ])
+
+    # 기존 데이터 채우기 (get_user_chat_rooms가 방마다 계산하던 값과 같음)
+    cursor.execute("""
+        UPDATE chat_rooms SET last_message_id = (
+            SELECT MAX(id) FROM chat_messages
+            WHERE room_id = chat_rooms.id AND is_deleted = FALSE
+        )
+    """)
+    cursor.execute("""
+        UPDATE chat_rooms SET last_message_at = (
+            SELECT created_at FROM chat_messages WHERE id = chat_rooms.last_message_id
+        )
+    """)
+    cursor.execute("""
+        UPDATE chat_participants SET unread_count = (
+            SELECT COUNT(*) FROM chat_messages m
+            WHERE m.room_id = chat_participants.room_id
+              AND m.sender_id != chat_participants.user_id
+              AND m.is_deleted = FALSE
+              AND (chat_participants.last_read_at IS NULL OR m.created_at > chat_participants.last_read_at)
+        )
+    """)
+
+
+def _m012_chat_messages_keyset_index(cursor):
+    """채팅 메시지 커서(before_id/after_id) 페이지네이션용 (room_id, id) 인덱스"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_chat_messages_room_id ON chat_messages(room_id, id)")
+
+
+def _m013_chat_read_watermark(cursor):
+    """참가자별 읽음 watermark ("message_id X까지 읽음")
+
+    메시지별 읽음 상태는 메시지 행의 read_status 대신 참가자 watermark로
+    계산합니다. 기존 데이터는 last_read_at 이전에 온 메시지 중 가장 큰 id로 채웁니다.
+    """
+    _add_missing_columns(cursor, "chat_participants", [
+        ("last_read_message_id", "INTEGER"),
+    ])
+    cursor.execute("""
+        UPDATE chat_participants SET last_read_message_id = (
+            SELECT MAX(id) FROM chat_messages m
+            WHERE m.room_id = chat_participants.room_id
+              AND m.created_at <= chat_participants.last_read_at
+        )
+        WHERE last_read_message_id IS NULL AND last_read_at IS NOT NULL
+    """)
+
+
+def _m014_chat_room_pair_key(cursor):
+    """1:1 채팅방의 참가자 쌍 키 ("작은 user_id-큰 user_id")와 유니크 인덱스
+
+    기존에 같은 두 사람의 방이 여러 개 있으면 가장 먼저 만든 방에만 키를
+    붙이고, 나머지는 키 없이 그대로 둡니다 (메시지는 유지).
+    """
+    _add_missing_columns(cursor, "chat_rooms", [
+        ("pair_key", "TEXT"),
+    ])
+    cursor.execute("""
+        SELECT cr.id, MIN(cp.user_id) || '-' || MAX(cp.user_id)
+        FROM chat_rooms cr
+        JOIN chat_participants cp ON cp.room_id = cr.id
+        WHERE cr.room_type = 'individual' AND cr.pair_key IS NULL
+        GROUP BY cr.id
+        HAVING COUNT(DISTINCT cp.user_id) = 2
+        ORDER BY cr.id
+    """)
+    rooms = cursor.fetchall()
+
+    cursor.execute("SELECT pair_key FROM chat_rooms WHERE pair_key IS NOT NULL")
+    seen = {row[0] for row in cursor.fetchall()}
+    keyed = []
+    for room_id, pair_key in rooms:
+        if pair_key not in seen:
+            seen.add(pair_key)
+            keyed.append((pair_key, room_id))
+    cursor.executemany("UPDATE chat_rooms SET pair_key = ? WHERE id = ?", keyed)
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_chat_rooms_pair_key ON chat_rooms(pair_key)")
+
+
+def _m015_chat_archive(cursor):
+    """채팅 메시지 아카이브 상태와 삭제된 채팅방 정리 대기열
+
+    chat_rooms.archived_until_id 이하의 메시지는 아카이브 db(database/chat_archive.py)로
+    옮겨졌다는 뜻이고, chat_purge_queue의 채팅방 메시지는 백그라운드에서 나눠 지웁니다.
+    """
+    _add_missing_columns(cursor, "chat_rooms", [
+        ("archived_until_id", "INTEGER"),
+    ])
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS chat_purge_queue (
+            room_id INTEGER PRIMARY KEY,
+            queued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+# 매칭 엔진 후보에 쓰이는 프로필 컬럼 (점수 컬럼 + 필수 조건 버킷의 나이)
+_MATCH_ENGINE_PROFILE_COLUMNS = _MATCH_PROFILE_COLUMNS + ("age",)
+
+
+def _m016_match_profile_version(cursor):
+    """매칭 엔진 후보 버전
+
+    매칭 점수나 필수 조건에 쓰이는 값(프로필 매칭 컬럼, 나이, 성별)이나 후보
+    목록이 바뀌면 트리거가 version을 올리고, utils.matching.find_matches는
+    버전이 같은 동안 메모리에 만들어 둔 MatchingEngine을 다시 씁니다.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS match_profile_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO match_profile_version (id, version) VALUES (1, 0)")
+
+    bump = "UPDATE match_profile_version SET version = version + 1 WHERE id = 1;"
+    changed = " OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in _MATCH_ENGINE_PROFILE_COLUMNS)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS match_version_profile_insert AFTER INSERT ON user_profiles
+        BEGIN
+            {bump}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS match_version_profile_update
+        AFTER UPDATE OF {", ".join(_MATCH_ENGINE_PROFILE_COLUMNS)}, user_id ON user_profiles
+        WHEN {changed} OR OLD.user_id IS NOT NEW.user_id
+        BEGIN
+            {bump}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS match_version_profile_delete AFTER DELETE ON user_profiles
+        BEGIN
+            {bump}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS match_version_user_gender
+        AFTER UPDATE OF gender ON users
+        WHEN OLD.gender IS NOT NEW.gender
+        BEGIN
+            {bump}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS match_version_user_delete AFTER DELETE ON users
+        BEGIN
+            {bump}
+        END
+    """)
+
+
+# (버전, 설명, 마이그레이션 함수) - 버전은 반드시 증가 순서로 추가
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "users contact columns", _m001_users_contact_columns),
+    (2, "drop gender columns from user_profiles", _m002_user_profiles_drop_gender),
+    (3, "chat message status columns", _m003_chat_message_status_columns),
+    (4, "hot query indexes", _m004_hot_query_indexes),
+    (5, "rooms R*Tree spatial index", _m005_rooms_rtree),
+    (6, "room map cluster grid", _m006_room_clusters),
+    (7, "room map tile versions", _m007_room_tile_versions),
+    (8, "rooms FTS5 text index", _m008_rooms_fts),
+    (9, "market price statistics", _m009_market_price_stats),
+    (10, "per-user match score cache", _m010_match_cache),
+    (11, "chat room last message and unread counters", _m011_chat_room_summary),
+    (12, "chat messages keyset index", _m012_chat_messages_keyset_index),
+    (13, "chat read watermarks", _m013_chat_read_watermark),
+    (14, "1:1 chat room pair key", _m014_chat_room_pair_key),
+    (15, "chat message archive and purge queue", _m015_chat_archive),
+    (16, "match engine profile version", _m016_match_profile_version),
+]
+
+
+def _ensure_version_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
+
+
+def get_applied_versions(conn) -> List[int]:
+    """이미 적용된 마이그레이션 버전 목록을 반환합니다."""
+    _ensure_version_table(conn)
+    cursor = conn.execute("SELECT version FROM schema_version ORDER BY version")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def run_migrations(conn) -> List[int]:
+    """적용되지 않은 마이그레이션을 순서대로 실행하고 적용한 버전 목록을 반환합니다.
+
+    각 단계는 schema_version 기록과 함께 하나의 트랜잭션으로 실행되므로,
+    실패하면 해당 단계만 롤백되고 다음 시작 시 다시 시도됩니다.
+    """
+    applied = set(get_applied_versions(conn))
+    newly_applied = []
+
+    for version, description, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN")
+            migrate(cursor)
+            cursor.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (version, description)
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            print(f"❌ Migration {version} ({description}) failed: {e}")
+            raise
+        print(f"Applied migration {version}: {description}")
+        newly_applied.append(version)
+
+    return newly_applied
+
+
+# 실행 계획을 확인할 주요 쿼리 (이름, SQL, 예시 파라미터)
+HOT_QUERIES = [
+    (
+        "rooms map search",
+        """SELECT room_id FROM rooms
+           WHERE is_active = 1 AND latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?""",
+        (37.4, 37.6, 126.9, 127.1),
+    ),
+    (
+        "rooms map search (R*Tree)",
+        """SELECT r.room_id FROM rooms_rtree t CROSS JOIN rooms r ON r.id = t.id
+           WHERE t.max_lat >= ? AND t.min_lat <= ? AND t.max_lng >= ? AND t.min_lng <= ?
+           AND r.is_active = 1""",
+        (37.4, 37.6, 126.9, 127.1),
+    ),
+    (
+        "room map clusters",
+        """SELECT cell_x, cell_y, room_count FROM room_clusters
+           WHERE level = ? AND cell_x BETWEEN ? AND ? AND cell_y BETWEEN ? AND ?""",
+        (14, 13970, 13980, 12600, 12610),
+    ),
+    (
+        "rooms text search (FTS5)",
+        """SELECT r.room_id FROM rooms_fts f CROSS JOIN rooms r ON r.id = f.rowid
+           WHERE rooms_fts MATCH ? AND r.is_active = 1 ORDER BY bm25(rooms_fts) LIMIT 100""",
+        ('"강남구"',),
+    ),
+    (
+        "market price lookup",
+        """SELECT sample_count, median_per_sqm FROM market_price_stats
+           WHERE district = ? AND dong = ? AND area_bucket = ? AND transaction_type = ?""",
+        ("서울특별시 강남구", "역삼동", 2, "전세"),
+    ),
+    (
+        "chat messages page",
+        """SELECT id FROM chat_messages
+           WHERE room_id = ? AND is_deleted = FALSE ORDER BY created_at DESC LIMIT 50""",
+        (1,),
+    ),
+    (
+        "chat messages page (keyset)",
+        """SELECT id FROM chat_messages
+           WHERE room_id = ? AND id < ? AND is_deleted = FALSE ORDER BY id DESC LIMIT 50""",
+        (1, 1000),
+    ),
+    (
+        "1:1 chat room lookup",
+        "SELECT id FROM chat_rooms WHERE pair_key = ?",
+        ("1-2",),
+    ),
+    (
+        "chat rooms of user",
+        "SELECT room_id FROM chat_participants WHERE user_id = ?",
+        (1,),
+    ),
+    (
+        "chat room list",
+        """SELECT cr.id, cm.content, cp.unread_count
+           FROM chat_participants cp
+           JOIN chat_rooms cr ON cr.id = cp.room_id
+           LEFT JOIN chat_messages cm ON cm.id = cr.last_message_id
+           WHERE cp.user_id = ?
+           ORDER BY COALESCE(cr.last_message_at, cr.created_at) DESC""",
+        (1,),
+    ),
+    (
+        "room favorites",
+        "SELECT user_id FROM favorites WHERE room_id = ?",
+        ("room_x",),
+    ),
+    (
+        "popular policies",
+        "SELECT id FROM policies WHERE is_active = 1 ORDER BY view_count DESC LIMIT 10",
+        (),
+    ),
+    (
+        "policy views of user",
+        "SELECT policy_id FROM policy_views WHERE user_id = ?",
+        (1,),
+    ),
+]
+
+
+def explain_hot_queries(conn) -> List[Tuple[str, List[str]]]:
+    """주요 쿼리의 EXPLAIN QUERY PLAN 결과를 반환합니다."""
+    plans = []
+    for name, sql, params in HOT_QUERIES:
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+            plans.append((name, [row[-1] for row in rows]))
+        except sqlite3.Error as e:
+            plans.append((name, [f"error: {e}"]))
+    return plans
+
+
+if __name__ == "__main__":
+    from database.connection import get_db_connection
+
+    conn = get_db_connection()
+    try:
+        applied = set(get_applied_versions(conn))
+        for version, description, _ in MIGRATIONS:
+            mark = "x" if version in applied else " "
+            print(f"[{mark}] {version:03d} {description}")
+
+        if "--plans" in sys.argv:
+            print()
+            for name, plan in explain_hot_queries(conn):
+                print(f"{name}:")
+                for line in plan:
+                    print(f"    {line}")
+    finally:
+        conn.close()
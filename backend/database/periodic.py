@@ -0,0 +1,54 @@
+import abc
+import threading
+
+
+class PeriodicWorker(abc.ABC):
+    """interval초마다 작업을 실행하는 백그라운드 스레드 기반 클래스
+
+    서버 시작 시 start(), 종료 시 stop()을 호출하며, wake()로 다음 주기를
+    기다리지 않고 바로 실행할 수 있습니다. 하위 클래스는 _work만 구현하고,
+    작업 중 오류는 로그만 남긴 뒤 다음 주기에 다시 시도합니다.
+    """
+
+    # 백그라운드 스레드 이름과 오류 메시지에 쓰는 이름
+    name = "periodic"
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    @abc.abstractmethod
+    def _work(self, woken: bool):
+        """한 번 실행할 작업 (woken은 wake()로 앞당겨 실행된 경우 True)"""
+
+    def start(self):
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def stop(self):
+        thread = self._thread
+        self._stopping = True
+        self._wakeup.set()
+        if thread is not None:
+            thread.join()
+        self._thread = None
+
+    def run_once(self, woken: bool = False):
+        try:
+            self._work(woken)
+        except Exception as e:
+            print(f"Error in {self.name}: {e}")
+
+    def _run(self):
+        woken = False
+        while not self._stopping:
+            self.run_once(woken)
+            woken = self._wakeup.wait(self.interval)
+            self._wakeup.clear()
@@ -0,0 +1,88 @@
+import os
+from typing import Dict
+
+from database.write_behind import WriteBehindBuffer
+
+# 읽음 처리(watermark)를 DB에 반영하는 주기(초)와, 주기 전이라도 바로 반영할 대기 건수
+READ_RECEIPT_FLUSH_INTERVAL = float(os.getenv("READ_RECEIPT_FLUSH_INTERVAL", "2"))
+READ_RECEIPT_FLUSH_MAX_PENDING = int(os.getenv("READ_RECEIPT_FLUSH_MAX_PENDING", "500"))
+
+
+class ReadReceiptBuffer(WriteBehindBuffer):
+    """채팅 읽음 처리를 (채팅방, 사용자)별 watermark로 모아 한 트랜잭션으로 반영하는 서비스
+
+    "message_id X까지 읽음"을 기록하며, 같은 사용자가 짧은 시간에 여러 번
+    읽음 처리해도 가장 큰 id 하나만 남깁니다. 반영 시 chat_participants의
+    last_read_message_id/last_read_at/unread_count만 갱신하고, 메시지 행에는
+    쓰지 않습니다 (메시지별 읽음 상태는 watermark에서 계산).
+    조회하는 쪽은 watermark()로 아직 반영되지 않은 값까지 합쳐서 봅니다.
+    버퍼 항목은 {(채팅방, 사용자): message_id}입니다.
+    """
+
+    name = "read-receipts"
+
+    def mark(self, room_id: int, user_id: int, message_id: int):
+        """user_id가 room_id의 message_id까지 읽었음을 기록합니다 (DB에는 나중에 반영)."""
+        if message_id is None:
+            return
+
+        with self._lock:
+            key = (room_id, user_id)
+            if key not in self._pending:
+                self._added()
+            if message_id > self._pending.get(key, 0):
+                self._pending[key] = message_id
+
+    def pending(self, room_id: int, user_id: int) -> int:
+        """아직 DB에 반영되지 않은 watermark (없으면 0)"""
+        with self._lock:
+            key = (room_id, user_id)
+            return max(self._pending.get(key, 0), self._flushing.get(key, 0))
+
+    def pending_for_user(self, user_id: int) -> Dict[int, int]:
+        """사용자의 반영 대기 중인 watermark {room_id: message_id}"""
+        with self._lock:
+            result = {}
+            for source in (self._flushing, self._pending):
+                for (room_id, uid), message_id in source.items():
+                    if uid == user_id and message_id > result.get(room_id, 0):
+                        result[room_id] = message_id
+            return result
+
+    def watermark(self, room_id: int, user_id: int, stored) -> int:
+        """DB에서 읽은 watermark와 대기 중인 값 중 큰 값을 반환합니다."""
+        return max(stored or 0, self.pending(room_id, user_id))
+
+    def _merge(self, target, batch) -> int:
+        added = 0
+        for key, message_id in batch.items():
+            if key not in target:
+                added += 1
+            if message_id > target.get(key, 0):
+                target[key] = message_id
+        return added
+
+    def _write(self, cursor, batch) -> int:
+        cursor.executemany(
+            """
+            UPDATE chat_participants
+            SET last_read_message_id = MAX(COALESCE(last_read_message_id, 0), :message_id),
+                last_read_at = datetime('now', '+9 hours'),
+                unread_count = (
+                    SELECT COUNT(*) FROM chat_messages m
+                    WHERE m.room_id = chat_participants.room_id
+                      AND m.id > MAX(COALESCE(chat_participants.last_read_message_id, 0), :message_id)
+                      AND m.sender_id != chat_participants.user_id
+                      AND m.is_deleted = FALSE
+                )
+            WHERE room_id = :room_id AND user_id = :user_id
+        """,
+            [
+                {"room_id": room_id, "user_id": user_id, "message_id": message_id}
+                for (room_id, user_id), message_id in batch.items()
+            ],
+        )
+        return len(batch)
+
+
+read_receipts = ReadReceiptBuffer(READ_RECEIPT_FLUSH_INTERVAL, READ_RECEIPT_FLUSH_MAX_PENDING)
@@ -0,0 +1,100 @@
+import abc
+import atexit
+import sqlite3
+import threading
+from typing import Dict
+
+from database.connection import get_db_connection
+
+
+class WriteBehindBuffer(abc.ABC):
+    """요청 경로의 쓰기를 메모리에 모았다가 백그라운드 스레드에서 한 트랜잭션으로 반영하는 기반 클래스
+
+    flush_interval초마다, 또는 대기 건수가 max_pending에 이르면, 그리고 서버
+    종료 시 대기 중인 항목을 반영합니다. 반영에 실패하면 항목을 버퍼로 되돌려
+    다음 주기에 다시 시도합니다. 하위 클래스는 항목을 _pending에 합치는 방법
+    (_merge)과 반영 SQL(_write)만 구현하고, 항목을 추가한 뒤 _added()를 호출합니다.
+    """
+
+    # 백그라운드 스레드 이름과 오류 메시지에 쓰는 이름
+    name = "write-behind"
+
+    def __init__(self, flush_interval: float, max_pending: int):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict = {}
+        self._flushing: Dict = {}  # 반영 중인 항목
+        self._pending_count = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    @abc.abstractmethod
+    def _merge(self, target: Dict, batch: Dict) -> int:
+        """batch의 항목을 target에 합치고 늘어난 대기 건수를 반환합니다 (self._lock 안에서 호출)."""
+
+    @abc.abstractmethod
+    def _write(self, cursor, batch: Dict) -> int:
+        """batch를 DB에 기록하고 반영한 건수를 반환합니다 (커밋은 flush에서)."""
+
+    def _added(self, count: int = 1):
+        """항목을 추가한 뒤 self._lock 안에서 호출합니다 (대기 건수가 차면 바로 반영)."""
+        self._pending_count += count
+        self._ensure_started()
+        if self._pending_count >= self.max_pending:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """대기 중인 항목을 한 트랜잭션으로 반영하고, 반영한 건수를 반환합니다."""
+        with self._flush_lock:
+            with self._lock:
+                batch = self._pending
+                self._pending = {}
+                self._flushing = batch
+                self._pending_count = 0
+
+            if not batch:
+                return 0
+
+            conn = get_db_connection()
+            try:
+                flushed = self._write(conn.cursor(), batch)
+                conn.commit()
+            except sqlite3.Error as e:
+                conn.rollback()
+                print(f"Error flushing {self.name}, will retry: {e}")
+                # 반영하지 못한 항목은 버퍼로 되돌려 다음 주기에 다시 시도
+                with self._lock:
+                    self._pending_count += self._merge(self._pending, batch)
+                flushed = 0
+            finally:
+                conn.close()
+                with self._lock:
+                    self._flushing = {}
+
+            return flushed
+
+    def stop(self):
+        """백그라운드 반영 스레드를 멈추고 남은 항목을 반영합니다 (서버 종료 시)."""
+        with self._lock:
+            self._stopping = True
+            thread = self._thread
+        self._wakeup.set()
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+    def _ensure_started(self):
+        # self._lock 안에서 호출
+        if self._thread is None and not self._stopping:
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-flush", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
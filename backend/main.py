@@ -1,7 +1,13 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
-from database.connection import init_db
+from database.connection import init_db, close_all_pools
+from database.async_connection import shutdown_db_executor
+from database.counters import counters
+from database.read_receipts import read_receipts
+from database.chat_archive import chat_archiver
+from utils.market_price import market_price_refresher
+from utils.match_cache import match_cache_refresher
 from routers import auth, users, profile, rooms, favorites, policies, admin, contract_analysis, chat, policy_chat, activity
 from dotenv import load_dotenv
 
@@ -18,7 +24,17 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"❌ Database initialization failed: {e}")
         # 데이터베이스 초기화 실패해도 서버는 계속 실행
+    chat_archiver.start()  # 오래된 채팅 메시지 아카이브, 삭제된 채팅방 정리
+    market_price_refresher.start()  # 크롤러 등이 바꾼 매물을 시세 통계에 반영
+    match_cache_refresher.start()  # 바뀐 프로필을 매칭 캐시에 반영
     yield
+    match_cache_refresher.stop()
+    market_price_refresher.stop()
+    chat_archiver.stop()
+    counters.stop()  # 버퍼에 남은 조회수/찜 수 반영
+    read_receipts.stop()  # 버퍼에 남은 읽음 처리 반영
+    shutdown_db_executor()
+    close_all_pools()
 
 
 app = FastAPI(title="Uni-con API", version="1.0.0", lifespan=lifespan)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Room(BaseModel):
@@ -53,3 +53,15 @@ class RoomPin(BaseModel):
     risk_score: int
     favorite_count: int
     floor: Optional[int] = None
+
+
+class RoomCluster(BaseModel):
+    """지도 클러스터 (격자 셀 단위로 미리 집계된 매물 정보)"""
+    cluster_id: str  # "레벨:셀x:셀y"
+    level: int
+    count: int
+    latitude: float  # 셀 안 매물들의 중심 좌표
+    longitude: float
+    min_deposit: Optional[int] = None
+    avg_deposit: int
+    transaction_types: Dict[str, int]  # 거래 유형별 매물 수
@@ -2,11 +2,11 @@ import requests
 from bs4 import BeautifulSoup
 import re
 import time
-import sqlite3
 import logging
 from urllib.parse import urljoin, urlparse
 import json
 from typing import Optional, List, Dict
+from database.connection import db_connection
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -204,23 +204,27 @@ class PolicyURLCrawler:
         return None
 
     def update_policy_urls_in_db(self, db_path: str = 'users.db'):
-        """데이터베이스의 정책 URL 업데이트"""
+        """데이터베이스의 정책 URL 업데이트
+        
+        URL 검색(요청마다 지연)은 DB 연결 없이 모두 마친 뒤, 찾은 URL만 짧은
+        트랜잭션 하나로 기록하므로 크롤링 중에 서버의 쓰기가 막히지 않습니다.
+        """
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
             # 정책 데이터 조회 (URL이 없거나 기본 URL인 경우)
-            cursor.execute("""
-                SELECT id, title, organization, application_url, reference_url 
-                FROM policies 
-                WHERE (application_url IS NULL OR application_url = '' 
-                      OR application_url LIKE '%example.com%'
-                      OR reference_url LIKE '%gov.go.kr%')
-                LIMIT 50
-            """)
-            
-            policies = cursor.fetchall()
+            with db_connection(db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT id, title, organization, application_url, reference_url 
+                    FROM policies 
+                    WHERE (application_url IS NULL OR application_url = '' 
+                          OR application_url LIKE '%example.com%'
+                          OR reference_url LIKE '%gov.go.kr%')
+                    LIMIT 50
+                """)
+                
+                policies = cursor.fetchall()
             
+            found_urls = []
             for policy_id, title, organization, app_url, ref_url in policies:
                 logger.info(f"Processing policy ID {policy_id}: {title}")
                 
@@ -228,22 +232,21 @@ class PolicyURLCrawler:
                 new_url = self.find_policy_url(title, organization)
                 
                 if new_url:
-                    # DB 업데이트
-                    cursor.execute("""
-                        UPDATE policies 
-                        SET application_url = ?, updated_at = datetime('now')
-                        WHERE id = ?
-                    """, (new_url, policy_id))
-                    
-                    logger.info(f"Updated policy {policy_id} with URL: {new_url}")
+                    found_urls.append((new_url, policy_id))
+                    logger.info(f"Found URL for policy {policy_id}: {new_url}")
                 
                 # 과도한 요청 방지를 위한 지연
                 time.sleep(2)
             
-            conn.commit()
-            conn.close()
+            # DB 업데이트
+            with db_connection(db_path) as conn:
+                conn.executemany("""
+                    UPDATE policies 
+                    SET application_url = ?, updated_at = datetime('now')
+                    WHERE id = ?
+                """, found_urls)
             
-            logger.info(f"Processed {len(policies)} policies")
+            logger.info(f"Processed {len(policies)} policies, updated {len(found_urls)} URLs")
             
         except Exception as e:
             logger.error(f"Database update error: {e}")
@@ -1,12 +1,36 @@
 from datetime import datetime, timezone, timedelta
 from fastapi import APIRouter, Depends, HTTPException
-import sqlite3
-from database.connection import DATABASE_PATH
+from database.connection import get_db_connection
+from database.async_connection import run_db
 from auth.jwt_handler import get_current_user
 from models.user import User
 
 router = APIRouter()
 
+
+def _update_last_seen(user_id: int, last_seen_at: datetime):
+    """마지막 접속 시간 저장 (DB 스레드에서 실행)"""
+    conn = get_db_connection()
+    try:
+        conn.execute("""
+            UPDATE users SET last_seen_at = ? WHERE id = ?
+        """, (last_seen_at, user_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _get_last_seen(user_id: int):
+    """사용자 접속 기록 조회 (DB 스레드에서 실행)"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.execute("""
+            SELECT id, last_seen_at, created_at FROM users WHERE id = ?
+        """, (user_id,))
+        return cursor.fetchone()
+    finally:
+        conn.close()
+
 @router.post("/activity/heartbeat")
 async def update_user_activity(
     current_user: User = Depends(get_current_user)
@@ -16,24 +40,14 @@ async def update_user_activity(
     클라이언트에서 주기적으로 호출하여 마지막 접속 시간을 업데이트
     """
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
         # 현재 사용자의 마지막 접속 시간 업데이트 (한국 시간)
         kst = timezone(timedelta(hours=9))
         last_seen_at = datetime.now(kst).replace(tzinfo=None)
         
-        cursor.execute("""
-            UPDATE users SET last_seen_at = ? WHERE id = ?
-        """, (last_seen_at, current_user.id))
-        
-        conn.commit()
-        conn.close()
+        await run_db(_update_last_seen, current_user.id, last_seen_at)
         
         return {"message": "Activity updated successfully", "last_seen_at": last_seen_at}
     except Exception as e:
-        if 'conn' in locals():
-            conn.close()
         raise HTTPException(status_code=500, detail=f"Failed to update activity: {str(e)}")
 
 @router.get("/activity/status/{user_id}")
@@ -45,16 +59,8 @@ async def get_user_status(
     특정 사용자의 접속 상태를 확인하는 엔드포인트
     """
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
         # 사용자 조회
-        cursor.execute("""
-            SELECT id, last_seen_at, created_at FROM users WHERE id = ?
-        """, (user_id,))
-        
-        user_data = cursor.fetchone()
-        conn.close()
+        user_data = await run_db(_get_last_seen, user_id)
         
         if not user_data:
             raise HTTPException(status_code=404, detail="User not found")
@@ -85,6 +91,4 @@ async def get_user_status(
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.close()
         raise HTTPException(status_code=500, detail=f"Failed to get user status: {str(e)}")
\ No newline at end of file
@@ -2,10 +2,11 @@ from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel
 from typing import Optional
 from models.user import UserCreate, UserLogin, User
-from database.connection import (
-    get_user_by_email, create_user, create_user_with_email_password,
+from database.connection import get_db_connection
+from database.async_connection import (
+    run_db, get_user_by_email, create_user, create_user_with_email_password,
     update_user_name, update_user_phone, update_user_phone_and_gender, 
-    update_user_school_verification, get_user_by_id, get_db_connection
+    update_user_school_verification, get_user_by_id
 )
 from utils.security import verify_password, get_password_hash
 from auth.jwt_handler import create_access_token
@@ -16,7 +17,7 @@ router = APIRouter()
 
 @router.post("/signup", response_model=User, status_code=status.HTTP_201_CREATED)
 async def signup(user_data: UserCreate):
-    existing_user = get_user_by_email(user_data.email)
+    existing_user = await get_user_by_email(user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -24,7 +25,7 @@ async def signup(user_data: UserCreate):
         )
     
     hashed_password = get_password_hash(user_data.password)
-    user = create_user(user_data, hashed_password)
+    user = await create_user(user_data, hashed_password)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -36,7 +37,7 @@ async def signup(user_data: UserCreate):
 
 @router.post("/login")
 async def login(user_data: UserLogin):
-    user = get_user_by_email(user_data.email)
+    user = await get_user_by_email(user_data.email)
     if not user or not verify_password(user_data.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -91,7 +92,7 @@ class SchoolVerificationRequest(BaseModel):
 @router.post("/signup/initial")
 async def initial_signup(signup_data: InitialSignupRequest):
     """이메일과 비밀번호로 초기 사용자 생성"""
-    existing_user = get_user_by_email(signup_data.email)
+    existing_user = await get_user_by_email(signup_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -99,7 +100,7 @@ async def initial_signup(signup_data: InitialSignupRequest):
         )
     
     hashed_password = get_password_hash(signup_data.password)
-    user = create_user_with_email_password(signup_data.email, signup_data.password, hashed_password)
+    user = await create_user_with_email_password(signup_data.email, signup_data.password, hashed_password)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -114,7 +115,7 @@ async def phone_verification(verification_data: PhoneVerificationRequest):
     """휴대폰 인증 완료 후 이름, 전화번호, 성별 저장"""
     print(f"[DEBUG] Phone verification request: {verification_data}")
     
-    user = get_user_by_id(verification_data.user_id)
+    user = await get_user_by_id(verification_data.user_id)
     if not user:
         print(f"[DEBUG] User not found: {verification_data.user_id}")
         raise HTTPException(
@@ -125,11 +126,11 @@ async def phone_verification(verification_data: PhoneVerificationRequest):
     print(f"[DEBUG] Found user: {user}")
     
     # 이름 업데이트
-    name_updated = update_user_name(verification_data.user_id, verification_data.name)
+    name_updated = await update_user_name(verification_data.user_id, verification_data.name)
     print(f"[DEBUG] Name update result: {name_updated}")
     
     # 전화번호와 성별 업데이트 (주민등록번호에서 성별 추출)
-    phone_gender_updated = update_user_phone_and_gender(
+    phone_gender_updated = await update_user_phone_and_gender(
         verification_data.user_id, 
         verification_data.phone_number, 
         verification_data.resident_number
@@ -144,7 +145,7 @@ async def phone_verification(verification_data: PhoneVerificationRequest):
         )
     
     # 업데이트된 사용자 정보 반환
-    updated_user = get_user_by_id(verification_data.user_id)
+    updated_user = await get_user_by_id(verification_data.user_id)
     print(f"[DEBUG] Updated user: {updated_user}")
     
     return {
@@ -159,7 +160,7 @@ async def phone_verification(verification_data: PhoneVerificationRequest):
 @router.post("/signup/school-verification")
 async def school_verification(verification_data: SchoolVerificationRequest):
     """학교 인증 이메일 저장"""
-    user = get_user_by_id(verification_data.user_id)
+    user = await get_user_by_id(verification_data.user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -167,7 +168,7 @@ async def school_verification(verification_data: SchoolVerificationRequest):
         )
     
     # 학교 인증 정보 저장
-    saved = update_user_school_verification(verification_data.user_id, verification_data.school_email, True)
+    saved = await update_user_school_verification(verification_data.user_id, verification_data.school_email, True)
     
     if not saved:
         raise HTTPException(
@@ -192,31 +193,13 @@ class CompleteSignupRequest(BaseModel):
     carrier: str
     school_email: Optional[str] = None
 
-@router.post("/signup/complete")
-async def complete_signup(request: CompleteSignupRequest):
-    """회원가입 최종 완료 - 모든 정보를 한 번에 처리"""
-    print(f"[DEBUG] Complete signup request: {request}")
-    
-    # 이메일 중복 확인
-    existing_user = get_user_by_email(request.email)
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
-    # 비밀번호 해싱
-    hashed_password = get_password_hash(request.password)
-    
-    # 주민등록번호에서 성별 추출
-    from database.connection import extract_gender_from_resident_number
-    gender = extract_gender_from_resident_number(request.resident_number)
-    
+def _insert_complete_user(request: CompleteSignupRequest, hashed_password: str, gender: Optional[str]) -> int:
+    """사용자, 프로필, 사용자 정보를 한 트랜잭션으로 생성 (DB 스레드에서 실행)"""
+    from database.connection import calculate_age_from_resident_number
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
     try:
-        # 사용자 생성 (모든 정보 포함)
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         # 학교 인증 정보를 포함한 사용자 생성  
         school_email = request.school_email if request.school_email and request.school_email.strip() else None
         
@@ -228,7 +211,6 @@ async def complete_signup(request: CompleteSignupRequest):
         user_id = cursor.lastrowid
         
         # 주민등록번호에서 나이 계산
-        from database.connection import calculate_age_from_resident_number
         age = calculate_age_from_resident_number(request.resident_number)
         
         # 나이 정보를 포함한 프로필 생성
@@ -238,7 +220,34 @@ async def complete_signup(request: CompleteSignupRequest):
         cursor.execute("INSERT INTO user_info (user_id) VALUES (?)", (user_id,))
         
         conn.commit()
+        return user_id
+    finally:
         conn.close()
+
+
+@router.post("/signup/complete")
+async def complete_signup(request: CompleteSignupRequest):
+    """회원가입 최종 완료 - 모든 정보를 한 번에 처리"""
+    print(f"[DEBUG] Complete signup request: {request}")
+    
+    # 이메일 중복 확인
+    existing_user = await get_user_by_email(request.email)
+    if existing_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    
+    # 비밀번호 해싱
+    hashed_password = get_password_hash(request.password)
+    
+    # 주민등록번호에서 성별 추출
+    from database.connection import extract_gender_from_resident_number
+    gender = extract_gender_from_resident_number(request.resident_number)
+    
+    try:
+        # 사용자 생성 (모든 정보 포함)
+        user_id = await run_db(_insert_complete_user, request, hashed_password, gender)
         
         # JWT 토큰 생성
         access_token = create_access_token({
@@ -1,21 +1,45 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+import asyncio
+
+from fastapi import APIRouter, HTTPException, status, Depends, Query, WebSocket, WebSocketDisconnect
 from fastapi.security import HTTPBearer
+from pydantic import ValidationError
 from typing import List, Optional
 from models.chat import (
     CreateChatRoomRequest, SendMessageRequest, ChatRoomListItem, 
     ChatMessage, ChatRoom
 )
 from models.user import User
-from auth.jwt_handler import get_current_user
-from database.connection import (
-    create_chat_room, get_user_chat_rooms, send_message, 
-    get_chat_messages, get_chat_messages_without_marking_read,
-    update_last_read_time, delete_chat_room, update_message_status
+from auth.jwt_handler import get_current_user, get_user_from_token
+from database.async_connection import (
+    run_db, create_chat_room, get_or_create_individual_chat_room, get_user_chat_rooms, send_message, 
+    get_chat_messages_and_mark_read, get_chat_messages_without_marking_read,
+    mark_messages_read, delete_chat_room, update_message_status,
+    get_chat_message, is_chat_participant
 )
+from utils.chat_hub import chat_hub
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 
+async def _publish_new_message(room_id: int, message_id: int):
+    """새 메시지를 채팅방 구독자에게 알림"""
+    message = await get_chat_message(message_id)
+    if message:
+        await chat_hub.publish(room_id, {"type": "message", "message": message})
+
+
+async def _publish_read(room_id: int, user_id: int, last_read_message_id: Optional[int] = None):
+    """읽음 처리를 채팅방 구독자에게 알림 (상대 화면의 안 읽은 수 갱신용)
+
+    last_read_message_id까지의 메시지를 user_id가 읽었다는 뜻이며, 클라이언트는
+    그 이하 id의 메시지 읽음 표시를 직접 갱신할 수 있습니다.
+    """
+    await chat_hub.publish(room_id, {
+        "type": "read", "room_id": room_id, "user_id": user_id,
+        "last_read_message_id": last_read_message_id
+    })
+
+
 @router.post("/rooms")
 async def create_room(
     request: CreateChatRoomRequest, 
@@ -23,16 +47,19 @@ async def create_room(
 ):
     """새 채팅방 생성"""
     try:
-        # 1:1 채팅의 경우 이미 존재하는 방이 있는지 확인
-        if request.room_type == 'individual' and len(request.participant_ids) == 1:
-            existing_rooms = get_user_chat_rooms(current_user.id)
-            for room in existing_rooms:
-                if (room['room_type'] == 'individual' and 
-                    len(room['participants']) == 2 and
-                    any(p['id'] == request.participant_ids[0] for p in room['participants'])):
-                    return {"room_id": room['id'], "message": "Existing room found"}
+        # 1:1 채팅은 참가자 쌍 키로 기존 방을 찾거나 한 트랜잭션에서 생성
+        if (request.room_type == 'individual' and len(request.participant_ids) == 1
+                and request.participant_ids[0] != current_user.id):
+            room_id, created = await get_or_create_individual_chat_room(
+                current_user.id, request.participant_ids[0], request.name
+            )
+            if room_id is None:
+                raise HTTPException(status_code=500, detail="Failed to create chat room")
+            if created:
+                return {"room_id": room_id, "message": "Chat room created successfully"}
+            return {"room_id": room_id, "message": "Existing room found"}
         
-        room_id = create_chat_room(
+        room_id = await create_chat_room(
             created_by=current_user.id,
             room_type=request.room_type,
             name=request.name,
@@ -44,6 +71,8 @@ async def create_room(
         else:
             raise HTTPException(status_code=500, detail="Failed to create chat room")
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -52,7 +81,7 @@ async def create_room(
 async def get_my_chat_rooms(current_user: User = Depends(get_current_user)):
     """내 채팅방 목록 조회"""
     try:
-        rooms = get_user_chat_rooms(current_user.id)
+        rooms = await get_user_chat_rooms(current_user.id)
         return {"rooms": rooms}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -66,7 +95,7 @@ async def send_chat_message(
 ):
     """메시지 전송"""
     try:
-        message_id = send_message(
+        message_id = await send_message(
             room_id=room_id,
             sender_id=current_user.id,
             content=request.content,
@@ -76,10 +105,15 @@ async def send_chat_message(
         )
         
         if message_id:
+            await _publish_new_message(room_id, message_id)
             return {"message_id": message_id, "message": "Message sent successfully"}
+        elif not await is_chat_participant(room_id, current_user.id):
+            raise HTTPException(status_code=404, detail="Chat room not found or user not participant")
         else:
             raise HTTPException(status_code=500, detail="Failed to send message")
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -89,11 +123,21 @@ async def get_room_messages(
     room_id: int,
     limit: int = 50,
     offset: int = 0,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
     current_user: User = Depends(get_current_user)
 ):
-    """채팅방 메시지 목록 조회 (읽음 처리)"""
+    """채팅방 메시지 목록 조회 (읽음 처리)
+
+    이전 기록은 before_id=<가장 오래된 메시지 id>, 새 메시지만 받으려면
+    after_id=<가장 최근 메시지 id>를 사용합니다 (offset보다 빠름).
+    """
     try:
-        messages = get_chat_messages(room_id, current_user.id, limit, offset)
+        messages, watermark = await get_chat_messages_and_mark_read(
+            room_id, current_user.id, limit, offset, before_id=before_id, after_id=after_id
+        )
+        if watermark:
+            await _publish_read(room_id, current_user.id, watermark)
         return {"messages": messages}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -104,11 +148,13 @@ async def peek_room_messages(
     room_id: int,
     limit: int = 50,
     offset: int = 0,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
     current_user: User = Depends(get_current_user)
 ):
     """채팅방 메시지 목록 조회 (읽음 처리 안함 - 실시간 업데이트용)"""
     try:
-        messages = get_chat_messages_without_marking_read(room_id, current_user.id, limit, offset)
+        messages = await get_chat_messages_without_marking_read(room_id, current_user.id, limit, offset, before_id=before_id, after_id=after_id)
         return {"messages": messages}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -117,15 +163,21 @@ async def peek_room_messages(
 @router.put("/rooms/{room_id}/read")
 async def mark_as_read(
     room_id: int,
+    up_to_id: Optional[int] = None,
     current_user: User = Depends(get_current_user)
 ):
-    """메시지 읽음 처리"""
+    """메시지 읽음 처리 (up_to_id까지, 없으면 마지막 메시지까지)"""
     try:
-        success = update_last_read_time(room_id, current_user.id)
-        if success:
-            return {"message": "Messages marked as read"}
+        marked = await mark_messages_read(room_id, current_user.id, up_to_id)
+        if marked is not None:
+            previous, watermark = marked
+            if watermark > previous:
+                await _publish_read(room_id, current_user.id, watermark)
+            return {"message": "Messages marked as read", "last_read_message_id": watermark}
         else:
             raise HTTPException(status_code=404, detail="Chat room not found or user not participant")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -141,8 +193,15 @@ async def update_message_status_endpoint(
         if status not in ['sent', 'delivered', 'read']:
             raise HTTPException(status_code=400, detail="Invalid status. Must be 'sent', 'delivered', or 'read'")
         
-        success = update_message_status(message_id, status)
+        success = await update_message_status(message_id, status, current_user.id)
         if success:
+            message = await get_chat_message(message_id)
+            if message:
+                await chat_hub.publish(message["room_id"], {
+                    "type": "status", "message_id": message_id, "status": status
+                })
+                if status == 'read':
+                    await _publish_read(message["room_id"], current_user.id, message_id)
             return {"message": f"Message status updated to {status}"}
         else:
             raise HTTPException(status_code=404, detail="Message not found")
@@ -160,10 +219,12 @@ async def delete_room(
     """채팅방 삭제 (해당 사용자에게만 보이지 않게 처리)"""
     print(f"🗑️ [API DELETE] 요청 받음: room_id={room_id}, user_id={current_user.id}")
     try:
-        success = delete_chat_room(room_id, current_user.id)
+        success = await delete_chat_room(room_id, current_user.id)
         print(f"🗑️ [API DELETE] DB 함수 결과: {success}")
         
         if success:
+            # 열려 있는 WebSocket 구독자의 연결을 닫음
+            await chat_hub.publish(room_id, {"type": "closed", "room_id": room_id})
             print(f"✅ [API DELETE] 성공 응답 반환")
             return {"message": "Chat room deleted successfully"}
         else:
@@ -176,3 +237,87 @@ async def delete_room(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+
+
+async def _forward_events(websocket: WebSocket, queue: asyncio.Queue):
+    """구독 큐의 이벤트를 WebSocket으로 전달 (채팅방이 삭제되면 연결을 닫음)"""
+    while True:
+        event = await queue.get()
+        await websocket.send_json(event)
+        if event.get("type") == "closed":
+            await websocket.close(code=status.WS_1000_NORMAL_CLOSURE)
+            return
+
+
+@router.websocket("/rooms/{room_id}/ws")
+async def room_events(websocket: WebSocket, room_id: int, token: str = Query(...)):
+    """채팅방 실시간 이벤트 (/messages/peek 폴링 대체)
+
+    ws://.../chat/rooms/{room_id}/ws?token=<JWT>로 연결하면 새 메시지, 읽음,
+    메시지 상태 변경을 {"type": "message" | "read" | "status", ...}로 받습니다.
+    채팅방이 삭제되면 {"type": "closed"}를 받은 뒤 연결이 닫히고, 더 이상
+    참가자가 아니면 메시지/읽음 요청 시 연결이 닫힙니다.
+    클라이언트는 {"type": "message", "content": ...}로 메시지를 보내고,
+    {"type": "read", "up_to_id": <선택>}으로 읽음 처리, {"type": "ping"}으로 연결을 확인할 수 있습니다.
+    """
+    user = await run_db(get_user_from_token, token)
+    if user is None or not await is_chat_participant(room_id, user.id):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    queue = chat_hub.subscribe(room_id)
+    forwarder = asyncio.create_task(_forward_events(websocket, queue))
+    try:
+        while True:
+            try:
+                data = await websocket.receive_json()
+            except ValueError:
+                await websocket.send_json({"type": "error", "detail": "Invalid JSON"})
+                continue
+
+            event_type = data.get("type") if isinstance(data, dict) else None
+            if event_type == "message":
+                try:
+                    request = SendMessageRequest(**{k: v for k, v in data.items() if k != "type"})
+                except ValidationError as e:
+                    await websocket.send_json({"type": "error", "detail": e.errors()})
+                    continue
+                message_id = await send_message(
+                    room_id=room_id,
+                    sender_id=user.id,
+                    content=request.content,
+                    message_type=request.message_type,
+                    file_url=request.file_url,
+                    reply_to_id=request.reply_to_id
+                )
+                if message_id:
+                    await _publish_new_message(room_id, message_id)
+                elif not await is_chat_participant(room_id, user.id):
+                    # 연결 후 채팅방이 삭제됨
+                    await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                    break
+                else:
+                    await websocket.send_json({"type": "error", "detail": "Failed to send message"})
+            elif event_type == "read":
+                up_to_id = data.get("up_to_id")
+                if up_to_id is not None and not isinstance(up_to_id, int):
+                    await websocket.send_json({"type": "error", "detail": "up_to_id must be an integer"})
+                    continue
+                marked = await mark_messages_read(room_id, user.id, up_to_id)
+                if marked is None:
+                    # 연결 후 채팅방이 삭제됨
+                    await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                    break
+                previous, watermark = marked
+                if watermark > previous:
+                    await _publish_read(room_id, user.id, watermark)
+            elif event_type == "ping":
+                await websocket.send_json({"type": "pong"})
+            else:
+                await websocket.send_json({"type": "error", "detail": "Unknown event type"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        forwarder.cancel()
+        chat_hub.unsubscribe(room_id, queue)
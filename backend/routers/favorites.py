@@ -1,26 +1,19 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List, Optional
 from database.connection import get_db_connection
+from database.async_connection import run_db
+from database.counters import counters
 from models.favorite import Favorite, FavoriteUser, RoomSummary
 from models.user import User  # 사용자 정보용
+from utils.matching import load_match_candidates
+from utils.matching_engine import MatchingEngine
 import session
 
 router = APIRouter(prefix="/favorites", tags=["favorites"])
 
 
-@router.post("/")
-async def add_favorite(favorite_data: Favorite):
-    """방 찜하기"""
-
-    # 로그인 체크
-    if session.current_user_session is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="Not logged in"
-        )
-
-    user_id = session.current_user_session["id"]
-    room_id = favorite_data.room_id
-
+def _add_favorite(user_id: int, room_id: str) -> dict:
+    """찜 추가 쿼리 (DB 스레드에서 실행)"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
@@ -59,18 +52,11 @@ async def add_favorite(favorite_data: Favorite):
             (user_id, room_id),
         )
 
-        # 방의 찜 횟수 업데이트
-        cursor.execute(
-            """
-            UPDATE rooms
-            SET favorite_count = favorite_count + 1
-            WHERE room_id = ?
-        """,
-            (room_id,),
-        )
-
         conn.commit()
 
+        # 방의 찜 횟수 업데이트 (버퍼에 모았다가 주기적으로 반영)
+        counters.increment("rooms", "favorite_count", room_id)
+
         return {
             "message": "Added to favorites successfully",
             "user_id": user_id,
@@ -87,9 +73,9 @@ async def add_favorite(favorite_data: Favorite):
         conn.close()
 
 
-@router.delete("/{room_id}")
-async def remove_favorite(room_id: str):
-    """찜 취소"""
+@router.post("/")
+async def add_favorite(favorite_data: Favorite):
+    """방 찜하기"""
 
     # 로그인 체크
     if session.current_user_session is None:
@@ -98,7 +84,13 @@ async def remove_favorite(room_id: str):
         )
 
     user_id = session.current_user_session["id"]
+    room_id = favorite_data.room_id
+
+    return await run_db(_add_favorite, user_id, room_id)
 
+
+def _remove_favorite(user_id: int, room_id: str) -> dict:
+    """찜 삭제 쿼리 (DB 스레드에서 실행)"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
@@ -126,18 +118,11 @@ async def remove_favorite(room_id: str):
             (user_id, room_id),
         )
 
-        # 방의 찜 횟수 감소
-        cursor.execute(
-            """
-            UPDATE rooms
-            SET favorite_count = favorite_count - 1
-            WHERE room_id = ?
-        """,
-            (room_id,),
-        )
-
         conn.commit()
 
+        # 방의 찜 횟수 감소 (버퍼에 모았다가 주기적으로 반영)
+        counters.increment("rooms", "favorite_count", room_id, -1)
+
         return {
             "message": "Removed from favorites successfully",
             "user_id": user_id,
@@ -154,10 +139,23 @@ async def remove_favorite(room_id: str):
         conn.close()
 
 
-@router.get("/{room_id}/users", response_model=List[FavoriteUser])
-async def get_room_favorites(room_id: str):
-    """특정 방을 찜한 사람들 리스트 (로그인 불필요)"""
+@router.delete("/{room_id}")
+async def remove_favorite(room_id: str):
+    """찜 취소"""
 
+    # 로그인 체크
+    if session.current_user_session is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Not logged in"
+        )
+
+    user_id = session.current_user_session["id"]
+
+    return await run_db(_remove_favorite, user_id, room_id)
+
+
+def _get_room_favorites(room_id: str) -> List[FavoriteUser]:
+    """방을 찜한 사용자 조회 쿼리 (DB 스레드에서 실행)"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
@@ -215,10 +213,15 @@ async def get_room_favorites(room_id: str):
         conn.close()
 
 
-@router.get("/user/{user_id}", response_model=List[RoomSummary])
-async def get_user_favorites(user_id: str):
-    """사용자가 찜한 방 목록"""
+@router.get("/{room_id}/users", response_model=List[FavoriteUser])
+async def get_room_favorites(room_id: str):
+    """특정 방을 찜한 사람들 리스트 (로그인 불필요)"""
+
+    return await run_db(_get_room_favorites, room_id)
 
+
+def _get_user_favorites(user_id: str) -> List[RoomSummary]:
+    """사용자가 찜한 방 조회 쿼리 (DB 스레드에서 실행)"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
@@ -249,7 +252,7 @@ async def get_user_favorites(user_id: str):
                 transaction_type=row[4],
                 area=row[5],
                 risk_score=row[6],
-                favorite_count=row[7] if len(row) > 7 else 0,
+                favorite_count=counters.merged("rooms", "favorite_count", row[0], row[7]),
                 floor=row[8] if len(row) > 8 else None,
                 rooms=row[9] if len(row) > 9 else None,
                 thumbnail_image=None,  # 나중에 이미지 기능 구현
@@ -265,6 +268,13 @@ async def get_user_favorites(user_id: str):
         conn.close()
 
 
+@router.get("/user/{user_id}", response_model=List[RoomSummary])
+async def get_user_favorites(user_id: str):
+    """사용자가 찜한 방 목록"""
+
+    return await run_db(_get_user_favorites, user_id)
+
+
 @router.get("/my-favorites", response_model=List[RoomSummary])
 async def get_my_favorites():
     """내가 찜한 방 목록"""
@@ -279,6 +289,50 @@ async def get_my_favorites():
     return await get_user_favorites(user_id)
 
 
+def _get_matched_roommates(user_id: int, room_id: str) -> List[FavoriteUser]:
+    """찜한 사람들의 매칭 점수 계산 (DB 스레드에서 실행)
+
+    찜한 사용자 목록 1회 + 프로필 1회 조회 후, 한 번의 벡터 연산으로 점수를 계산합니다.
+    """
+    favorite_users = _get_room_favorites(room_id)
+
+    # 나 자신은 제외 (문자열과 정수 모두 고려)
+    favorite_users = [
+        user for user in favorite_users if str(user.user_id) != str(user_id)
+    ]
+    if not favorite_users:
+        return favorite_users
+
+    # 나와 찜한 사람들의 프로필을 한 번에 조회 (프로필이 없는 사용자는 빠짐)
+    profiles = {
+        profile.user_id: profile
+        for profile in load_match_candidates(
+            [user_id] + [int(user.user_id) for user in favorite_users],
+            complete_only=False,
+        )
+    }
+    user_profile = profiles.get(user_id)
+
+    # 6개 요소 매칭 알고리즘 사용 - 내 프로필이 미완성이거나 상대 프로필이
+    # 없거나 미완성이면 0점 (찜한 순서 유지)
+    if user_profile and user_profile.is_complete:
+        others = [profiles.get(int(user.user_id)) for user in favorite_users]
+        scored = [other for other in others if other is not None]
+        scores = MatchingEngine(scored).score(user_profile) if scored else []
+        score_by_id = {other.user_id: score for other, score in zip(scored, scores)}
+        for user in favorite_users:
+            compatibility = score_by_id.get(int(user.user_id), 0.0)
+            user.matching_score = int(compatibility * 100)  # 0-1을 0-100으로 변환
+    else:
+        for user in favorite_users:
+            user.matching_score = 0
+
+    # 매칭 점수 높은 순으로 정렬
+    favorite_users.sort(key=lambda x: x.matching_score, reverse=True)
+
+    return favorite_users
+
+
 @router.get("/{room_id}/matched", response_model=List[FavoriteUser])
 async def get_matched_roommates(room_id: str):
     """찜한 사람들 중 나와 매칭도 높은 순으로 정렬"""
@@ -291,62 +345,18 @@ async def get_matched_roommates(room_id: str):
 
     user_id = session.current_user_session["id"]
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     try:
-        # 일단 기본 찜한 사람들 가져오기
-        favorite_users = await get_room_favorites(room_id)
-
-        # 나 자신은 제외 (문자열과 정수 모두 고려)
-        favorite_users = [
-            user for user in favorite_users if str(user.user_id) != str(user_id)
-        ]
-
-        # 6개 요소 매칭 알고리즘 사용
-        from database.connection import get_user_profile
-        from utils.matching import calculate_compatibility
-
-        user_profile = get_user_profile(user_id)
-        if user_profile and user_profile.is_complete:
-            for user in favorite_users:
-                other_profile = get_user_profile(int(user.user_id))
-                if other_profile and other_profile.is_complete:
-                    compatibility = calculate_compatibility(user_profile, other_profile)
-                    user.matching_score = int(
-                        compatibility * 100
-                    )  # 0-1을 0-100으로 변환
-                else:
-                    user.matching_score = 0  # 프로필이 완성되지 않은 경우
-        else:
-            # 현재 사용자의 프로필이 완성되지 않은 경우 랜덤 점수
-            import random
-
-            for user in favorite_users:
-                user.matching_score = random.randint(50, 80)
-
-        # 매칭 점수 높은 순으로 정렬
-        favorite_users.sort(key=lambda x: x.matching_score, reverse=True)
-
-        return favorite_users
+        return await run_db(_get_matched_roommates, user_id, room_id)
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error getting matched roommates: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{room_id}/check")
-async def check_favorite_status(room_id: str):
-    """내가 이 방을 찜했는지 확인"""
-
-    # 로그인 체크
-    if session.current_user_session is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="Not logged in"
-        )
-
-    user_id = session.current_user_session["id"]
-
+def _check_favorite_status(user_id: int, room_id: str) -> dict:
+    """찜 여부 조회 쿼리 (DB 스레드에서 실행)"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
@@ -371,3 +381,18 @@ async def check_favorite_status(room_id: str):
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         conn.close()
+
+
+@router.get("/{room_id}/check")
+async def check_favorite_status(room_id: str):
+    """내가 이 방을 찜했는지 확인"""
+
+    # 로그인 체크
+    if session.current_user_session is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Not logged in"
+        )
+
+    user_id = session.current_user_session["id"]
+
+    return await run_db(_check_favorite_status, user_id, room_id)
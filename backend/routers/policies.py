@@ -10,6 +10,7 @@ from crawlers.youth_policy_crawler import YouthPolicyCrawler
 from crawlers.youth_center_crawler import YouthCenterCrawler
 from auth.jwt_handler import verify_token
 from database.connection import get_db_connection
+from database.counters import counters
 
 
 router = APIRouter(prefix="/policies", tags=["policies"])
@@ -77,7 +78,7 @@ async def get_policy_recommendations(
                 "category": p[12],
                 "region": p[13],
                 "details": details,
-                "view_count": p[15],
+                "view_count": counters.merged("policies", "view_count", p[0], p[15]),
                 "created_at": p[16],
                 "policy": {
                     "id": p[0],
@@ -156,7 +157,7 @@ async def get_popular_policies(
                 "category": p[12],
                 "region": p[13],
                 "details": details,
-                "view_count": p[15],
+                "view_count": counters.merged("policies", "view_count", p[0], p[15]),
                 "created_at": p[16]
             })
         
@@ -253,7 +254,7 @@ async def get_policies_by_category(
                 target_gender=policy_data[8],
                 target_location=policy_data[9],
                 tags=json.loads(policy_data[10]) if policy_data[10] else [],
-                view_count=policy_data[11],
+                view_count=counters.merged("policies", "view_count", policy_data[0], policy_data[11]),
                 relevance_score=policy_data[12],
                 crawled_at=datetime.fromisoformat(policy_data[13])
             )
@@ -638,7 +639,7 @@ async def search_policies(
                 target_gender=policy_data[8],
                 target_location=policy_data[9],
                 tags=json.loads(policy_data[10]) if policy_data[10] else [],
-                view_count=policy_data[11],
+                view_count=counters.merged("policies", "view_count", policy_data[0], policy_data[11]),
                 relevance_score=policy_data[12],
                 crawled_at=datetime.fromisoformat(policy_data[13])
             )
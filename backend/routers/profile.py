@@ -1,13 +1,26 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, status
+from typing import List, Optional
 from models.profile import UserProfile, ProfileUpdateRequest, MatchingResult
-from database.connection import get_user_profile, update_user_profile, get_completed_profiles
+from database.connection import get_db_connection
+from database.async_connection import run_db, get_user_profile, update_user_profile
+from utils.match_cache import get_cached_matches
 from utils.matching import find_matches
+from utils.matching_engine import MatchConstraints
 import session
 
 router = APIRouter(prefix="/profile", tags=["profile"])
 
 
+def _create_empty_profile(user_id: int):
+    """빈 프로필 생성 (DB 스레드에서 실행)"""
+    conn = get_db_connection()
+    try:
+        conn.execute("INSERT INTO user_profiles (user_id) VALUES (?)", (user_id,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
 @router.get("/me", response_model=UserProfile)
 async def get_my_profile():
     """현재 로그인한 사용자의 프로필을 조회합니다"""
@@ -18,22 +31,16 @@ async def get_my_profile():
         )
     
     user_id = session.current_user_session["id"]
-    profile = get_user_profile(user_id)
+    profile = await get_user_profile(user_id)
     
     if not profile:
         # 프로필이 없으면 빈 프로필 생성
-        from database.connection import get_db_connection
-        conn = get_db_connection()
-        cursor = conn.cursor()
         try:
-            cursor.execute("INSERT INTO user_profiles (user_id) VALUES (?)", (user_id,))
-            conn.commit()
-            conn.close()
+            await run_db(_create_empty_profile, user_id)
             
             # 새로 생성된 프로필 반환
-            profile = get_user_profile(user_id)
+            profile = await get_user_profile(user_id)
         except Exception as e:
-            conn.close()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create profile"
@@ -53,19 +60,27 @@ async def update_my_profile(profile_data: ProfileUpdateRequest):
     
     user_id = session.current_user_session["id"]
     
-    if not update_user_profile(user_id, profile_data):
+    if not await update_user_profile(user_id, profile_data):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Failed to update profile"
         )
     
-    updated_profile = get_user_profile(user_id)
+    updated_profile = await get_user_profile(user_id)
     return updated_profile
 
 
 @router.get("/matches", response_model=List[MatchingResult])
-async def get_my_matches():
-    """현재 로그인한 사용자와 호환되는 룸메이트 목록을 반환합니다"""
+async def get_my_matches(
+    strict_smoking: bool = Query(False, description="흡연 호환성이 0인 상대 제외"),
+    same_gender: bool = Query(False, description="같은 성별만"),
+    min_age: Optional[int] = Query(None, ge=0),
+    max_age: Optional[int] = Query(None, ge=0),
+):
+    """현재 로그인한 사용자와 호환되는 룸메이트 목록을 반환합니다
+
+    필수 조건을 주면 캐시 대신 조건에 맞는 후보만 골라 계산합니다.
+    """
     if session.current_user_session is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -73,7 +88,7 @@ async def get_my_matches():
         )
     
     user_id = session.current_user_session["id"]
-    user_profile = get_user_profile(user_id)
+    user_profile = await get_user_profile(user_id)
     
     if not user_profile or not user_profile.is_complete:
         raise HTTPException(
@@ -81,8 +96,16 @@ async def get_my_matches():
             detail="Profile must be completed before matching"
         )
     
-    all_profiles = get_completed_profiles()
-    matches = find_matches(user_id, all_profiles)
+    if strict_smoking or same_gender or min_age is not None or max_age is not None:
+        constraints = MatchConstraints(
+            strict_smoking=strict_smoking,
+            genders=(user_profile.gender,) if same_gender else None,
+            min_age=min_age,
+            max_age=max_age,
+        )
+        matches = await run_db(find_matches, user_id, None, constraints)
+    else:
+        matches = await run_db(get_cached_matches, user_id)
     
     return matches
 
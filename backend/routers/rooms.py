@@ -1,41 +1,109 @@
 from fastapi import APIRouter, HTTPException, status, Query
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from database.connection import get_db_connection
-from models.room import Room, RoomCreate, RoomPin
+from database.async_connection import run_db
+from database.counters import counters
+from database.migrations import ROOM_TILE_SIZE
+from models.room import Room, RoomCreate, RoomPin, RoomCluster
+from utils.market_price import lookup_market_price, market_price_refresher
+from utils.tile_cache import TileCache, estimate_rows_size
+import os
 import uuid
 
 router = APIRouter(prefix="/rooms", tags=["rooms"])
 
+# 줌 레벨 -> 클러스터 격자 레벨 차이 (지도 타일 한 장을 4x4 셀로 나눔)
+CLUSTER_LEVEL_OFFSET = 2
 
-@router.get("/search/text", response_model=List[RoomPin])
-async def search_rooms_by_text(
-    query: str = Query(..., description="검색어 (주소, 지역명 등)"),
-    limit: int = Query(100, description="결과 개수 제한"),
-):
-    """텍스트 기반 방 검색"""
+# 지도 검색 결과 개수 제한
+MAP_SEARCH_LIMIT = 3000
+
+# 지도 검색 타일 캐시 (타일 + 가격/거래유형 필터 단위로 핀 목록 보관)
+MAP_TILE_CACHE_BYTES = int(os.getenv("MAP_TILE_CACHE_BYTES", str(32 * 1024 * 1024)))
+# 요청 범위가 이보다 많은 타일에 걸치면 (많이 축소된 지도) 캐시 없이 바로 조회
+MAP_TILE_CACHE_MAX_TILES = 64
+# 캐시에 없는 타일들을 한 번에 읽을 최대 행 수 (넘으면 매물이 너무 많은 범위로 보고 캐시 없이 조회)
+MAP_TILE_CACHE_MAX_FETCH_ROWS = MAP_SEARCH_LIMIT
+_map_tile_cache = TileCache(MAP_TILE_CACHE_BYTES)
+
+# trigram 토크나이저가 색인하는 최소 글자 수 (더 짧은 검색어는 LIKE로 거름)
+FTS_MIN_TERM_LENGTH = 3
+
+# 선택적 가상 테이블(rooms_rtree, rooms_fts) 존재 여부 (첫 조회 시 확인)
+_optional_tables = {}
+
+
+def _has_table(cursor, name: str) -> bool:
+    """마이그레이션으로 만들어졌을 수 있는 테이블이 있는지 확인합니다."""
+    if name not in _optional_tables:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        )
+        _optional_tables[name] = cursor.fetchone() is not None
+    return _optional_tables[name]
+
+
+def _has_rooms_rtree(cursor) -> bool:
+    """R*Tree 공간 인덱스(rooms_rtree)를 사용할 수 있는지 확인합니다."""
+    return _has_table(cursor, "rooms_rtree")
+
+
+def _has_rooms_fts(cursor) -> bool:
+    """FTS5 전문 검색 인덱스(rooms_fts)를 사용할 수 있는지 확인합니다."""
+    return _has_table(cursor, "rooms_fts")
 
+
+def _search_rooms_by_text(query: str, limit: int) -> List[RoomPin]:
+    """텍스트 기반 방 검색 쿼리 (DB 스레드에서 실행)"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
     try:
-        # 주소, 설명, 거래유형에서 검색어를 포함하는 방 검색
-        search_query = f"%{query}%"
+        # 공백으로 나눈 검색어를 모두 포함하는 방 검색
+        terms = query.split()
+        fts_terms = [term for term in terms if len(term) >= FTS_MIN_TERM_LENGTH]
+        like_terms = [term for term in terms if len(term) < FTS_MIN_TERM_LENGTH]
 
         sql = """
-            SELECT room_id, address, latitude, longitude, price_deposit, price_monthly,
-                   transaction_type, area, rooms, risk_score, favorite_count
-            FROM rooms
-            WHERE is_active = 1
-            AND (
-                address LIKE ? OR
-                description LIKE ? OR
-                transaction_type LIKE ?
-            )
-            ORDER BY view_count DESC, favorite_count DESC
-            LIMIT ?
+            SELECT r.room_id, r.address, r.latitude, r.longitude, r.price_deposit, r.price_monthly,
+                   r.transaction_type, r.area, r.rooms, r.risk_score, r.favorite_count
         """
+        params = []
+
+        use_fts = bool(fts_terms) and _has_rooms_fts(cursor)
+        if use_fts:
+            # FTS5 인덱스로 후보를 찾음 (각 검색어를 구문으로 감싸 AND 검색)
+            sql += """
+            FROM rooms_fts f
+            CROSS JOIN rooms r ON r.id = f.rowid
+            WHERE rooms_fts MATCH ? AND r.is_active = 1
+            """
+            params.append(" ".join('"' + term.replace('"', '""') + '"' for term in fts_terms))
+        else:
+            sql += " FROM rooms r WHERE r.is_active = 1"
+            like_terms = terms
+
+        # 주소, 설명, 거래유형에서 짧은 검색어를 포함하는지 확인
+        for term in like_terms:
+            sql += " AND (r.address LIKE ? OR r.description LIKE ? OR r.transaction_type LIKE ?)"
+            search_term = f"%{term}%"
+            params += [search_term, search_term, search_term]
+
+        if use_fts:
+            # bm25 점수(음수, 작을수록 관련도 높음)에 조회수/찜수 가중치(최대 2배)를 곱해 정렬
+            sql += """
+            ORDER BY bm25(rooms_fts, 2.0, 1.0) * (
+                1.0 + (COALESCE(r.view_count, 0) + 2 * COALESCE(r.favorite_count, 0))
+                    / (COALESCE(r.view_count, 0) + 2 * COALESCE(r.favorite_count, 0) + 50.0)
+            ), r.view_count DESC, r.favorite_count DESC
+            """
+        else:
+            sql += " ORDER BY r.view_count DESC, r.favorite_count DESC"
 
-        cursor.execute(sql, (search_query, search_query, search_query, limit))
+        sql += " LIMIT ?"
+        params.append(limit)
+
+        cursor.execute(sql, params)
         results = cursor.fetchall()
 
         # 결과를 RoomPin 모델로 변환
@@ -52,7 +120,7 @@ async def search_rooms_by_text(
                 area=row[7],
                 rooms=row[8] or 1,
                 risk_score=row[9],
-                favorite_count=row[10],
+                favorite_count=counters.merged("rooms", "favorite_count", row[0], row[10]),
             )
             rooms.append(room)
 
@@ -65,56 +133,212 @@ async def search_rooms_by_text(
         conn.close()
 
 
-@router.get("/search", response_model=List[RoomPin])
-async def search_rooms_on_map(
-    lat_min: float = Query(..., description="최소 위도"),
-    lat_max: float = Query(..., description="최대 위도"),
-    lng_min: float = Query(..., description="최소 경도"),
-    lng_max: float = Query(..., description="최대 경도"),
-    min_price: Optional[int] = Query(None, description="최소 보증금"),
-    max_price: Optional[int] = Query(None, description="최대 보증금"),
-    transaction_type: Optional[str] = Query(None, description="거래 유형 (전세/월세)"),
+@router.get("/search/text", response_model=List[RoomPin])
+async def search_rooms_by_text(
+    query: str = Query(..., description="검색어 (주소, 지역명 등)"),
+    limit: int = Query(100, description="결과 개수 제한"),
 ):
-    """지도 범위 내 방 목록 조회 (핀 표시용)"""
-
-    conn = get_db_connection()
+    """텍스트 기반 방 검색"""
+    return await run_db(_search_rooms_by_text, query, limit)
+
+
+def _tile_of(latitude: float, longitude: float) -> Tuple[int, int]:
+    """좌표가 속한 캐시 타일 번호 (room_tile_versions 트리거와 같은 계산)"""
+    return (
+        int((longitude + 180.0) / ROOM_TILE_SIZE),
+        int((latitude + 90.0) / ROOM_TILE_SIZE),
+    )
+
+
+def _query_pin_rows(
+    cursor,
+    lat_min: float,
+    lat_max: float,
+    lng_min: float,
+    lng_max: float,
+    min_price: Optional[int],
+    max_price: Optional[int],
+    transaction_type: Optional[str],
+    limit: Optional[int] = None,
+) -> list:
+    """지도 범위 내 활성 매물의 핀 정보 행을 room_id 순으로 조회합니다."""
+    # 기본 쿼리 - floor 필드 추가
+    query = """
+        SELECT r.room_id, r.address, r.latitude, r.longitude, r.price_deposit, r.price_monthly,
+               r.transaction_type, r.area, r.rooms, r.risk_score, r.favorite_count, r.floor
+    """
+    params = []
+
+    if _has_rooms_rtree(cursor):
+        # R*Tree로 범위 후보를 찾고 (CROSS JOIN으로 R*Tree를 먼저 탐색하도록 고정),
+        # float32 오차는 실제 좌표로 다시 확인
+        query += """
+        FROM rooms_rtree t
+        CROSS JOIN rooms r ON r.id = t.id
+        WHERE t.max_lat >= ? AND t.min_lat <= ?
+        AND t.max_lng >= ? AND t.min_lng <= ?
+        AND
+        """
+        params += [lat_min, lat_max, lng_min, lng_max]
+    else:
+        query += " FROM rooms r WHERE"
+
+    query += """
+        r.is_active = 1
+        AND r.latitude BETWEEN ? AND ?
+        AND r.longitude BETWEEN ? AND ?
+    """
+    params += [lat_min, lat_max, lng_min, lng_max]
+
+    # 가격 필터 추가
+    if min_price is not None:
+        query += " AND r.price_deposit >= ?"
+        params.append(min_price)
+
+    if max_price is not None:
+        query += " AND r.price_deposit <= ?"
+        params.append(max_price)
+
+    # 거래 유형 필터 추가
+    if transaction_type:
+        query += " AND r.transaction_type = ?"
+        params.append(transaction_type)
+
+    query += " ORDER BY r.room_id"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    cursor.execute(query, params)
+    return cursor.fetchall()
+
+
+def _cached_pin_rows(
+    conn,
+    lat_min: float,
+    lat_max: float,
+    lng_min: float,
+    lng_max: float,
+    min_price: Optional[int],
+    max_price: Optional[int],
+    transaction_type: Optional[str],
+) -> Optional[list]:
+    """요청 범위에 걸친 타일들의 핀 행을 캐시에서 모아 반환합니다.
+
+    타일 버전과 매물 행을 같은 읽기 트랜잭션(스냅샷)에서 읽으므로, 캐시에
+    저장되는 타일 내용은 항상 함께 저장되는 버전과 일치합니다.
+    범위가 너무 넓거나 캐시에 없는 타일들의 매물이 MAP_TILE_CACHE_MAX_FETCH_ROWS를
+    넘으면 None을 반환합니다 (캐시 없이 LIMIT을 건 직접 조회).
+    """
+    x_min, y_min = _tile_of(lat_min, lng_min)
+    x_max, y_max = _tile_of(lat_max, lng_max)
+    if (x_max - x_min + 1) * (y_max - y_min + 1) > MAP_TILE_CACHE_MAX_TILES:
+        return None
+
+    filters = (min_price, max_price, transaction_type or None)
     cursor = conn.cursor()
+    cursor.execute("BEGIN")
 
     try:
-        # 기본 쿼리 - floor 필드 추가
-        query = """
-            SELECT room_id, address, latitude, longitude, price_deposit, price_monthly,
-                   transaction_type, area, rooms, risk_score, favorite_count, floor
-            FROM rooms
-            WHERE is_active = 1
-            AND latitude BETWEEN ? AND ?
-            AND longitude BETWEEN ? AND ?
-        """
-        params = [lat_min, lat_max, lng_min, lng_max]
-
-        # 가격 필터 추가
-        if min_price is not None:
-            query += " AND price_deposit >= ?"
-            params.append(min_price)
-
-        if max_price is not None:
-            query += " AND price_deposit <= ?"
-            params.append(max_price)
+        cursor.execute(
+            """
+            SELECT tile_x, tile_y, version FROM room_tile_versions
+            WHERE tile_x BETWEEN ? AND ? AND tile_y BETWEEN ? AND ?
+        """,
+            (x_min, x_max, y_min, y_max),
+        )
+        versions = {(tile_x, tile_y): version for tile_x, tile_y, version in cursor.fetchall()}
+
+        rows = []
+        missing = []
+        for tile_x in range(x_min, x_max + 1):
+            for tile_y in range(y_min, y_max + 1):
+                tile_rows = _map_tile_cache.get(
+                    (tile_x, tile_y, filters), versions.get((tile_x, tile_y), 0)
+                )
+                if tile_rows is None:
+                    missing.append((tile_x, tile_y))
+                else:
+                    rows.extend(tile_rows)
+
+        if missing:
+            # 없는 타일들을 감싸는 범위를 한 번에 읽고 타일별로 나눠 저장
+            miss_x = [tile[0] for tile in missing]
+            miss_y = [tile[1] for tile in missing]
+            fetched = _query_pin_rows(
+                cursor,
+                min(miss_y) * ROOM_TILE_SIZE - 90.0 - 1e-9,
+                (max(miss_y) + 1) * ROOM_TILE_SIZE - 90.0 + 1e-9,
+                min(miss_x) * ROOM_TILE_SIZE - 180.0 - 1e-9,
+                (max(miss_x) + 1) * ROOM_TILE_SIZE - 180.0 + 1e-9,
+                min_price,
+                max_price,
+                transaction_type,
+                limit=MAP_TILE_CACHE_MAX_FETCH_ROWS + 1,
+            )
+            if len(fetched) > MAP_TILE_CACHE_MAX_FETCH_ROWS:
+                return None
+
+            by_tile = {tile: [] for tile in missing}
+            for row in fetched:
+                tile = _tile_of(row[2], row[3])
+                if tile in by_tile:
+                    by_tile[tile].append(row)
+
+            for (tile_x, tile_y), tile_rows in by_tile.items():
+                tile_rows = tuple(tile_rows)
+                _map_tile_cache.put(
+                    (tile_x, tile_y, filters),
+                    versions.get((tile_x, tile_y), 0),
+                    tile_rows,
+                    estimate_rows_size(tile_rows),
+                )
+                rows.extend(tile_rows)
+    finally:
+        conn.rollback()  # 읽기 전용 트랜잭션 종료
+
+    # 타일 결과를 요청 범위로 잘라서 합침
+    rows = [
+        row for row in rows
+        if lat_min <= row[2] <= lat_max and lng_min <= row[3] <= lng_max
+    ]
+    rows.sort(key=lambda row: row[0])
+    return rows
+
+
+def _search_rooms_on_map(
+    lat_min: float,
+    lat_max: float,
+    lng_min: float,
+    lng_max: float,
+    min_price: Optional[int],
+    max_price: Optional[int],
+    transaction_type: Optional[str],
+) -> List[RoomPin]:
+    """지도 범위 내 방 목록 쿼리 (DB 스레드에서 실행)"""
+    conn = get_db_connection()
 
-        # 거래 유형 필터 추가
-        if transaction_type:
-            query += " AND transaction_type = ?"
-            params.append(transaction_type)
+    try:
+        rows = _cached_pin_rows(
+            conn, lat_min, lat_max, lng_min, lng_max, min_price, max_price, transaction_type
+        )
+        if rows is None:
+            rows = _query_pin_rows(
+                conn.cursor(),
+                lat_min,
+                lat_max,
+                lng_min,
+                lng_max,
+                min_price,
+                max_price,
+                transaction_type,
+                limit=MAP_SEARCH_LIMIT,
+            )
 
         # 모든 매물 반환 (프론트엔드에서 클러스터링 처리)
-        query += " ORDER BY room_id LIMIT 3000"
-
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-
         # 결과를 RoomPin 모델로 변환
         rooms = []
-        for row in results:
+        for row in rows[:MAP_SEARCH_LIMIT]:
             room = RoomPin(
                 room_id=row[0],
                 address=row[1],
@@ -126,7 +350,7 @@ async def search_rooms_on_map(
                 area=row[7],
                 rooms=row[8] or 1,  # rooms 필드 추가
                 risk_score=row[9],
-                favorite_count=row[10],
+                favorite_count=counters.merged("rooms", "favorite_count", row[0], row[10]),
                 floor=row[11] if len(row) > 11 else None,  # floor 필드 추가
             )
             rooms.append(room)
@@ -140,19 +364,143 @@ async def search_rooms_on_map(
         conn.close()
 
 
-@router.get("/{room_id}", response_model=Room)
-async def get_room_detail(room_id: str):
-    """특정 방 상세 정보 조회 (핀 클릭 시)"""
-
+@router.get("/search", response_model=List[RoomPin])
+async def search_rooms_on_map(
+    lat_min: float = Query(..., description="최소 위도"),
+    lat_max: float = Query(..., description="최대 위도"),
+    lng_min: float = Query(..., description="최소 경도"),
+    lng_max: float = Query(..., description="최대 경도"),
+    min_price: Optional[int] = Query(None, description="최소 보증금"),
+    max_price: Optional[int] = Query(None, description="최대 보증금"),
+    transaction_type: Optional[str] = Query(None, description="거래 유형 (전세/월세)"),
+):
+    """지도 범위 내 방 목록 조회 (핀 표시용)"""
+    return await run_db(
+        _search_rooms_on_map,
+        lat_min,
+        lat_max,
+        lng_min,
+        lng_max,
+        min_price,
+        max_price,
+        transaction_type,
+    )
+
+
+@router.get("/search/cache-stats")
+async def get_map_search_cache_stats():
+    """지도 검색 타일 캐시 적중/미스 통계 (캐시 크기 조정용)"""
+    return _map_tile_cache.stats()
+
+
+def _get_room_clusters(
+    lat_min: float,
+    lat_max: float,
+    lng_min: float,
+    lng_max: float,
+    zoom: int,
+    transaction_type: Optional[str],
+) -> List[RoomCluster]:
+    """미리 집계된 격자 셀에서 지도 범위의 클러스터 조회 (DB 스레드에서 실행)"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
     try:
-        # 조회수 증가
+        # 줌에 가장 가까운 격자 레벨 선택
         cursor.execute(
-            "UPDATE rooms SET view_count = view_count + 1 WHERE room_id = ?", (room_id,)
+            """
+            SELECT level, cell_size FROM room_cluster_levels
+            ORDER BY ABS(level - ?), level LIMIT 1
+        """,
+            (zoom + CLUSTER_LEVEL_OFFSET,),
         )
+        level, cell_size = cursor.fetchone()
+
+        query = """
+            SELECT cell_x, cell_y, transaction_type, room_count,
+                   sum_lat, sum_lng, sum_deposit, min_deposit
+            FROM room_clusters
+            WHERE level = ?
+            AND cell_x BETWEEN ? AND ?
+            AND cell_y BETWEEN ? AND ?
+        """
+        params = [
+            level,
+            int((lng_min + 180.0) / cell_size),
+            int((lng_max + 180.0) / cell_size),
+            int((lat_min + 90.0) / cell_size),
+            int((lat_max + 90.0) / cell_size),
+        ]
+
+        if transaction_type:
+            query += " AND transaction_type = ?"
+            params.append(transaction_type)
 
+        cursor.execute(query, params)
+
+        # 셀별로 거래 유형 행을 합침
+        cells = {}
+        for cell_x, cell_y, tx_type, count, sum_lat, sum_lng, sum_deposit, min_deposit in cursor.fetchall():
+            cell = cells.setdefault(
+                (cell_x, cell_y),
+                {"count": 0, "sum_lat": 0.0, "sum_lng": 0.0, "sum_deposit": 0, "min_deposit": None, "types": {}},
+            )
+            cell["count"] += count
+            cell["sum_lat"] += sum_lat
+            cell["sum_lng"] += sum_lng
+            cell["sum_deposit"] += sum_deposit
+            if min_deposit is not None and (cell["min_deposit"] is None or min_deposit < cell["min_deposit"]):
+                cell["min_deposit"] = min_deposit
+            cell["types"][tx_type] = count
+
+        return [
+            RoomCluster(
+                cluster_id=f"{level}:{cell_x}:{cell_y}",
+                level=level,
+                count=cell["count"],
+                latitude=cell["sum_lat"] / cell["count"],
+                longitude=cell["sum_lng"] / cell["count"],
+                min_deposit=cell["min_deposit"],
+                avg_deposit=int(cell["sum_deposit"] / cell["count"]),
+                transaction_types=cell["types"],
+            )
+            for (cell_x, cell_y), cell in cells.items()
+        ]
+
+    except Exception as e:
+        print(f"Error getting room clusters: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        conn.close()
+
+
+@router.get("/clusters", response_model=List[RoomCluster])
+async def get_room_clusters(
+    lat_min: float = Query(..., description="최소 위도"),
+    lat_max: float = Query(..., description="최대 위도"),
+    lng_min: float = Query(..., description="최소 경도"),
+    lng_max: float = Query(..., description="최대 경도"),
+    zoom: int = Query(..., ge=0, le=22, description="지도 줌 레벨"),
+    transaction_type: Optional[str] = Query(None, description="거래 유형 (전세/월세)"),
+):
+    """지도 범위 내 매물 클러스터 조회 (축소된 지도 표시용)"""
+    return await run_db(
+        _get_room_clusters,
+        lat_min,
+        lat_max,
+        lng_min,
+        lng_max,
+        zoom,
+        transaction_type,
+    )
+
+
+def _get_room_detail(room_id: str) -> Room:
+    """방 상세 조회 및 조회수 증가 (DB 스레드에서 실행)"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
         # 방 상세 정보 조회
         cursor.execute(
             """
@@ -170,7 +518,8 @@ async def get_room_detail(room_id: str):
         if not result:
             raise HTTPException(status_code=404, detail="Room not found")
 
-        conn.commit()  # 조회수 업데이트 커밋
+        # 조회수 증가 (쓰기 잠금 없이 버퍼에 모았다가 주기적으로 반영)
+        counters.increment("rooms", "view_count", room_id)
 
         # Room 모델로 변환
         room = Room(
@@ -189,8 +538,8 @@ async def get_room_detail(room_id: str):
             landlord_name=result[12],
             landlord_phone=result[13],
             risk_score=result[14],
-            view_count=result[15],
-            favorite_count=result[16],
+            view_count=counters.merged("rooms", "view_count", room_id, result[15]),
+            favorite_count=counters.merged("rooms", "favorite_count", room_id, result[16]),
             created_at=result[17],
         )
 
@@ -205,10 +554,14 @@ async def get_room_detail(room_id: str):
         conn.close()
 
 
-@router.post("/", response_model=dict)
-async def create_room(room_data: RoomCreate):
-    """새 방 정보 등록"""
+@router.get("/{room_id}", response_model=Room)
+async def get_room_detail(room_id: str):
+    """특정 방 상세 정보 조회 (핀 클릭 시)"""
+    return await run_db(_get_room_detail, room_id)
 
+
+def _create_room(room_data: RoomCreate) -> dict:
+    """방 등록 쿼리 (DB 스레드에서 실행)"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
@@ -243,6 +596,7 @@ async def create_room(room_data: RoomCreate):
         )
 
         conn.commit()
+        market_price_refresher.wake()  # 시세 통계에 바로 반영
 
         return {"message": "Room created successfully", "room_id": room_id}
 
@@ -254,10 +608,14 @@ async def create_room(room_data: RoomCreate):
         conn.close()
 
 
-@router.get("/{room_id}/market-price")
-async def get_market_price(room_id: str):
-    """방 시세 정보 조회 (전세사기 예방용)"""
+@router.post("/", response_model=dict)
+async def create_room(room_data: RoomCreate):
+    """새 방 정보 등록"""
+    return await run_db(_create_room, room_data)
+
 
+def _get_market_price(room_id: str) -> dict:
+    """주변 시세 계산 쿼리 (DB 스레드에서 실행)"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
@@ -265,7 +623,7 @@ async def get_market_price(room_id: str):
         # 해당 방 정보 조회
         cursor.execute(
             """
-            SELECT address, price_deposit, transaction_type, area
+            SELECT id, address, price_deposit, transaction_type, area
             FROM rooms
             WHERE room_id = ? AND is_active = 1
         """,
@@ -277,35 +635,27 @@ async def get_market_price(room_id: str):
         if not result:
             raise HTTPException(status_code=404, detail="Room not found")
 
-        address, price_deposit, transaction_type, area = result
-
-        # 주변 유사 매물 조회 (같은 주소 기반)
-        cursor.execute(
-            """
-            SELECT price_deposit, area, transaction_type, created_at
-            FROM rooms
-            WHERE address LIKE ? AND room_id != ? AND is_active = 1
-            ORDER BY created_at DESC LIMIT 5
-        """,
-            (f"%{address.split()[0]}%", room_id),
-        )  # 첫번째 주소 단어로 검색
+        room_rowid, address, price_deposit, transaction_type, area = result
 
-        nearby_prices = cursor.fetchall()
+        # 같은 구/동, 면적 구간의 미리 계산된 시세 통계 조회 (이 매물은 제외)
+        stats = lookup_market_price(cursor, address, area, transaction_type, room_rowid)
 
         # 평균 시세 계산
-        if nearby_prices:
-            avg_price = sum(row[0] for row in nearby_prices) / len(nearby_prices)
-            avg_price_per_sqm = avg_price / area if area > 0 else 0
+        if stats and area > 0:
+            avg_price_per_sqm = stats["mean_per_sqm"]
+            avg_price = avg_price_per_sqm * area
+            nearby_count = stats["sample_count"]
         else:
             avg_price = price_deposit
             avg_price_per_sqm = price_deposit / area if area > 0 else 0
+            nearby_count = 0
 
         return {
             "room_id": room_id,
             "current_price": price_deposit,
             "average_price": int(avg_price),
             "price_per_sqm": int(avg_price_per_sqm),
-            "nearby_count": len(nearby_prices),
+            "nearby_count": nearby_count,
             "price_analysis": {
                 "is_expensive": price_deposit > avg_price * 1.2,
                 "is_cheap": price_deposit < avg_price * 0.8,
@@ -315,6 +665,7 @@ async def get_market_price(room_id: str):
                     else 0
                 ),
             },
+            "market_stats": stats,
         }
 
     except HTTPException:
@@ -324,3 +675,9 @@ async def get_market_price(room_id: str):
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         conn.close()
+
+
+@router.get("/{room_id}/market-price")
+async def get_market_price(room_id: str):
+    """방 시세 정보 조회 (전세사기 예방용)"""
+    return await run_db(_get_market_price, room_id)
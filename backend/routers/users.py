@@ -3,7 +3,8 @@ from fastapi.security import HTTPBearer
 from models.user import User
 from pydantic import BaseModel
 from auth.jwt_handler import get_current_user
-from database.connection import get_db_connection, get_user_info, update_user_info
+from database.connection import get_db_connection, get_user_info as get_user_info_sync
+from database.async_connection import run_db, get_user_info, update_user_info
 
 router = APIRouter()
 
@@ -17,14 +18,13 @@ class ProfileUpdate(BaseModel):
     study_pattern: str = None
 
 
-@router.get("/me", response_model=User)
-async def get_me(current_user = Depends(get_current_user)):
-    # 데이터베이스에서 사용자 정보 조회
+def _get_me(user_id: int) -> User:
+    """사용자 기본 정보 조회 (DB 스레드에서 실행)"""
     conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
-        cursor.execute("SELECT id, email, name FROM users WHERE id = ?", (current_user.id,))
+        cursor.execute("SELECT id, email, name FROM users WHERE id = ?", (user_id,))
         user_data = cursor.fetchone()
         
         if not user_data:
@@ -38,12 +38,14 @@ async def get_me(current_user = Depends(get_current_user)):
         conn.close()
 
 
-@router.put("/profile/me")
-async def update_profile(profile_data: dict, current_user: User = Depends(get_current_user)):
-    user_id = current_user.id
-    print(f"[프로필 업데이트] 사용자 ID: {user_id}")
-    
-    # 프로필 데이터 업데이트 - user_profiles 테이블 사용
+@router.get("/me", response_model=User)
+async def get_me(current_user = Depends(get_current_user)):
+    # 데이터베이스에서 사용자 정보 조회
+    return await run_db(_get_me, current_user.id)
+
+
+def _update_profile(user_id: int, profile_data: dict) -> dict:
+    """생활 패턴 프로필 업데이트 (DB 스레드에서 실행)"""
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -106,11 +108,20 @@ async def update_profile(profile_data: dict, current_user: User = Depends(get_cu
         conn.close()
 
 
+@router.put("/profile/me")
+async def update_profile(profile_data: dict, current_user: User = Depends(get_current_user)):
+    user_id = current_user.id
+    print(f"[프로필 업데이트] 사용자 ID: {user_id}")
+    
+    # 프로필 데이터 업데이트 - user_profiles 테이블 사용
+    return await run_db(_update_profile, user_id, profile_data)
+
+
 @router.get("/info/me")
 async def get_my_info(current_user: User = Depends(get_current_user)):
     """사용자 정보 조회"""
     user_id = current_user.id
-    user_info = get_user_info(user_id)
+    user_info = await get_user_info(user_id)
     
     if user_info is None:
         # 정보가 없으면 빈 정보 반환
@@ -136,7 +147,7 @@ async def update_my_info(info_data: dict, current_user: User = Depends(get_curre
     print(f"Info data received: {info_data}")
     
     try:
-        success = update_user_info(user_id, info_data)
+        success = await update_user_info(user_id, info_data)
         if success:
             return {"message": "User info updated successfully"}
         else:
@@ -155,7 +166,7 @@ async def update_my_bio(bio_data: dict, current_user: User = Depends(get_current
     print(f"Bio data: {bio}")
     
     try:
-        success = update_user_info(user_id, {"bio": bio})
+        success = await update_user_info(user_id, {"bio": bio})
         if success:
             return {"message": "Bio updated successfully", "bio": bio}
         else:
@@ -165,9 +176,8 @@ async def update_my_bio(bio_data: dict, current_user: User = Depends(get_current
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{user_id}")
-async def get_user_by_id(user_id: int, current_user: User = Depends(get_current_user)):
-    """특정 사용자의 기본 정보 조회"""
+def _get_user_detail(user_id: int) -> dict:
+    """사용자 기본 정보, 프로필, 추가 정보 조회 (DB 스레드에서 실행)"""
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -195,7 +205,7 @@ async def get_user_by_id(user_id: int, current_user: User = Depends(get_current_
         profile_data = cursor.fetchone()
         
         # 사용자 추가 정보 조회 (bio, 거주지 등)
-        user_info = get_user_info(user_id)
+        user_info = get_user_info_sync(user_id)
         if user_info is None:
             user_info = {
                 "bio": "",
@@ -244,4 +254,10 @@ async def get_user_by_id(user_id: int, current_user: User = Depends(get_current_
         print(f"Error getting user {user_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
     finally:
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+
+@router.get("/{user_id}")
+async def get_user_by_id(user_id: int, current_user: User = Depends(get_current_user)):
+    """특정 사용자의 기본 정보 조회"""
+    return await run_db(_get_user_detail, user_id)
@@ -0,0 +1,214 @@
+"""
+채팅 메시지 아카이브 테스트 - 페이지 조회 일치, 중단 후 재실행, 삭제된 채팅방 정리
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+from database import chat_archive, connection
+from database.chat_archive import archive_old_messages, purge_deleted_rooms
+from database.connection import (
+    create_chat_room, delete_chat_room, get_chat_messages, get_db_connection, init_db,
+    mark_messages_read, send_message
+)
+from database.read_receipts import read_receipts
+
+MESSAGE_COUNT = 250
+PAGE_SIZE = 30
+
+
+@contextmanager
+def temp_database():
+    """임시 db(아카이브 db 포함)로 바꿔서 실행"""
+    original_path = connection.DATABASE_PATH
+    original_archive_path = os.environ.pop("CHAT_ARCHIVE_PATH", None)
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.DATABASE_PATH = os.path.join(tmp, "users.db")
+        try:
+            init_db()
+            yield
+        finally:
+            read_receipts.flush()
+            connection.close_all_pools()
+            connection.DATABASE_PATH = original_path
+            if original_archive_path is not None:
+                os.environ["CHAT_ARCHIVE_PATH"] = original_archive_path
+
+
+def create_old_room():
+    """두 사용자가 모두 읽은 오래된 메시지 MESSAGE_COUNT개가 있는 채팅방 (일부는 삭제된 메시지)"""
+    conn = get_db_connection()
+    try:
+        user_ids = [row[0] for row in conn.execute("SELECT id FROM users ORDER BY id LIMIT 2")]
+    finally:
+        conn.close()
+
+    room_id = create_chat_room(user_ids[0], participant_ids=[user_ids[1]])
+    for i in range(MESSAGE_COUNT):
+        assert send_message(room_id, user_ids[i % 2], f"message {i}")
+
+    conn = get_db_connection()
+    try:
+        conn.execute(
+            "UPDATE chat_messages SET created_at = datetime('now', '-200 days') WHERE room_id = ?", (room_id,)
+        )
+        conn.execute("UPDATE chat_messages SET is_deleted = TRUE WHERE room_id = ? AND id % 17 = 0", (room_id,))
+        conn.commit()
+    finally:
+        conn.close()
+
+    for user_id in user_ids:
+        assert mark_messages_read(room_id, user_id) is not None
+    read_receipts.flush()
+    return room_id, user_ids[0]
+
+
+def page_ids(room_id, user_id):
+    """offset, before_id, after_id 페이지 조회 결과의 메시지 id"""
+    def ids(**kwargs):
+        return [
+            message["id"]
+            for message in get_chat_messages(room_id, user_id, PAGE_SIZE, mark_as_read=False, **kwargs)
+        ]
+
+    pages = {"offset": [], "before_id": [], "after_id": []}
+    for offset in range(0, MESSAGE_COUNT + PAGE_SIZE, PAGE_SIZE):
+        pages["offset"].append(ids(offset=offset))
+
+    page = ids()
+    while page:
+        pages["before_id"].append(page)
+        page = ids(before_id=page[0])
+
+    page = ids(after_id=0)
+    while page:
+        pages["after_id"].append(page)
+        page = ids(after_id=page[-1])
+    return pages
+
+
+def archived_state(room_id):
+    """(archived_until_id, 세그먼트 (first_id, last_id, message_count) 목록)"""
+    conn = get_db_connection()
+    archive_conn = chat_archive._archive_connection()
+    try:
+        archived_until = conn.execute(
+            "SELECT archived_until_id FROM chat_rooms WHERE id = ?", (room_id,)
+        ).fetchone()[0]
+        segments = archive_conn.execute("""
+            SELECT first_id, last_id, message_count FROM chat_archive_segments
+            WHERE room_id = ? ORDER BY first_id
+        """, (room_id,)).fetchall()
+        return archived_until, segments
+    finally:
+        conn.close()
+        archive_conn.close()
+
+
+def test_paging_unchanged_by_archive():
+    """아카이브 전후로 offset/before_id/after_id 페이지 조회 결과가 같은지 확인"""
+    with temp_database():
+        room_id, user_id = create_old_room()
+        before = page_ids(room_id, user_id)
+
+        assert archive_old_messages() > 0
+        archived_until, segments = archived_state(room_id)
+        assert archived_until and segments
+
+        assert page_ids(room_id, user_id) == before
+    print("✅ 아카이브 전후 페이지 조회 일치")
+
+
+def test_interrupted_archive_is_idempotent():
+    """세그먼트를 쓴 뒤 hot 테이블 삭제 전에 멈춰도 다시 실행하면 같은 결과인지 확인"""
+    with temp_database():
+        room_id, user_id = create_old_room()
+        before = page_ids(room_id, user_id)
+        conn = get_db_connection()
+        try:
+            kept_ids = [row[0] for row in conn.execute(
+                "SELECT id FROM chat_messages WHERE room_id = ? AND is_deleted = FALSE", (room_id,)
+            )]
+        finally:
+            conn.close()
+
+        # hot 테이블 삭제가 실패하도록 해서 세그먼트만 커밋된 상태를 만듦
+        conn = get_db_connection()
+        try:
+            conn.execute("""
+                CREATE TRIGGER interrupt_archive BEFORE DELETE ON chat_messages
+                BEGIN SELECT RAISE(ABORT, 'interrupted'); END
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+        try:
+            archive_old_messages()
+        except Exception as e:
+            assert "interrupted" in str(e)
+        else:
+            raise AssertionError("archive was not interrupted")
+
+        archived_until, segments = archived_state(room_id)
+        assert not archived_until and segments  # 세그먼트는 남았지만 hot 테이블은 그대로
+        assert page_ids(room_id, user_id) == before
+
+        conn = get_db_connection()
+        try:
+            conn.execute("DROP TRIGGER interrupt_archive")
+            conn.commit()
+        finally:
+            conn.close()
+
+        moved = archive_old_messages()
+        assert moved > 0
+        archived_until, segments = archived_state(room_id)
+        # 겹치는 세그먼트 없이 archived_until_id까지의 남은 메시지를 정확히 한 번씩 담음
+        for previous, segment in zip(segments, segments[1:]):
+            assert previous[1] < segment[0]
+        assert segments[-1][1] <= archived_until
+        conn = get_db_connection()
+        try:
+            hot_archived = conn.execute(
+                "SELECT COUNT(*) FROM chat_messages WHERE room_id = ? AND id <= ?", (room_id, archived_until)
+            ).fetchone()[0]
+        finally:
+            conn.close()
+        assert hot_archived == 0
+        assert sum(segment[2] for segment in segments) == len([i for i in kept_ids if i <= archived_until])
+
+        assert page_ids(room_id, user_id) == before
+        assert archive_old_messages() == 0
+        assert archived_state(room_id) == (archived_until, segments)
+    print("✅ 중단된 아카이브 재실행 결과 일치")
+
+
+def test_purge_removes_hot_and_archived_messages():
+    """채팅방을 삭제하면 hot 테이블 메시지와 아카이브 세그먼트가 모두 지워지는지 확인"""
+    with temp_database():
+        room_id, user_id = create_old_room()
+        assert archive_old_messages() > 0
+        assert archived_state(room_id)[1]
+
+        assert delete_chat_room(room_id, user_id)
+        assert purge_deleted_rooms() > 0
+
+        conn = get_db_connection()
+        archive_conn = chat_archive._archive_connection()
+        try:
+            assert conn.execute("SELECT COUNT(*) FROM chat_messages WHERE room_id = ?", (room_id,)).fetchone()[0] == 0
+            assert conn.execute("SELECT COUNT(*) FROM chat_purge_queue").fetchone()[0] == 0
+            assert archive_conn.execute(
+                "SELECT COUNT(*) FROM chat_archive_segments WHERE room_id = ?", (room_id,)
+            ).fetchone()[0] == 0
+        finally:
+            conn.close()
+            archive_conn.close()
+    print("✅ 삭제된 채팅방 메시지/아카이브 정리")
+
+
+if __name__ == "__main__":
+    test_paging_unchanged_by_archive()
+    test_interrupted_archive_is_idempotent()
+    test_purge_removes_hot_and_archived_messages()
@@ -0,0 +1,146 @@
+"""
+NumPy 매칭 엔진과 calculate_compatibility 점수 일치 테스트
+"""
+
+import itertools
+import random
+
+import numpy as np
+
+from models.profile import UserProfile
+from utils.matching import calculate_compatibility
+from utils.matching_engine import MatchConstraints, MatchingEngine, _FIELD_VALUES, select_top_k
+
+FIELDS = list(_FIELD_VALUES)
+
+
+def make_profile(user_id, values, is_complete=True, **extra):
+    return UserProfile(user_id=user_id, is_complete=is_complete, **dict(zip(FIELDS, values)), **extra)
+
+
+def random_profile(rng, user_id):
+    # 값이 비어 있는(None) 필드와 미완성 프로필, 나이/성별이 없는 프로필도 섞어서 생성
+    values = [rng.choice(_FIELD_VALUES[field] + [None]) for field in FIELDS]
+    return make_profile(
+        user_id, values, is_complete=rng.random() > 0.1,
+        age=rng.choice([None] + list(range(19, 35))),
+        gender=rng.choice([None, "male", "female"]),
+    )
+
+
+def test_every_value_pair_per_field():
+    """필드별 모든 값 조합에서 점수가 같은지 확인"""
+    rng = random.Random(0)
+    base = random_profile(rng, 0)
+    for i, field in enumerate(FIELDS):
+        options = _FIELD_VALUES[field] + [None]
+        profiles = []
+        for a in options:
+            values = [getattr(base, f) for f in FIELDS]
+            values[i] = a
+            profiles.append(make_profile(len(profiles) + 1, values))
+
+        engine = MatchingEngine(profiles)
+        scores = engine.score_batch(profiles)
+        for (u, user), (c, other) in itertools.product(enumerate(profiles), repeat=2):
+            assert scores[u, c] == calculate_compatibility(user, other), (field, user, other)
+    print("✅ 필드별 모든 값 조합 점수 일치")
+
+
+def test_random_population():
+    """무작위 사용자 x 후보 점수가 정확히 같은지 확인"""
+    rng = random.Random(1)
+    candidates = [random_profile(rng, i) for i in range(2000)]
+    users = [random_profile(rng, 10000 + i) for i in range(50)]
+
+    engine = MatchingEngine(candidates)
+    scores = engine.score_batch(users)
+    for u, user in enumerate(users):
+        expected = [calculate_compatibility(user, other) for other in candidates]
+        assert scores[u].tolist() == expected
+        assert engine.score(user).tolist() == expected
+    print(f"✅ {len(users)} x {len(candidates)} 점수 일치")
+
+
+def test_top_k_matches_full_sort():
+    """top-k 결과가 전체를 점수순으로 안정 정렬한 결과의 앞부분과 같은지 확인"""
+    rng = random.Random(2)
+    candidates = [random_profile(rng, i) for i in range(500)]
+    user = make_profile(999, [values[0] for values in _FIELD_VALUES.values()])
+
+    engine = MatchingEngine(candidates)
+    full = sorted(
+        (
+            (i, calculate_compatibility(user, other))
+            for i, other in enumerate(candidates)
+            if other.is_complete
+        ),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    assert engine.top_k(user) == full
+    for k in (0, 1, 7, 50, len(full), len(full) + 10):
+        assert engine.top_k(user, k) == full[:k]
+
+    excluded = candidates[full[0][0]].user_id
+    assert all(candidates[i].user_id != excluded for i, _ in engine.top_k(user, 10, excluded))
+    print("✅ top-k 선택 결과 일치")
+
+
+def test_bucket_index_matches_full_scan():
+    """버킷 인덱스의 조기 종료/필수 조건 결과가 전체 계산 결과와 같은지 확인"""
+    rng = random.Random(3)
+    candidates = [random_profile(rng, i) for i in range(3000)]
+    engine = MatchingEngine(candidates)
+    constraints = [
+        MatchConstraints(strict_smoking=True),
+        MatchConstraints(genders=("female",)),
+        MatchConstraints(min_age=22, max_age=26),
+        MatchConstraints(strict_smoking=True, genders=("male",), min_age=20),
+    ]
+
+    for user in [random_profile(rng, 10000 + i) for i in range(30)]:
+        scores = engine.score(user)
+        for k in (1, 10, 50, 5000):
+            mask = engine.complete & (engine.user_ids != 5)
+            assert engine.top_k(user, k, exclude_user_id=5) == select_top_k(scores, mask, k)
+
+        smoking = engine.index._smoking
+        for c in constraints:
+            mask = engine.complete.copy()
+            for i, other in enumerate(candidates):
+                if c.strict_smoking and engine._tables[smoking][
+                    engine.encode([user])[smoking, 0], engine.candidate_codes[smoking][i]
+                ] == 0.0:
+                    mask[i] = False
+                if c.genders is not None and other.gender not in c.genders:
+                    mask[i] = False
+                if (c.min_age is not None or c.max_age is not None) and other.age is None:
+                    mask[i] = False
+                if c.min_age is not None and other.age is not None and other.age < c.min_age:
+                    mask[i] = False
+                if c.max_age is not None and other.age is not None and other.age > c.max_age:
+                    mask[i] = False
+            for k in (None, 20):
+                assert engine.top_k(user, k, constraints=c) == select_top_k(scores, mask, k)
+    print("✅ 버킷 인덱스 결과 일치")
+
+
+def test_unseen_values():
+    """엔진 생성 후 처음 보는 값이 들어와도 점수가 같은지 확인"""
+    candidates = [make_profile(1, [values[0] for values in _FIELD_VALUES.values()])]
+    engine = MatchingEngine(candidates)
+    user = UserProfile.model_construct(
+        user_id=2, is_complete=True, **{field: "unknown" for field in FIELDS}
+    )
+    assert engine.score(user).tolist() == [calculate_compatibility(user, candidates[0])]
+    assert np.all(engine.score_batch(candidates) == 1.0)
+    print("✅ 새로운 값 처리 일치")
+
+
+if __name__ == "__main__":
+    test_every_value_pair_per_field()
+    test_random_population()
+    test_top_k_matches_full_sort()
+    test_bucket_index_matches_full_scan()
+    test_unseen_values()
@@ -0,0 +1,100 @@
+import abc
+import asyncio
+from typing import Callable, Dict, List, Set
+
+# 구독자 한 명당 보내지 못하고 쌓아둘 최대 이벤트 수 (넘치면 가장 오래된 이벤트부터 버림)
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+def room_channel(room_id: int) -> str:
+    return f"chat:room:{room_id}"
+
+
+class ChatBroker(abc.ABC):
+    """채팅 이벤트를 채널 단위로 전달하는 브로커 인터페이스
+
+    publish()로 보낸 이벤트를 add_listener()로 등록한 콜백에 (채널, 이벤트)로
+    전달합니다. 기본 구현(InProcessBroker)은 같은 프로세스 안에서만 전달하며,
+    여러 워커로 실행할 때는 Redis pub/sub 등으로 같은 인터페이스를 구현해
+    chat_hub.set_broker()로 교체합니다. 리스너는 이벤트 루프 스레드에서
+    호출해야 합니다 (다른 스레드에서 받으면 loop.call_soon_threadsafe 사용).
+    """
+
+    def __init__(self):
+        self._listeners: List[Callable[[str, dict], None]] = []
+
+    def add_listener(self, listener: Callable[[str, dict], None]):
+        self._listeners.append(listener)
+
+    def _deliver(self, channel: str, event: dict):
+        for listener in self._listeners:
+            listener(channel, event)
+
+    @abc.abstractmethod
+    async def publish(self, channel: str, event: dict):
+        """이벤트를 채널의 모든 리스너(다른 워커 포함)에게 전달합니다."""
+
+    async def start(self):
+        """외부 연결이 필요한 브로커는 여기서 연결/구독을 시작합니다."""
+
+    async def stop(self):
+        """외부 연결이 필요한 브로커는 여기서 연결을 닫습니다."""
+
+
+class InProcessBroker(ChatBroker):
+    """같은 프로세스의 구독자에게 바로 전달하는 브로커 (단일 워커용)"""
+
+    async def publish(self, channel: str, event: dict):
+        self._deliver(channel, event)
+
+
+class ChatHub:
+    """채팅방별 실시간 구독 허브
+
+    WebSocket 연결마다 subscribe()로 큐를 받아 이벤트를 기다리고,
+    메시지 전송/읽음/상태 변경 경로가 publish()로 방 구독자에게 알립니다.
+    구독자가 없으면 publish는 아무 일도 하지 않으므로, 열려만 있는 채팅
+    화면은 서버 자원을 쓰지 않습니다.
+    """
+
+    def __init__(self, broker: ChatBroker = None):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self.broker = None
+        self.set_broker(broker or InProcessBroker())
+
+    def set_broker(self, broker: ChatBroker):
+        broker.add_listener(self._on_event)
+        self.broker = broker
+
+    def subscribe(self, room_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(room_channel(room_id), set()).add(queue)
+        return queue
+
+    def unsubscribe(self, room_id: int, queue: asyncio.Queue):
+        channel = room_channel(room_id)
+        queues = self._subscribers.get(channel)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[channel]
+
+    def subscriber_count(self, room_id: int) -> int:
+        return len(self._subscribers.get(room_channel(room_id), ()))
+
+    async def publish(self, room_id: int, event: dict):
+        """방 구독자들에게 이벤트를 보냅니다 (실패해도 요청 처리는 계속)."""
+        try:
+            await self.broker.publish(room_channel(room_id), event)
+        except Exception as e:
+            print(f"Error publishing chat event: {e}")
+
+    def _on_event(self, channel: str, event: dict):
+        for queue in list(self._subscribers.get(channel, ())):
+            if queue.full():
+                # 느린 구독자 때문에 다른 구독자가 막히지 않도록 가장 오래된 이벤트를 버림
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+
+chat_hub = ChatHub()
@@ -0,0 +1,318 @@
+import os
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from database.connection import get_db_connection
+from database.periodic import PeriodicWorker
+
+# 면적 구간 경계(㎡) - 원룸/투룸/국민평형(60, 85) 등 흔한 전용면적 기준
+AREA_BUCKET_BOUNDS = [20, 33, 40, 60, 85, 102, 135]
+
+# 통계로 쓰기 위한 최소 표본 수 (부족하면 더 넓은 지역/면적 그룹으로 대체)
+MIN_SAMPLES = 5
+
+# 한 트랜잭션에서 처리할 대기열 크기
+REFRESH_BATCH_SIZE = 5000
+
+# 백그라운드 통계 갱신 주기(초)
+MARKET_PRICE_REFRESH_INTERVAL = float(os.getenv("MARKET_PRICE_REFRESH_INTERVAL", "60"))
+
+# 조회하는 매물을 뺀 분위수를 표본에서 다시 계산할 최대 그룹 크기
+# (더 큰 그룹은 표본 하나가 분위수를 거의 바꾸지 않으므로 저장된 값을 사용)
+EXCLUDE_SELF_MAX_SAMPLES = 200
+
+# 구/동 단위를 나타내는 주소 토큰 끝 글자
+_DISTRICT_SUFFIXES = ("구", "군")
+_DONG_SUFFIXES = ("동", "가", "읍", "면", "리")
+
+ALL_DONGS = ""
+ALL_AREAS = -1
+
+
+def area_bucket(area: float) -> int:
+    """면적(㎡)이 속한 구간 번호를 반환합니다."""
+    return bisect_right(AREA_BUCKET_BOUNDS, area)
+
+
+def parse_region(address: str) -> Optional[Tuple[str, str]]:
+    """주소에서 (구, 동)을 추출합니다.
+
+    구는 시/도를 포함한 앞부분 전체('서울특별시 강남구')로 다른 시의 같은
+    이름 구와 구분하고, 동을 찾지 못하면 빈 문자열을 반환합니다.
+    구/군이 없는 주소는 None을 반환합니다.
+    """
+    tokens = (address or "").split()
+    for i, token in enumerate(tokens):
+        if token.endswith(_DISTRICT_SUFFIXES) and len(token) > 1:
+            district = " ".join(tokens[: i + 1])
+            for dong in tokens[i + 1:]:
+                if dong.endswith(_DONG_SUFFIXES) and len(dong) > 1:
+                    return district, dong
+            return district, ALL_DONGS
+    return None
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """정렬된 값 목록의 q 분위수 (선형 보간)"""
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _group_keys(district: str, dong: str, bucket: int, transaction_type: str):
+    """표본 하나가 기여하는 통계 그룹 (동+면적, 동, 구+면적, 구)"""
+    return {
+        (district, dong, bucket, transaction_type),
+        (district, dong, ALL_AREAS, transaction_type),
+        (district, ALL_DONGS, bucket, transaction_type),
+        (district, ALL_DONGS, ALL_AREAS, transaction_type),
+    }
+
+
+def _group_values(
+    cursor, key: Tuple[str, str, int, str], exclude_rowid: Optional[int] = None
+) -> List[float]:
+    """그룹에 속한 표본의 ㎡당 보증금을 정렬해서 반환합니다."""
+    district, dong, bucket, transaction_type = key
+    query = "SELECT deposit_per_sqm FROM market_price_samples WHERE district = ?"
+    params = [district]
+    if dong != ALL_DONGS:
+        query += " AND dong = ?"
+        params.append(dong)
+    if bucket != ALL_AREAS:
+        query += " AND area_bucket = ?"
+        params.append(bucket)
+    query += " AND transaction_type = ?"
+    params.append(transaction_type)
+    if exclude_rowid is not None:
+        query += " AND room_rowid != ?"
+        params.append(exclude_rowid)
+
+    cursor.execute(query, params)
+    return sorted(row[0] for row in cursor.fetchall())
+
+
+def _recompute_group(cursor, key: Tuple[str, str, int, str]):
+    values = _group_values(cursor, key)
+
+    if not values:
+        cursor.execute(
+            """
+            DELETE FROM market_price_stats
+            WHERE district = ? AND dong = ? AND area_bucket = ? AND transaction_type = ?
+        """,
+            key,
+        )
+        return
+
+    cursor.execute(
+        """
+        INSERT OR REPLACE INTO market_price_stats (
+            district, dong, area_bucket, transaction_type, sample_count,
+            mean_per_sqm, median_per_sqm, p10_per_sqm, p90_per_sqm, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    """,
+        (
+            *key,
+            len(values),
+            sum(values) / len(values),
+            percentile(values, 0.5),
+            percentile(values, 0.1),
+            percentile(values, 0.9),
+        ),
+    )
+
+
+def refresh_market_price_stats(db_path: Optional[str] = None) -> int:
+    """대기열에 쌓인 매물 변경분을 반영해 바뀐 그룹의 통계만 다시 계산합니다.
+
+    크롤러 저장, 매물 등록/수정/삭제 시 트리거가 대기열을 채우며, 처리한
+    매물 수를 반환합니다. 대기열이 비어 있으면 쓰기 잠금을 잡지 않습니다.
+    init_db와 백그라운드 갱신(market_price_refresher)에서 호출하며, 요청
+    처리 중에는 호출하지 않습니다.
+    """
+    conn = get_db_connection(db_path)
+    cursor = conn.cursor()
+    processed = 0
+
+    try:
+        while True:
+            cursor.execute("SELECT 1 FROM market_price_queue LIMIT 1")
+            if cursor.fetchone() is None:
+                break
+
+            # 다른 스레드/프로세스와 동시에 갱신하지 않도록 쓰기 잠금을 먼저 잡음
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(
+                "SELECT room_rowid FROM market_price_queue LIMIT ?", (REFRESH_BATCH_SIZE,)
+            )
+            room_rowids = [row[0] for row in cursor.fetchall()]
+            if not room_rowids:
+                conn.rollback()
+                break
+
+            dirty = set()
+            for start in range(0, len(room_rowids), 500):
+                chunk = room_rowids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+
+                # 기존 표본이 속했던 그룹
+                cursor.execute(
+                    f"""
+                    SELECT district, dong, area_bucket, transaction_type
+                    FROM market_price_samples WHERE room_rowid IN ({placeholders})
+                """,
+                    chunk,
+                )
+                for row in cursor.fetchall():
+                    dirty |= _group_keys(*row)
+                cursor.execute(
+                    f"DELETE FROM market_price_samples WHERE room_rowid IN ({placeholders})", chunk
+                )
+
+                # 현재 활성 매물로 표본 다시 생성
+                cursor.execute(
+                    f"""
+                    SELECT id, address, area, price_deposit, transaction_type
+                    FROM rooms WHERE id IN ({placeholders}) AND is_active = 1
+                """,
+                    chunk,
+                )
+                samples = []
+                for room_rowid, address, area, price_deposit, transaction_type in cursor.fetchall():
+                    region = parse_region(address)
+                    if region is None or not area or area <= 0 or price_deposit is None:
+                        continue
+                    bucket = area_bucket(area)
+                    samples.append(
+                        (room_rowid, region[0], region[1], bucket, transaction_type, price_deposit / area)
+                    )
+                    dirty |= _group_keys(region[0], region[1], bucket, transaction_type)
+
+                cursor.executemany(
+                    """
+                    INSERT INTO market_price_samples (
+                        room_rowid, district, dong, area_bucket, transaction_type, deposit_per_sqm
+                    ) VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                    samples,
+                )
+                cursor.execute(
+                    f"DELETE FROM market_price_queue WHERE room_rowid IN ({placeholders})", chunk
+                )
+
+            for key in dirty:
+                _recompute_group(cursor, key)
+
+            conn.commit()
+            processed += len(room_rowids)
+
+        return processed
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def lookup_market_price(
+    cursor, address: str, area: float, transaction_type: str, room_rowid: Optional[int] = None
+) -> Optional[Dict]:
+    """매물과 같은 지역/면적 구간의 시세 통계를 조회합니다.
+
+    동+면적 -> 동 -> 구+면적 -> 구 순서로 표본이 MIN_SAMPLES 이상인 첫
+    그룹을 사용하고, 모두 부족하면 표본이 있는 가장 좁은 그룹을 사용합니다.
+    room_rowid를 주면 그 매물의 표본을 빼고 계산합니다 (자기 자신과 비교하지 않음).
+    """
+    region = parse_region(address)
+    if region is None:
+        return None
+
+    # 통계에 반영된 조회 매물의 표본
+    own = None
+    if room_rowid is not None:
+        cursor.execute(
+            """
+            SELECT district, dong, area_bucket, transaction_type, deposit_per_sqm
+            FROM market_price_samples WHERE room_rowid = ?
+        """,
+            (room_rowid,),
+        )
+        own = cursor.fetchone()
+
+    district, dong = region
+    bucket = area_bucket(area or 0)
+    candidates = [
+        (dong, bucket, "dong_area"),
+        (dong, ALL_AREAS, "dong"),
+        (ALL_DONGS, bucket, "district_area"),
+        (ALL_DONGS, ALL_AREAS, "district"),
+    ]
+
+    fallback = None
+    for group_dong, group_bucket, scope in candidates:
+        if group_dong == ALL_DONGS and scope.startswith("dong"):
+            continue  # 동을 알 수 없는 주소
+
+        key = (district, group_dong, group_bucket, transaction_type)
+        cursor.execute(
+            """
+            SELECT sample_count, mean_per_sqm, median_per_sqm, p10_per_sqm, p90_per_sqm
+            FROM market_price_stats
+            WHERE district = ? AND dong = ? AND area_bucket = ? AND transaction_type = ?
+        """,
+            key,
+        )
+        row = cursor.fetchone()
+        if row is None:
+            continue
+
+        sample_count, mean, median, p10, p90 = row
+        if own is not None and key in _group_keys(*own[:4]):
+            sample_count -= 1
+            if sample_count <= 0:
+                continue  # 조회 매물뿐인 그룹
+            mean = (row[1] * row[0] - own[4]) / sample_count
+            if sample_count <= EXCLUDE_SELF_MAX_SAMPLES:
+                values = _group_values(cursor, key, exclude_rowid=room_rowid)
+                if values:
+                    median = percentile(values, 0.5)
+                    p10 = percentile(values, 0.1)
+                    p90 = percentile(values, 0.9)
+
+        stats = {
+            "scope": scope,
+            "district": district,
+            "dong": group_dong or None,
+            "area_bucket": group_bucket,
+            "sample_count": sample_count,
+            "mean_per_sqm": mean,
+            "median_per_sqm": median,
+            "p10_per_sqm": p10,
+            "p90_per_sqm": p90,
+        }
+        if sample_count >= MIN_SAMPLES:
+            return stats
+        if fallback is None:
+            fallback = stats
+
+    return fallback
+
+
+class MarketPriceRefresher(PeriodicWorker):
+    """시세 통계 대기열을 주기적으로 반영하는 백그라운드 작업
+
+    크롤러는 별도 프로세스에서 rooms에 바로 저장하므로, 조회 요청이 통계
+    갱신(쓰기 잠금)을 기다리지 않도록 서버 시작 시 start(), 종료 시 stop()으로
+    이 스레드에서만 갱신합니다. 매물 등록/수정 후에는 wake()로 바로 반영합니다.
+    """
+
+    name = "market-price-refresh"
+
+    def _work(self, woken: bool):
+        refresh_market_price_stats()
+
+
+market_price_refresher = MarketPriceRefresher(MARKET_PRICE_REFRESH_INTERVAL)
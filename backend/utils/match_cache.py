@@ -0,0 +1,290 @@
+import os
+from typing import Dict, List, Optional, Tuple
+
+from database.connection import get_db_connection
+from database.periodic import PeriodicWorker
+from models.profile import MatchingResult
+from utils.matching import MatchCandidate, _prepare_shared_engine, get_matching_details, load_match_candidates
+from utils.matching_engine import MatchingEngine
+
+# 사용자별로 저장하는 상위 매칭 수
+MATCH_CACHE_TOP_K = int(os.getenv("MATCH_CACHE_TOP_K", "50"))
+
+# 한 번에 바뀐 사용자가 이보다 많으면 부분 갱신 대신 캐시 전체를 비움 (다음 조회 때 다시 계산)
+MATCH_CACHE_REBUILD_THRESHOLD = int(os.getenv("MATCH_CACHE_REBUILD_THRESHOLD", "200"))
+
+# 대기 중인 프로필 변경을 캐시에 반영하는 주기(초)
+MATCH_CACHE_REFRESH_INTERVAL = float(os.getenv("MATCH_CACHE_REFRESH_INTERVAL", "30"))
+
+
+def _rank_key(score: float, candidate_id: int):
+    """정렬 키 - 점수 내림차순, 동점은 user_id 오름차순 (find_matches와 같은 순서)"""
+    return (-score, candidate_id)
+
+
+def _update_list_state(cursor, user_id: int):
+    """목록 크기와 가장 낮은 순위 항목(floor)을 다시 기록합니다."""
+    cursor.execute(
+        """
+        SELECT candidate_id, score FROM match_cache
+        WHERE user_id = ? ORDER BY score ASC, candidate_id DESC LIMIT 1
+    """,
+        (user_id,),
+    )
+    floor = cursor.fetchone()
+    cursor.execute(
+        """
+        UPDATE match_cache_users
+        SET list_size = (SELECT COUNT(*) FROM match_cache WHERE user_id = ?),
+            floor_score = ?, floor_candidate = ?
+        WHERE user_id = ?
+    """,
+        (user_id, floor[1] if floor else None, floor[0] if floor else None, user_id),
+    )
+
+
+def _drop_lists(cursor, user_ids: List[int]):
+    for start in range(0, len(user_ids), 500):
+        chunk = user_ids[start:start + 500]
+        placeholders = ",".join("?" * len(chunk))
+        cursor.execute(f"DELETE FROM match_cache WHERE user_id IN ({placeholders})", chunk)
+        cursor.execute(f"DELETE FROM match_cache_users WHERE user_id IN ({placeholders})", chunk)
+
+
+def _rank(engine: MatchingEngine, user: MatchCandidate, user_codes=None) -> List[Tuple[int, float]]:
+    """한 사용자의 상위 K명을 (candidate_id, 점수) 목록으로 계산합니다."""
+    top = engine.top_k(user, MATCH_CACHE_TOP_K, exclude_user_id=user.user_id, user_codes=user_codes)
+    return [(int(engine.user_ids[index]), score) for index, score in top]
+
+
+def _store_list(cursor, user_id: int, ranked: List[Tuple[int, float]]):
+    """한 사용자의 상위 K명 목록(_rank 결과)을 저장합니다."""
+    cursor.execute("DELETE FROM match_cache WHERE user_id = ?", (user_id,))
+    cursor.executemany(
+        "INSERT INTO match_cache (user_id, candidate_id, score) VALUES (?, ?, ?)",
+        [(user_id, candidate_id, score) for candidate_id, score in ranked],
+    )
+    cursor.execute(
+        """
+        INSERT OR REPLACE INTO match_cache_users (user_id, list_size, floor_score, floor_candidate)
+        VALUES (?, ?, ?, ?)
+    """,
+        (
+            user_id,
+            len(ranked),
+            ranked[-1][1] if ranked else None,
+            ranked[-1][0] if ranked else None,
+        ),
+    )
+
+
+def _patch_lists(cursor, changed_id: int, changed: Optional[MatchCandidate], by_id: Dict):
+    """다른 사용자들의 캐시 목록에서 changed_id 항목만 고칩니다.
+
+    changed가 None이거나 미완성이면 목록에서 빠지고, 그 밖에는 새 점수로
+    갱신/추가합니다. 목록이 가득 찬 상태에서 빠지거나 floor 아래로 내려가면
+    목록 밖의 다른 후보가 들어와야 할 수 있으므로 그 목록은 버립니다
+    (다음 조회 때 그 사용자만 다시 계산).
+    """
+    cursor.execute("SELECT user_id, list_size, floor_score, floor_candidate FROM match_cache_users")
+    cached = [row for row in cursor.fetchall() if row[0] != changed_id]
+    if not cached:
+        return
+
+    cursor.execute("SELECT user_id, score FROM match_cache WHERE candidate_id = ?", (changed_id,))
+    present = dict(cursor.fetchall())
+
+    new_scores = {}
+    if changed is not None and changed.is_complete:
+        owners = [by_id[row[0]] for row in cached if row[0] in by_id]
+        if owners:
+            # 각 목록 주인 기준 점수 (owner -> changed)
+            scores = MatchingEngine([changed]).score_batch(owners)[:, 0]
+            new_scores = {owner.user_id: float(score) for owner, score in zip(owners, scores)}
+
+    stale, touched = [], []
+    for user_id, list_size, floor_score, floor_candidate in cached:
+        full = list_size >= MATCH_CACHE_TOP_K
+        floor_key = _rank_key(floor_score, floor_candidate) if floor_candidate is not None else None
+        score = new_scores.get(user_id)
+        key = _rank_key(score, changed_id) if score is not None else None
+
+        if user_id in present:
+            if key is None:
+                cursor.execute(
+                    "DELETE FROM match_cache WHERE user_id = ? AND candidate_id = ?",
+                    (user_id, changed_id),
+                )
+                (stale if full else touched).append(user_id)
+            elif not full or key <= floor_key:
+                cursor.execute(
+                    "UPDATE match_cache SET score = ? WHERE user_id = ? AND candidate_id = ?",
+                    (score, user_id, changed_id),
+                )
+                touched.append(user_id)
+            else:
+                stale.append(user_id)
+        elif key is not None and (not full or key < floor_key):
+            cursor.execute(
+                "INSERT INTO match_cache (user_id, candidate_id, score) VALUES (?, ?, ?)",
+                (user_id, changed_id, score),
+            )
+            if full:
+                cursor.execute(
+                    "DELETE FROM match_cache WHERE user_id = ? AND candidate_id = ?",
+                    (user_id, floor_candidate),
+                )
+            touched.append(user_id)
+
+    _drop_lists(cursor, stale)
+    for user_id in touched:
+        _update_list_state(cursor, user_id)
+
+
+def refresh_match_cache(db_path: Optional[str] = None) -> int:
+    """프로필이 바뀐 사용자와 관련된 캐시 행만 다시 계산합니다.
+
+    바뀐 사용자 한 명당 (그 사용자 x 전체 후보) 점수만 계산해 본인 목록을
+    새로 만들고, 다른 사용자 목록에서는 그 사용자 항목만 고칩니다.
+    처리한 사용자 수를 반환하며, 대기 중인 변경이 없으면 쓰기 잠금을 잡지 않습니다.
+    """
+    conn = get_db_connection(db_path)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT 1 FROM match_cache_dirty LIMIT 1")
+        if cursor.fetchone() is None:
+            return 0
+
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("SELECT user_id FROM match_cache_dirty")
+        dirty = [row[0] for row in cursor.fetchall()]
+
+        if len(dirty) > MATCH_CACHE_REBUILD_THRESHOLD:
+            cursor.execute("DELETE FROM match_cache")
+            cursor.execute("DELETE FROM match_cache_users")
+        elif dirty:
+            candidates = load_match_candidates(complete_only=False, conn=conn)
+            by_id = {candidate.user_id: candidate for candidate in candidates}
+            engine = MatchingEngine([c for c in candidates if c.is_complete])
+
+            _drop_lists(cursor, dirty)
+            for user_id in dirty:
+                changed = by_id.get(user_id)
+                _patch_lists(cursor, user_id, changed, by_id)
+                if changed is not None and changed.is_complete:
+                    _store_list(cursor, user_id, _rank(engine, changed))
+
+        cursor.execute("DELETE FROM match_cache_dirty")
+        conn.commit()
+        return len(dirty)
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _to_result(user: MatchCandidate, other: MatchCandidate, score: float) -> MatchingResult:
+    return MatchingResult(
+        user_id=other.user_id,
+        email=other.email,
+        name=other.name,
+        age=other.age,
+        gender=other.gender,
+        university=other.school_email,  # school_email을 그대로 전달
+        message=other.introduction,
+        compatibility_score=score,
+        matching_details=get_matching_details(user, other),
+    )
+
+
+def _score_and_store(conn, user_id: int) -> List[Tuple[int, float]]:
+    """캐시가 없는 사용자의 목록을 공유 매칭 엔진으로 계산하고 저장합니다.
+
+    점수는 쓰기 잠금 없이 계산하고, 저장할 때만 짧게 쓰기 트랜잭션을 엽니다.
+    그 사이 프로필이 바뀌었으면(엔진 버전이 달라졌으면) 저장하지 않습니다.
+    """
+    user = next(iter(load_match_candidates([user_id], conn=conn)), None)
+    if user is None:
+        return []
+
+    engine, version, user_codes = _prepare_shared_engine(conn, user)
+    ranked = _rank(engine, user, user_codes)
+
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        cursor.execute("SELECT version FROM match_profile_version WHERE id = 1")
+        if cursor.fetchone()[0] == version:
+            _store_list(cursor, user_id, ranked)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return ranked
+
+
+def get_cached_matches(user_id: int) -> List[MatchingResult]:
+    """캐시된 상위 매칭 목록을 반환합니다 (find_matches(user_id)의 앞 K개와 같음).
+
+    캐시가 있으면 점수 계산 없이 목록과 후보 정보만 읽고, 없거나 아직 반영되지
+    않은 변경이 있으면 한 번 계산해 저장합니다. 바뀐 프로필의 캐시 반영은
+    update_user_profile과 match_cache_refresher가 맡고 조회 경로에서는 하지 않습니다.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            SELECT 1 FROM match_cache_users
+            WHERE user_id = ? AND user_id NOT IN (SELECT user_id FROM match_cache_dirty)
+        """,
+            (user_id,),
+        )
+        if cursor.fetchone() is not None:
+            cursor.execute(
+                """
+                SELECT candidate_id, score FROM match_cache
+                WHERE user_id = ? ORDER BY score DESC, candidate_id
+            """,
+                (user_id,),
+            )
+            ranked = cursor.fetchall()
+        else:
+            # 캐시 없음 - 이 사용자 한 명만 계산해서 저장
+            ranked = _score_and_store(conn, user_id)
+
+        profiles = {
+            c.user_id: c
+            for c in load_match_candidates(
+                [user_id] + [candidate_id for candidate_id, _ in ranked], complete_only=False, conn=conn
+            )
+        }
+        user = profiles.get(user_id)
+        if user is None or not user.is_complete:
+            return []
+        return [
+            _to_result(user, profiles[candidate_id], score)
+            for candidate_id, score in ranked
+            if candidate_id in profiles
+        ]
+    finally:
+        conn.close()
+
+
+class MatchCacheRefresher(PeriodicWorker):
+    """match_cache_dirty에 쌓인 변경을 주기적으로 캐시에 반영하는 백그라운드 작업
+
+    update_user_profile은 저장 후 바로 반영하고, 이 스레드는 그 밖의 경로
+    (프로필 생성, 사용자 삭제 등)로 쌓인 변경을 반영합니다.
+    """
+
+    name = "match-cache-refresh"
+
+    def _work(self, woken: bool):
+        refresh_match_cache()
+
+
+match_cache_refresher = MatchCacheRefresher(MATCH_CACHE_REFRESH_INTERVAL)
@@ -1,6 +1,153 @@
-from typing import List
+import json
+import threading
+from typing import List, NamedTuple, Optional, Sequence
 from models.profile import UserProfile, MatchingResult
-from database.connection import get_user_by_email
+from database.connection import get_user_by_email, get_db_connection
+
+DEFAULT_INTRODUCTION = "안녕하세요! 좋은 룸메이트가 되고싶습니다 :)"
+
+
+class MatchCandidate(NamedTuple):
+    """매칭 후보 한 명의 프로필 + 사용자 정보 (UserProfile 대신 쓰는 가벼운 레코드)"""
+    user_id: int
+    sleep_type: Optional[str]
+    home_time: Optional[str]
+    cleaning_frequency: Optional[str]
+    cleaning_sensitivity: Optional[str]
+    smoking_status: Optional[str]
+    noise_sensitivity: Optional[str]
+    age: Optional[int]
+    is_complete: bool
+    email: str
+    name: str
+    gender: Optional[str]
+    school_email: Optional[str]
+    introduction: str
+
+
+_CANDIDATE_QUERY = """
+    SELECT p.user_id, p.sleep_type, p.home_time, p.cleaning_frequency,
+           p.cleaning_sensitivity, p.smoking_status, p.noise_sensitivity,
+           p.age, p.is_complete, u.email, u.name, u.gender, u.school_email, i.introduction
+    FROM user_profiles p
+    JOIN users u ON u.id = p.user_id
+    LEFT JOIN user_info i ON i.user_id = p.user_id
+"""
+
+
+def load_match_candidates(
+    user_ids: Optional[Sequence[int]] = None, complete_only: bool = True, conn=None
+) -> List[MatchCandidate]:
+    """users, user_profiles, user_info를 한 번의 조인 쿼리로 불러옵니다.
+
+    user_ids를 주면 해당 사용자만, 아니면 전체 사용자를 대상으로 하며
+    결과는 user_id 순입니다. conn을 주면 그 연결(트랜잭션)에서 조회합니다.
+    """
+    query = _CANDIDATE_QUERY
+    conditions = []
+    params = []
+    if complete_only:
+        conditions.append("p.is_complete = TRUE")
+    if user_ids is not None:
+        # id 개수와 상관없이 파라미터 하나로 전달
+        conditions.append("p.user_id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(list(user_ids)))
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY p.user_id"
+
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        return [
+            MatchCandidate(*row[:8], bool(row[8]), *row[9:13], row[13] or DEFAULT_INTRODUCTION)
+            for row in cursor.fetchall()
+        ]
+    finally:
+        if own_conn:
+            conn.close()
+
+
+# 요소별 가중치 (calculate_compatibility와 matching_engine이 같은 순서로 합산)
+SLEEP_WEIGHT = 0.2
+HOME_TIME_WEIGHT = 0.15
+CLEANING_FREQ_WEIGHT = 0.2
+CLEANING_SENS_WEIGHT = 0.15
+SMOKING_WEIGHT = 0.25
+NOISE_WEIGHT = 0.05
+
+FREQ_COMPATIBILITY = {
+    ("daily", "daily"): 1.0,
+    ("daily", "weekly"): 0.6,
+    ("daily", "as_needed"): 0.2,
+    ("weekly", "weekly"): 1.0,
+    ("weekly", "as_needed"): 0.7,
+    ("as_needed", "as_needed"): 1.0
+}
+
+SENS_COMPATIBILITY = {
+    ("very_sensitive", "very_sensitive"): 1.0,
+    ("very_sensitive", "normal"): 0.6,
+    ("very_sensitive", "not_sensitive"): 0.1,
+    ("normal", "normal"): 1.0,
+    ("normal", "not_sensitive"): 0.8,
+    ("not_sensitive", "not_sensitive"): 1.0
+}
+
+SMOKING_COMPATIBILITY = {
+    ("non_smoker_strict", "non_smoker_strict"): 1.0,
+    ("non_smoker_strict", "non_smoker_ok"): 1.0,
+    ("non_smoker_strict", "smoker_indoor_no"): 0.3,
+    ("non_smoker_strict", "smoker_indoor_yes"): 0.0,
+    ("non_smoker_ok", "non_smoker_ok"): 1.0,
+    ("non_smoker_ok", "smoker_indoor_no"): 0.8,
+    ("non_smoker_ok", "smoker_indoor_yes"): 0.4,
+    ("smoker_indoor_no", "smoker_indoor_no"): 1.0,
+    ("smoker_indoor_no", "smoker_indoor_yes"): 0.6,
+    ("smoker_indoor_yes", "smoker_indoor_yes"): 1.0
+}
+
+NOISE_COMPATIBILITY = {
+    ("sensitive", "sensitive"): 1.0,
+    ("sensitive", "normal"): 0.7,
+    ("sensitive", "not_sensitive"): 0.3,
+    ("normal", "normal"): 1.0,
+    ("normal", "not_sensitive"): 0.8,
+    ("not_sensitive", "not_sensitive"): 1.0
+}
+
+
+def sleep_factor(a, b) -> float:
+    """기상/취침 시간 호환성"""
+    return 1.0 if a == b else 0.3  # 다르면 약간의 점수
+
+
+def home_time_factor(a, b) -> float:
+    """집에 머무는 시간대 호환성"""
+    if a == b:
+        return 1.0
+    elif a == "irregular" or b == "irregular":
+        return 0.7  # 불규칙한 경우 중간 점수
+    return 0.4  # 다른 시간대
+
+
+def table_factor(table: dict, a, b) -> float:
+    """대칭 호환성 표 조회 (표에 없는 조합은 0.5)"""
+    return table.get((a, b), table.get((b, a), 0.5))
+
+
+# (프로필 필드, 가중치, 요소 함수) - 점수 합산 순서
+COMPATIBILITY_FACTORS = [
+    ("sleep_type", SLEEP_WEIGHT, sleep_factor),
+    ("home_time", HOME_TIME_WEIGHT, home_time_factor),
+    ("cleaning_frequency", CLEANING_FREQ_WEIGHT, lambda a, b: table_factor(FREQ_COMPATIBILITY, a, b)),
+    ("cleaning_sensitivity", CLEANING_SENS_WEIGHT, lambda a, b: table_factor(SENS_COMPATIBILITY, a, b)),
+    ("smoking_status", SMOKING_WEIGHT, lambda a, b: table_factor(SMOKING_COMPATIBILITY, a, b)),
+    ("noise_sensitivity", NOISE_WEIGHT, lambda a, b: table_factor(NOISE_COMPATIBILITY, a, b)),
+]
 
 
 def calculate_compatibility(user_profile: UserProfile, other_profile: UserProfile) -> float:
@@ -14,87 +161,11 @@ def calculate_compatibility(user_profile: UserProfile, other_profile: UserProfil
     score = 0.0
     total_weight = 0.0
 
-    # 1. 기상/취침 시간 호환성 (가중치: 0.2)
-    sleep_weight = 0.2
-    if user_profile.sleep_type == other_profile.sleep_type:
-        score += sleep_weight * 1.0
-    else:
-        score += sleep_weight * 0.3  # 다르면 약간의 점수
-    total_weight += sleep_weight
-
-    # 2. 집에 머무는 시간대 호환성 (가중치: 0.15)
-    home_time_weight = 0.15
-    if user_profile.home_time == other_profile.home_time:
-        score += home_time_weight * 1.0
-    elif user_profile.home_time == "irregular" or other_profile.home_time == "irregular":
-        score += home_time_weight * 0.7  # 불규칙한 경우 중간 점수
-    else:
-        score += home_time_weight * 0.4  # 다른 시간대
-    total_weight += home_time_weight
-
-    # 3. 청소 빈도 호환성 (가중치: 0.2)
-    cleaning_freq_weight = 0.2
-    freq_compatibility = {
-        ("daily", "daily"): 1.0,
-        ("daily", "weekly"): 0.6,
-        ("daily", "as_needed"): 0.2,
-        ("weekly", "weekly"): 1.0,
-        ("weekly", "as_needed"): 0.7,
-        ("as_needed", "as_needed"): 1.0
-    }
-    key = (user_profile.cleaning_frequency, other_profile.cleaning_frequency)
-    reverse_key = (other_profile.cleaning_frequency, user_profile.cleaning_frequency)
-    score += cleaning_freq_weight * freq_compatibility.get(key, freq_compatibility.get(reverse_key, 0.5))
-    total_weight += cleaning_freq_weight
-
-    # 4. 청소 민감도 호환성 (가중치: 0.15)
-    cleaning_sens_weight = 0.15
-    sens_compatibility = {
-        ("very_sensitive", "very_sensitive"): 1.0,
-        ("very_sensitive", "normal"): 0.6,
-        ("very_sensitive", "not_sensitive"): 0.1,
-        ("normal", "normal"): 1.0,
-        ("normal", "not_sensitive"): 0.8,
-        ("not_sensitive", "not_sensitive"): 1.0
-    }
-    key = (user_profile.cleaning_sensitivity, other_profile.cleaning_sensitivity)
-    reverse_key = (other_profile.cleaning_sensitivity, user_profile.cleaning_sensitivity)
-    score += cleaning_sens_weight * sens_compatibility.get(key, sens_compatibility.get(reverse_key, 0.5))
-    total_weight += cleaning_sens_weight
-
-    # 5. 흡연 호환성 (가중치: 0.25) - 가장 중요
-    smoking_weight = 0.25
-    smoking_compatibility = {
-        ("non_smoker_strict", "non_smoker_strict"): 1.0,
-        ("non_smoker_strict", "non_smoker_ok"): 1.0,
-        ("non_smoker_strict", "smoker_indoor_no"): 0.3,
-        ("non_smoker_strict", "smoker_indoor_yes"): 0.0,
-        ("non_smoker_ok", "non_smoker_ok"): 1.0,
-        ("non_smoker_ok", "smoker_indoor_no"): 0.8,
-        ("non_smoker_ok", "smoker_indoor_yes"): 0.4,
-        ("smoker_indoor_no", "smoker_indoor_no"): 1.0,
-        ("smoker_indoor_no", "smoker_indoor_yes"): 0.6,
-        ("smoker_indoor_yes", "smoker_indoor_yes"): 1.0
-    }
-    key = (user_profile.smoking_status, other_profile.smoking_status)
-    reverse_key = (other_profile.smoking_status, user_profile.smoking_status)
-    score += smoking_weight * smoking_compatibility.get(key, smoking_compatibility.get(reverse_key, 0.5))
-    total_weight += smoking_weight
-
-    # 6. 소음 민감도 호환성 (가중치: 0.05)
-    noise_weight = 0.05
-    noise_compatibility = {
-        ("sensitive", "sensitive"): 1.0,
-        ("sensitive", "normal"): 0.7,
-        ("sensitive", "not_sensitive"): 0.3,
-        ("normal", "normal"): 1.0,
-        ("normal", "not_sensitive"): 0.8,
-        ("not_sensitive", "not_sensitive"): 1.0
-    }
-    key = (user_profile.noise_sensitivity, other_profile.noise_sensitivity)
-    reverse_key = (other_profile.noise_sensitivity, user_profile.noise_sensitivity)
-    score += noise_weight * noise_compatibility.get(key, noise_compatibility.get(reverse_key, 0.5))
-    total_weight += noise_weight
+    # 1. 기상/취침 시간 (0.2), 2. 집에 머무는 시간대 (0.15), 3. 청소 빈도 (0.2),
+    # 4. 청소 민감도 (0.15), 5. 흡연 (0.25) - 가장 중요, 6. 소음 민감도 (0.05)
+    for field, weight, factor in COMPATIBILITY_FACTORS:
+        score += weight * factor(getattr(user_profile, field), getattr(other_profile, field))
+        total_weight += weight
 
     return score / total_weight if total_weight > 0 else 0.0
 
@@ -127,80 +198,118 @@ def get_matching_details(user_profile: UserProfile, other_profile: UserProfile)
     }
 
 
-def find_matches(user_id: int, all_profiles: List[UserProfile]) -> List[MatchingResult]:
-    """사용자에게 가장 적합한 룸메이트들을 찾습니다"""
-    user_profile = None
-    other_profiles = []
+# 전체 후보로 만든 매칭 엔진 (match_profile_version이 바뀔 때만 다시 만듦)
+_shared_engine = {"version": None, "engine": None}
+_shared_engine_lock = threading.Lock()
+
+
+def _get_shared_engine(conn):
+    """현재 프로필 버전의 전체 후보 MatchingEngine을 반환합니다 (_shared_engine_lock 안에서 호출)."""
+    from utils.matching_engine import MatchingEngine
     
-    for profile in all_profiles:
-        if profile.user_id == user_id:
-            user_profile = profile
-        else:
-            other_profiles.append(profile)
+    # 버전을 먼저 읽어야 후보를 읽는 사이에 바뀐 내용이 이전 버전으로 남지 않음
+    cursor = conn.cursor()
+    cursor.execute("SELECT version FROM match_profile_version WHERE id = 1")
+    version = cursor.fetchone()[0]
     
-    if not user_profile or not user_profile.is_complete:
-        return []
+    if _shared_engine["engine"] is None or _shared_engine["version"] != version:
+        _shared_engine["engine"] = MatchingEngine(load_match_candidates(conn=conn))
+        _shared_engine["version"] = version
+    return _shared_engine["engine"]
+
+
+def _prepare_shared_engine(conn, user_profile):
+    """공유 엔진과 그 버전, 사용자 코드를 (engine, version, user_codes)로 반환합니다.
+
+    엔진을 가져오거나 다시 만들고 사용자를 인코딩하는 동안만 잠금을 잡습니다
+    (둘 다 엔진 상태를 바꿈). 반환한 엔진의 top_k(..., user_codes=user_codes)는
+    바뀌지 않는 배열만 읽으므로 잠금 밖에서 동시에 실행할 수 있습니다.
+    """
+    with _shared_engine_lock:
+        engine = _get_shared_engine(conn)
+        engine.index  # 버킷 인덱스는 처음 사용할 때 만들어지므로 잠금 안에서 미리 생성
+        user_codes = engine.encode([user_profile])[:, 0]
+        return engine, _shared_engine["version"], user_codes
+
+
+def find_matches(
+    user_id: int,
+    candidates: Optional[Sequence[MatchCandidate]] = None,
+    constraints=None,
+    limit: Optional[int] = None,
+) -> List[MatchingResult]:
+    """사용자에게 가장 적합한 룸메이트들을 찾습니다
+
+    후보를 주지 않으면 전체 후보로 만든 MatchingEngine(코드, 조회 행렬,
+    버킷 인덱스)을 프로필이 바뀌기 전까지 다시 쓰고, 결과에 필요한 후보
+    정보만 한 번에 읽습니다.
+    constraints(MatchConstraints)를 주면 조건에 맞는 버킷의 후보만, limit을
+    주면 상위 limit명이 확정될 때까지만 계산합니다.
+    """
+    from utils.matching_engine import MatchingEngine
     
-    matches = []
-    for other_profile in other_profiles:
-        if other_profile.is_complete:
-            compatibility_score = calculate_compatibility(user_profile, other_profile)
+    if candidates is None:
+        conn = get_db_connection()
+        try:
+            user_profile = next(iter(load_match_candidates([user_id], conn=conn)), None)
+            if not user_profile:
+                return []
             
-            # 사용자 정보 가져오기
-            user_info = get_user_by_email_by_id(other_profile.user_id)
-            user_introduction = get_user_introduction(other_profile.user_id)
+            engine, _, user_codes = _prepare_shared_engine(conn, user_profile)
+            top = engine.top_k(
+                user_profile, limit, exclude_user_id=user_id, constraints=constraints, user_codes=user_codes
+            )
             
-            if user_info:
-                # 학교명 변환
-                university = get_university_name(user_info.get("school_email", ""))
-                
-                matches.append(MatchingResult(
-                    user_id=other_profile.user_id,
-                    email=user_info["email"],
-                    name=user_info["name"],
-                    age=other_profile.age,
-                    gender=user_info.get("gender", ""),
-                    university=user_info.get("school_email", ""),  # school_email을 그대로 전달
-                    message=user_introduction,
-                    compatibility_score=compatibility_score,
-                    matching_details=get_matching_details(user_profile, other_profile)
-                ))
+            # 결과 후보의 현재 이름/소개 등
+            profiles = {
+                c.user_id: c
+                for c in load_match_candidates([int(engine.user_ids[index]) for index, _ in top], conn=conn)
+            }
+        finally:
+            conn.close()
+        
+        ranked = [
+            (profiles[int(engine.user_ids[index])], score)
+            for index, score in top
+            if int(engine.user_ids[index]) in profiles
+        ]
+    else:
+        user_profile = None
+        other_profiles = []
+        
+        for profile in candidates:
+            if profile.user_id == user_id:
+                user_profile = profile
+            else:
+                other_profiles.append(profile)
+        
+        if not user_profile or not user_profile.is_complete:
+            return []
+        
+        # 전체 후보를 한 번에 점수 계산 (호환성 점수 순, 동점은 기존 순서 유지)
+        engine = MatchingEngine(other_profiles)
+        ranked = [
+            (other_profiles[index], score)
+            for index, score in engine.top_k(user_profile, limit, constraints=constraints)
+        ]
+    
+    matches = []
+    for other_profile, compatibility_score in ranked:
+        matches.append(MatchingResult(
+            user_id=other_profile.user_id,
+            email=other_profile.email,
+            name=other_profile.name,
+            age=other_profile.age,
+            gender=other_profile.gender,
+            university=other_profile.school_email,  # school_email을 그대로 전달
+            message=other_profile.introduction,
+            compatibility_score=compatibility_score,
+            matching_details=get_matching_details(user_profile, other_profile)
+        ))
     
-    # 호환성 점수 순으로 정렬
-    matches.sort(key=lambda x: x.compatibility_score, reverse=True)
     return matches
 
 
-def get_user_by_email_by_id(user_id: int):
-    """user_id로 사용자 정보를 가져옵니다"""
-    import sqlite3
-    conn = sqlite3.connect("users.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, email, name, gender, school_email FROM users WHERE id = ?", (user_id,))
-    user = cursor.fetchone()
-    conn.close()
-    if user:
-        return {
-            "id": user[0], 
-            "email": user[1], 
-            "name": user[2], 
-            "gender": user[3], 
-            "school_email": user[4]
-        }
-    return None
-
-
-def get_user_introduction(user_id: int) -> str:
-    """사용자 한줄소개를 가져옵니다"""
-    import sqlite3
-    conn = sqlite3.connect("users.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT introduction FROM user_info WHERE user_id = ?", (user_id,))
-    result = cursor.fetchone()
-    conn.close()
-    return result[0] if result and result[0] else "안녕하세요! 좋은 룸메이트가 되고싶습니다 :)"
-
-
 def get_university_name(school_email: str) -> str:
     """학교 이메일을 기반으로 대학교 이름을 반환합니다"""
     if not school_email:
@@ -0,0 +1,317 @@
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.profile import (
+    SleepType, HomeTime, CleaningFrequency, CleaningSensitivity, SmokingStatus, NoiseSensitivity,
+)
+from utils.matching import COMPATIBILITY_FACTORS
+
+# 필드별 기본 값 목록 (enum 순서) - 그 밖의 값(None 등)은 만날 때 코드를 추가
+_FIELD_VALUES = {
+    "sleep_type": [e.value for e in SleepType],
+    "home_time": [e.value for e in HomeTime],
+    "cleaning_frequency": [e.value for e in CleaningFrequency],
+    "cleaning_sensitivity": [e.value for e in CleaningSensitivity],
+    "smoking_status": [e.value for e in SmokingStatus],
+    "noise_sensitivity": [e.value for e in NoiseSensitivity],
+}
+
+# 나이대 버킷 크기(세) - 나이를 모르면 -1 버킷
+AGE_BAND_SIZE = 5
+
+
+class MatchConstraints(NamedTuple):
+    """점수 계산 전에 후보를 거르는 필수 조건 (기본값은 조건 없음)"""
+    strict_smoking: bool = False  # 흡연 호환성이 0인 조합 제외 (예: non_smoker_strict - smoker_indoor_yes)
+    genders: Optional[Tuple[str, ...]] = None
+    min_age: Optional[int] = None
+    max_age: Optional[int] = None
+
+
+def _plain(value):
+    """enum 값은 문자열로 (str enum은 문자열과 같게 비교/해시됨)"""
+    return value.value if hasattr(value, "value") else value
+
+
+class MatchingEngine:
+    """NumPy 기반 룸메이트 호환성 점수 계산기
+
+    6개 범주형 프로필 필드를 작은 정수 코드 배열로 바꾸고, 요소별 호환성을
+    (가중치가 곱해진) 조회 행렬로 미리 만들어 둡니다. 한 사용자(또는 여러
+    사용자)를 전체 후보와 한 번에 비교하며, 점수는 calculate_compatibility와
+    같은 순서로 합산하므로 결과가 정확히 같습니다.
+    """
+
+    def __init__(self, candidates: Sequence):
+        """candidates: UserProfile 또는 같은 필드를 가진 객체 목록"""
+        self.candidates = list(candidates)
+        self._codes = {field: {} for field, _, _ in COMPATIBILITY_FACTORS}
+        for field, values in _FIELD_VALUES.items():
+            for value in values:
+                self._codes[field].setdefault(value, len(self._codes[field]))
+
+        self.user_ids = np.array([c.user_id for c in self.candidates], dtype=np.int64)
+        self.complete = np.array([bool(c.is_complete) for c in self.candidates], dtype=bool)
+        self.candidate_codes = self.encode(self.candidates)
+        self._build_tables()
+
+    def encode(self, profiles: Sequence) -> np.ndarray:
+        """프로필 목록을 (필드 수, 프로필 수) 정수 코드 배열로 변환합니다."""
+        codes = np.empty((len(COMPATIBILITY_FACTORS), len(profiles)), dtype=np.intp)
+        grown = False
+        for i, (field, _, _) in enumerate(COMPATIBILITY_FACTORS):
+            field_codes = self._codes[field]
+            for j, profile in enumerate(profiles):
+                value = _plain(getattr(profile, field))
+                code = field_codes.get(value)
+                if code is None:
+                    code = field_codes[value] = len(field_codes)
+                    grown = True
+                codes[i, j] = code
+        if grown and hasattr(self, "_tables"):
+            self._build_tables()
+        return codes
+
+    def _build_tables(self):
+        # 요소별 (가중치 * 호환성) 행렬 - 스칼라 계산과 같은 곱셈 결과
+        # 다 만든 뒤 한 번에 바꿔야 잠금 없이 점수를 계산하는 스레드가 만드는 중인 목록을 보지 않음
+        # (값이 늘어도 기존 코드의 항목은 그대로이므로 이전 목록으로 계산해도 결과가 같음)
+        tables = []
+        total_weight = 0.0
+        for field, weight, factor in COMPATIBILITY_FACTORS:
+            values = list(self._codes[field])
+            table = np.array(
+                [[weight * factor(a, b) for b in values] for a in values], dtype=np.float64
+            )
+            tables.append(table)
+            total_weight += weight
+        self.total_weight = total_weight
+        self._tables = tables
+
+    def score_batch(self, users: Sequence) -> np.ndarray:
+        """여러 사용자 x 전체 후보 점수 행렬 (미완성 프로필과의 점수는 0.0)"""
+        user_codes = self.encode(users)
+        scores = np.zeros((len(users), len(self.candidates)), dtype=np.float64)
+        for i, table in enumerate(self._tables):
+            scores += table[user_codes[i][:, None], self.candidate_codes[i][None, :]]
+        scores /= self.total_weight
+
+        user_complete = np.array([bool(u.is_complete) for u in users], dtype=bool)
+        scores[~user_complete, :] = 0.0
+        scores[:, ~self.complete] = 0.0
+        return scores
+
+    def score(self, user) -> np.ndarray:
+        """한 사용자와 전체 후보의 호환성 점수 배열"""
+        return self.score_batch([user])[0]
+
+    def score_subset(self, user, indices: np.ndarray, user_codes=None) -> np.ndarray:
+        """한 사용자와 일부 후보(인덱스 배열)의 점수 - score()의 해당 항목과 같은 값"""
+        if user_codes is None:
+            user_codes = self.encode([user])[:, 0]
+        scores = np.zeros(len(indices), dtype=np.float64)
+        for i, table in enumerate(self._tables):
+            scores += table[user_codes[i], self.candidate_codes[i][indices]]
+        scores /= self.total_weight
+
+        if not user.is_complete:
+            scores[:] = 0.0
+        scores[~self.complete[indices]] = 0.0
+        return scores
+
+    @property
+    def index(self) -> "CandidateIndex":
+        """필수 조건 버킷 인덱스 (처음 사용할 때 생성)"""
+        if getattr(self, "_index", None) is None:
+            self._index = CandidateIndex(self)
+        return self._index
+
+    def top_k(
+        self,
+        user,
+        k: Optional[int] = None,
+        exclude_user_id: Optional[int] = None,
+        constraints: Optional[MatchConstraints] = None,
+        user_codes=None,
+    ) -> List[Tuple[int, float]]:
+        """점수 높은 순 (후보 인덱스, 점수) 목록 - 동점은 후보 순서 유지
+
+        k나 constraints가 주어지면 버킷 인덱스로 조건에 맞는 버킷만, 점수
+        상한이 높은 버킷부터 계산하고 상위 k개가 확정되면 멈춥니다.
+        user_codes(encode([user])[:, 0])를 주면 엔진 상태를 바꾸지 않으므로,
+        index를 만들어 둔 엔진이라면 여러 스레드에서 잠금 없이 호출할 수 있습니다.
+        """
+        if k is not None or constraints is not None:
+            return self.index.top_k(user, k, exclude_user_id, constraints, user_codes)
+
+        if user_codes is None:
+            scores = self.score(user)
+        else:
+            scores = self.score_subset(user, np.arange(len(self.candidates)), user_codes)
+        mask = self.complete.copy()
+        if exclude_user_id is not None:
+            mask &= self.user_ids != exclude_user_id
+        return select_top_k(scores, mask, k)
+
+
+def select_top_k(
+    scores: np.ndarray, mask: np.ndarray, k: Optional[int] = None
+) -> List[Tuple[int, float]]:
+    """mask가 참인 항목 중 점수 상위 k개를 (인덱스, 점수)로 반환합니다.
+
+    전체를 점수 내림차순으로 안정 정렬한 결과의 앞 k개와 같습니다.
+    """
+    candidates = np.flatnonzero(mask)
+    if k is not None and k < len(candidates):
+        if k <= 0:
+            return []
+        part = scores[candidates]
+        threshold = part[np.argpartition(-part, k - 1)[k - 1]]
+        above = candidates[part > threshold]
+        ties = candidates[part == threshold][: k - len(above)]
+        candidates = np.sort(np.concatenate([above, ties]))
+
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return [(int(i), float(scores[i])) for i in order]
+
+
+class _Bucket(NamedTuple):
+    smoking_code: int
+    gender: Optional[str]
+    age_band: int
+    indices: np.ndarray  # 후보 인덱스 (오름차순)
+
+
+class CandidateIndex:
+    """흡연 여부, 성별, 나이대로 완성된 프로필 후보를 나눈 버킷 인덱스
+
+    plan()은 필수 조건에 맞는 버킷만 골라 버킷별 점수 상한 순으로 정렬하고,
+    top_k()는 그 순서대로 점수를 계산하다가 k번째 점수가 남은 버킷의 상한보다
+    높아지면 멈춥니다. 상한은 필드별 최대 항을 점수와 같은 순서로 더한 값이라
+    (부동소수 반올림이 단조이므로) 실제 점수보다 작아지지 않고, 결과는 전체를
+    계산한 결과와 정확히 같습니다.
+    """
+
+    def __init__(self, engine: MatchingEngine):
+        self.engine = engine
+        self._smoking = [field for field, _, _ in COMPATIBILITY_FACTORS].index("smoking_status")
+        self.ages = np.array(
+            [c.age if getattr(c, "age", None) is not None else -1 for c in engine.candidates],
+            dtype=np.int64,
+        )
+
+        groups = {}
+        for i in np.flatnonzero(engine.complete):
+            candidate = engine.candidates[i]
+            age = self.ages[i]
+            key = (
+                int(engine.candidate_codes[self._smoking][i]),
+                _plain(getattr(candidate, "gender", None)),
+                int(age // AGE_BAND_SIZE) if age >= 0 else -1,
+            )
+            groups.setdefault(key, []).append(i)
+
+        self.buckets = [
+            _Bucket(smoking_code, gender, age_band, np.array(indices, dtype=np.intp))
+            for (smoking_code, gender, age_band), indices in groups.items()
+        ]
+
+        # 필드별 (버킷 x 값 코드) 존재 여부 - 버킷 상한을 한 번에 계산하는 데 사용
+        self._presence = []
+        for codes in engine.candidate_codes:
+            presence = np.zeros((len(self.buckets), int(codes.max(initial=0)) + 1), dtype=np.float64)
+            for b, bucket in enumerate(self.buckets):
+                presence[b, np.unique(codes[bucket.indices])] = 1.0
+            self._presence.append(presence)
+
+    def _allowed(self, bucket: _Bucket, user_codes, constraints: Optional[MatchConstraints]) -> bool:
+        if constraints is None:
+            return True
+        if constraints.strict_smoking and self.engine._tables[self._smoking][
+            user_codes[self._smoking], bucket.smoking_code
+        ] == 0.0:
+            return False
+        if constraints.genders is not None and bucket.gender not in constraints.genders:
+            return False
+        if constraints.min_age is not None or constraints.max_age is not None:
+            if bucket.age_band < 0:
+                return False
+            low = bucket.age_band * AGE_BAND_SIZE
+            high = low + AGE_BAND_SIZE - 1
+            if constraints.min_age is not None and high < constraints.min_age:
+                return False
+            if constraints.max_age is not None and low > constraints.max_age:
+                return False
+        return True
+
+    def upper_bounds(self, user_codes) -> np.ndarray:
+        """버킷별로 버킷 안 후보가 받을 수 있는 최고 점수"""
+        bounds = np.zeros(len(self.buckets), dtype=np.float64)
+        for i, table in enumerate(self.engine._tables):
+            presence = self._presence[i]
+            # 값 코드는 0 이상이므로 없는 값(0.0)은 최댓값에 영향 없음
+            bounds += (presence * table[user_codes[i], : presence.shape[1]]).max(axis=1)
+        bounds /= self.engine.total_weight
+        return bounds
+
+    def plan(self, user, constraints: Optional[MatchConstraints] = None, user_codes=None):
+        """조건에 맞는 버킷을 (점수 상한, 버킷) 상한 내림차순으로 반환합니다."""
+        if user_codes is None:
+            user_codes = self.engine.encode([user])[:, 0]
+        if user.is_complete:
+            bounds = self.upper_bounds(user_codes)
+        else:
+            bounds = np.zeros(len(self.buckets), dtype=np.float64)
+        return [
+            (float(bounds[b]), self.buckets[b])
+            for b in np.argsort(-bounds, kind="stable")
+            if self._allowed(self.buckets[b], user_codes, constraints)
+        ]
+
+    def top_k(
+        self,
+        user,
+        k: Optional[int] = None,
+        exclude_user_id: Optional[int] = None,
+        constraints: Optional[MatchConstraints] = None,
+        user_codes=None,
+    ) -> List[Tuple[int, float]]:
+        """MatchingEngine.top_k와 같은 결과를 조건에 맞는 버킷만 계산해서 반환합니다."""
+        if k is not None and k <= 0:
+            return []
+
+        if user_codes is None:
+            user_codes = self.engine.encode([user])[:, 0]
+        best_indices = np.empty(0, dtype=np.intp)
+        best_scores = np.empty(0, dtype=np.float64)
+        for bound, bucket in self.plan(user, constraints, user_codes):
+            indices = bucket.indices
+            if k is not None and len(best_indices) >= k:
+                # k번째 점수가 이 버킷의 상한보다 높으면 나머지 버킷은 볼 필요 없고,
+                # 같으면 동점에서 앞서는(인덱스가 더 작은) 후보만 들어올 수 있음
+                if best_scores[k - 1] > bound:
+                    break
+                if best_scores[k - 1] == bound:
+                    indices = indices[: np.searchsorted(indices, best_indices[k - 1])]
+
+            if exclude_user_id is not None:
+                indices = indices[self.engine.user_ids[indices] != exclude_user_id]
+            if constraints is not None:
+                ages = self.ages[indices]
+                if constraints.min_age is not None:
+                    indices = indices[ages >= constraints.min_age]
+                    ages = self.ages[indices]
+                if constraints.max_age is not None:
+                    indices = indices[ages <= constraints.max_age]
+            if not len(indices):
+                continue
+
+            best_indices = np.concatenate([best_indices, indices])
+            best_scores = np.concatenate(
+                [best_scores, self.engine.score_subset(user, indices, user_codes)]
+            )
+            order = np.lexsort((best_indices, -best_scores))[:k]
+            best_indices, best_scores = best_indices[order], best_scores[order]
+
+        return [(int(i), float(score)) for i, score in zip(best_indices, best_scores)]
@@ -1,8 +1,8 @@
-import sqlite3
 import json
 from typing import List, Dict, Optional
 from datetime import datetime
-from database.connection import DATABASE_PATH
+from database.connection import DATABASE_PATH, get_db_connection
+from database.counters import counters
 from models.policy import Policy, PolicyRecommendation
 
 
@@ -11,7 +11,7 @@ class PolicyRecommender:
         self.db_path = DATABASE_PATH
     
     def get_db_connection(self):
-        return sqlite3.connect(self.db_path)
+        return get_db_connection(self.db_path)
     
     def get_user_profile(self, user_id: int) -> Optional[Dict]:
         """사용자 프로필 정보 조회"""
@@ -313,7 +313,7 @@ class PolicyRecommender:
                 'target_gender': policy_data[8],
                 'target_location': policy_data[9],
                 'tags': policy_data[10],
-                'view_count': policy_data[11],
+                'view_count': counters.merged("policies", "view_count", policy_data[0], policy_data[11]),
                 'relevance_score': policy_data[12],
                 'crawled_at': policy_data[13]
             }
@@ -382,7 +382,7 @@ class PolicyRecommender:
                 target_gender=policy_data[8],
                 target_location=policy_data[9],
                 tags=json.loads(policy_data[10]) if policy_data[10] else [],
-                view_count=policy_data[11],
+                view_count=counters.merged("policies", "view_count", policy_data[0], policy_data[11]),
                 relevance_score=policy_data[12],
                 crawled_at=datetime.fromisoformat(policy_data[13])
             )
@@ -439,13 +439,10 @@ class PolicyRecommender:
                 VALUES (?, ?)
             """, (user_id, policy_id))
             
-            # 정책 조회수 증가
-            cursor.execute("""
-                UPDATE policies SET view_count = view_count + 1
-                WHERE id = ?
-            """, (policy_id,))
-            
             conn.commit()
+            
+            # 정책 조회수 증가 (버퍼에 모았다가 주기적으로 반영)
+            counters.increment("policies", "view_count", policy_id)
         except Exception as e:
             print(f"Error recording policy view: {e}")
         finally:
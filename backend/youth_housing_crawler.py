@@ -13,6 +13,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import os
+from database.connection import db_connection
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -234,59 +235,57 @@ class YouthHousingPolicyCrawler:
     def save_to_database(self, policies, db_path='users.db'):
         """크롤링한 정책 데이터를 데이터베이스에 저장"""
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            with db_connection(db_path) as conn:
+                cursor = conn.cursor()
             
-            # 청년 주거 정책 테이블 생성 (없으면)
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS youth_housing_policies (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    source TEXT,
-                    title TEXT,
-                    region TEXT,
-                    url TEXT,
-                    category TEXT,
-                    target_age TEXT,
-                    status TEXT,
-                    application_start TEXT,
-                    application_end TEXT,
-                    description TEXT,
-                    crawled_at TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(source, title, region)
-                )
-            ''')
+                # 청년 주거 정책 테이블 생성 (없으면)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS youth_housing_policies (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        source TEXT,
+                        title TEXT,
+                        region TEXT,
+                        url TEXT,
+                        category TEXT,
+                        target_age TEXT,
+                        status TEXT,
+                        application_start TEXT,
+                        application_end TEXT,
+                        description TEXT,
+                        crawled_at TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        UNIQUE(source, title, region)
+                    )
+                ''')
             
-            saved_count = 0
+                saved_count = 0
             
-            for policy in policies:
-                try:
-                    cursor.execute('''
-                        INSERT OR REPLACE INTO youth_housing_policies 
-                        (source, title, region, url, category, target_age, status, 
-                         application_start, application_end, description, crawled_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        policy.get('source', ''),
-                        policy.get('title', ''),
-                        policy.get('region', ''),
-                        policy.get('url', ''),
-                        policy.get('category', ''),
-                        policy.get('target_age', ''),
-                        policy.get('status', ''),
-                        policy.get('application_start', ''),
-                        policy.get('application_end', ''),
-                        policy.get('description', ''),
-                        policy.get('crawled_at', '')
-                    ))
+                for policy in policies:
+                    try:
+                        cursor.execute('''
+                            INSERT OR REPLACE INTO youth_housing_policies 
+                            (source, title, region, url, category, target_age, status, 
+                             application_start, application_end, description, crawled_at)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ''', (
+                            policy.get('source', ''),
+                            policy.get('title', ''),
+                            policy.get('region', ''),
+                            policy.get('url', ''),
+                            policy.get('category', ''),
+                            policy.get('target_age', ''),
+                            policy.get('status', ''),
+                            policy.get('application_start', ''),
+                            policy.get('application_end', ''),
+                            policy.get('description', ''),
+                            policy.get('crawled_at', '')
+                        ))
                     
-                    saved_count += 1
+                        saved_count += 1
                     
-                except sqlite3.IntegrityError:
-                    logger.debug(f"중복된 정책: {policy.get('title', '')}")
+                    except sqlite3.IntegrityError:
+                        logger.debug(f"중복된 정책: {policy.get('title', '')}")
                 
-            conn.commit()
-            conn.close()
             
             logger.info(f"{saved_count}개의 청년 주거 정책을 데이터베이스에 저장했습니다.")
             return saved_count